@@ -0,0 +1,64 @@
+"""Сколько запросов к базе тратит авторизованный запрос на /follow/ и
+/<username>/ с сессиями в базе и с кэшированными сессиями и пользователем.
+
+    python benchmarks/auth_queries.py
+"""
+from utils import setup_django
+
+setup_django()
+
+from django.core.cache import cache  # noqa: E402
+from django.db import connection  # noqa: E402
+from django.test import Client, override_settings  # noqa: E402
+from django.test.utils import CaptureQueriesContext  # noqa: E402
+from django.urls import reverse  # noqa: E402
+
+from posts.models import Follow, Post, User  # noqa: E402
+
+MODES = {
+    'db': {
+        'SESSION_ENGINE': 'django.contrib.sessions.backends.db',
+        'AUTHENTICATION_BACKENDS': [
+            'django.contrib.auth.backends.ModelBackend'],
+    },
+    'cached': {
+        'SESSION_ENGINE': 'django.contrib.sessions.backends.cached_db',
+        'AUTHENTICATION_BACKENDS': ['users.backends.CachedModelBackend'],
+    },
+}
+
+
+def count_queries(user, url):
+    cache.clear()
+    client = Client()
+    client.force_login(user)
+    #  первый запрос прогревает кэш
+    client.get(url)
+    with CaptureQueriesContext(connection) as context:
+        client.get(url)
+    return len(context.captured_queries)
+
+
+def main():
+    reader = User.objects.create_user('reader', password='JimBeam1234')
+    author = User.objects.create_user('author', password='JimBeam1234')
+    Follow.objects.create(user=reader, author=author)
+    Post.objects.bulk_create(
+        Post(text='текст ' * 10, author=author) for _ in range(20))
+
+    urls = {
+        '/follow/': reverse('follow_index'),
+        '/<username>/': reverse('profile', args=[author.username]),
+    }
+    print(f'{"url":<16}{"db":>6}{"cached":>8}{"saved":>7}')
+    for name, url in urls.items():
+        counts = {}
+        for mode, overrides in MODES.items():
+            with override_settings(**overrides):
+                counts[mode] = count_queries(reader, url)
+        print(f'{name:<16}{counts["db"]:>6}{counts["cached"]:>8}'
+              f'{counts["db"] - counts["cached"]:>7}')
+
+
+if __name__ == '__main__':
+    main()
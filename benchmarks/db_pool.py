@@ -0,0 +1,65 @@
+"""Задержка запроса к главной странице с пулом соединений и без него.
+
+    python benchmarks/db_pool.py [--requests 500]
+
+По умолчанию используется SQLite-файл; для Postgres задайте
+DB_ENGINE=yatube.db.backends.postgresql и остальные DB_* переменные.
+"""
+import argparse
+import os
+import statistics
+import tempfile
+import time
+
+from utils import setup_django
+
+os.environ.setdefault('DB_ENGINE', 'yatube.db.backends.sqlite3')
+setup_django(test_db_name=os.path.join(tempfile.mkdtemp(), 'bench.sqlite3'))
+
+from django.db import connection  # noqa: E402
+from django.test import Client  # noqa: E402
+
+from posts.models import Post, User  # noqa: E402
+from yatube.db.pool import pool_stats  # noqa: E402
+
+
+def measure(client, requests):
+    timings = []
+    for _ in range(requests):
+        started = time.perf_counter()
+        client.get('/')
+        timings.append((time.perf_counter() - started) * 1000)
+    timings.sort()
+    return {
+        'mean': statistics.mean(timings),
+        'p50': timings[len(timings) // 2],
+        'p95': timings[int(len(timings) * 0.95)],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--requests', type=int, default=500)
+    args = parser.parse_args()
+
+    author = User.objects.create_user('author', password='JimBeam1234')
+    Post.objects.bulk_create(
+        Post(text='текст ' * 10, author=author) for _ in range(20))
+
+    pool_options = connection.settings_dict['POOL']
+    client = Client()
+    print(f'{connection.vendor}, {args.requests} запросов, мс')
+    print(f'{"":<10}{"mean":>8}{"p50":>8}{"p95":>8}')
+    for name, options in (('no pool', None), ('pool', pool_options)):
+        connection.close()
+        connection.settings_dict['POOL'] = options
+        client.get('/')
+        result = measure(client, args.requests)
+        print(f'{name:<10}{result["mean"]:>8.2f}{result["p50"]:>8.2f}'
+              f'{result["p95"]:>8.2f}')
+
+    print(pool_stats())
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,69 @@
+"""Накладные расходы сэмплирующего профилировщика на странице записи:
+без профилировщика и с профилированием каждого запроса
+(PROFILER_SAMPLE_RATE=1 — худший случай).
+
+    python benchmarks/profiler_overhead.py --requests 500
+"""
+import argparse
+import statistics
+import tempfile
+import time
+
+from utils import setup_django
+
+setup_django()
+
+from django.test import Client, override_settings  # noqa: E402
+from django.urls import reverse  # noqa: E402
+
+from posts.models import Comment, Post, User  # noqa: E402
+
+
+def make_client(url, enabled):
+    with override_settings(PROFILER_ENABLED=enabled):
+        client = Client()
+        #  цепочка middleware собирается при первом запросе
+        client.get(url)
+    return client
+
+
+def timed(client, url):
+    wall = time.perf_counter()
+    cpu = time.process_time()
+    client.get(url)
+    return time.perf_counter() - wall, time.process_time() - cpu
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--requests', type=int, default=500)
+    args = parser.parse_args()
+
+    author = User.objects.create_user('author', password='JimBeam1234')
+    post = Post.objects.create(text='текст записи ' * 50, author=author)
+    Comment.objects.bulk_create(
+        Comment(post=post, author=author, text='комментарий ' * 10)
+        for _ in range(50))
+    url = reverse('post', args=[author.username, post.pk])
+
+    with override_settings(PAGE_CACHE={}, PROFILER_SAMPLE_RATE=1.0,
+                           PROFILER_DIR=tempfile.mkdtemp()):
+        clients = {'off': make_client(url, False),
+                   'sampled': make_client(url, True)}
+        #  запросы режимов чередуются, чтобы дрейф машины делился поровну;
+        #  процессорное время включает и поток профилировщика
+        timings = {mode: [] for mode in clients}
+        for _ in range(args.requests):
+            for mode, client in clients.items():
+                timings[mode].append(timed(client, url))
+
+    base = [statistics.median(values) for values in zip(*timings['off'])]
+    print(f'{"mode":<10}{"wall, ms":>10}{"cpu, ms":>9}{"cpu overhead":>14}')
+    for mode, values in timings.items():
+        wall, cpu = (statistics.median(column) for column in zip(*values))
+        print(f'{mode:<10}{wall * 1000:>10.2f}{cpu * 1000:>9.2f}'
+              f'{(cpu / base[1] - 1) * 100:>13.1f}%')
+
+
+if __name__ == '__main__':
+    main()
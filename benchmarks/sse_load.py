@@ -0,0 +1,98 @@
+"""Нагрузочный тест SSE: держит N простаивающих соединений к /events/.
+
+Запустите ASGI-сервер (например, uvicorn yatube.asgi:application) и:
+
+    python benchmarks/sse_load.py --connections 10000 --pid <pid сервера>
+
+Скрипт открывает соединения пачками, ждёт заголовки ответа, держит
+соединения --hold секунд и печатает число живых соединений, полученные
+события и (с --pid) потребление памяти сервером до и после.
+"""
+import argparse
+import asyncio
+import resource
+import time
+
+
+def rss_mb(pid):
+    if pid is None:
+        return None
+    with open(f'/proc/{pid}/status') as status:
+        for line in status:
+            if line.startswith('VmRSS:'):
+                return int(line.split()[1]) / 1024
+    return None
+
+
+async def client(host, port, path, stats, stop):
+    try:
+        reader, writer = await asyncio.open_connection(host, port)
+    except OSError:
+        stats['failed'] += 1
+        return
+    writer.write(f'GET {path} HTTP/1.1\r\nHost: {host}\r\n'
+                 'Accept: text/event-stream\r\n\r\n'.encode())
+    try:
+        status = await asyncio.wait_for(reader.readline(), 30)
+        if b' 200 ' not in status:
+            stats['failed'] += 1
+            return
+        stats['connected'] += 1
+        while not stop.is_set():
+            line = await asyncio.wait_for(reader.readline(), 60)
+            if not line:
+                break
+            if line.startswith(b'event:'):
+                stats['events'] += 1
+    except (asyncio.TimeoutError, OSError):
+        stats['failed'] += 1
+    finally:
+        writer.close()
+
+
+async def main(args):
+    stats = {'connected': 0, 'failed': 0, 'events': 0}
+    stop = asyncio.Event()
+    before = rss_mb(args.pid)
+    started = time.perf_counter()
+
+    tasks = []
+    for number in range(args.connections):
+        tasks.append(asyncio.ensure_future(
+            client(args.host, args.port, args.path, stats, stop)))
+        if number % args.batch == args.batch - 1:
+            await asyncio.sleep(0.05)
+
+    while (stats['connected'] + stats['failed'] < args.connections
+           and time.perf_counter() - started < 120):
+        await asyncio.sleep(0.5)
+    print(f'подключено {stats["connected"]}, ошибок {stats["failed"]} '
+          f'за {time.perf_counter() - started:.1f} с')
+
+    await asyncio.sleep(args.hold)
+    after = rss_mb(args.pid)
+    stop.set()
+    print(f'событий получено: {stats["events"]}')
+    if before is not None and after is not None:
+        per_connection = (after - before) * 1024 / max(stats['connected'], 1)
+        print(f'память сервера: {before:.1f} -> {after:.1f} МБ '
+              f'({per_connection:.1f} КБ на соединение)')
+    for task in tasks:
+        task.cancel()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8000)
+    parser.add_argument('--path', default='/events/post/1/')
+    parser.add_argument('--connections', type=int, default=1000)
+    parser.add_argument('--batch', type=int, default=500)
+    parser.add_argument('--hold', type=float, default=30)
+    parser.add_argument('--pid', type=int)
+    args = parser.parse_args()
+
+    soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    resource.setrlimit(resource.RLIMIT_NOFILE,
+                       (min(hard, args.connections + 100), hard))
+    asyncio.run(main(args))
@@ -0,0 +1,131 @@
+"""Время запуска воркера: django.setup() и первый запрос к главной.
+
+lazy   — новый процесс, тяжёлые модули posts загружаются при первом
+         использовании;
+eager  — новый процесс, сразу после django.setup() импортируются NumPy,
+         Pillow и движок миниатюр (как было до отложенных импортов);
+fork   — воркер, полученный fork() от прогретого мастера (режим preload
+         из gunicorn.conf.py), setup в нём уже не нужен.
+
+    python benchmarks/startup.py --runs 10
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+CHILD_SCENARIOS = ('lazy', 'eager')
+
+
+def first_request():
+    from django.test import Client
+
+    started = time.perf_counter()
+    Client().get('/')
+    return time.perf_counter() - started
+
+
+def child(scenario):
+    started = time.perf_counter()
+    import django
+
+    django.setup()
+    if scenario == 'eager':
+        from posts.warmup import preload_modules
+
+        preload_modules()
+    setup = time.perf_counter() - started
+
+    from django.test.utils import setup_test_environment
+
+    setup_test_environment()
+    request = first_request()
+    print(json.dumps({'setup': setup, 'request': request,
+                      'modules': len(sys.modules)}))
+
+
+def run_child(scenario, db_name):
+    from utils import BASE_DIR
+
+    env = dict(os.environ, DJANGO_SETTINGS_MODULE='yatube.settings',
+               DB_ENGINE='django.db.backends.sqlite3', DB_NAME=db_name,
+               PYTHONPATH=str(BASE_DIR))
+    started = time.perf_counter()
+    output = subprocess.run(
+        [sys.executable, __file__, '--child', scenario], env=env,
+        check=True, stdout=subprocess.PIPE).stdout
+    result = json.loads(output)
+    result['wall'] = time.perf_counter() - started
+    return result
+
+
+def run_forked():
+    read_end, write_end = os.pipe()
+    started = time.perf_counter()
+    pid = os.fork()
+    if pid == 0:
+        os.close(read_end)
+        os.write(write_end, json.dumps({
+            'setup': 0, 'request': first_request(),
+            'modules': len(sys.modules)}).encode())
+        os._exit(0)
+    os.close(write_end)
+    with os.fdopen(read_end) as pipe:
+        result = json.loads(pipe.read())
+    os.waitpid(pid, 0)
+    result['wall'] = time.perf_counter() - started
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--runs', type=int, default=10)
+    parser.add_argument('--child', choices=CHILD_SCENARIOS)
+    args = parser.parse_args()
+    if args.child:
+        return child(args.child)
+
+    from utils import setup_django
+
+    db_name = os.path.join(tempfile.mkdtemp(), 'startup.sqlite3')
+    setup_django(test_db_name=db_name)
+
+    import gc
+
+    from django.db import connections
+
+    from posts.models import Post, User
+    from posts.warmup import preload_modules, warm_process
+
+    author = User.objects.create_user('author', password='JimBeam1234')
+    Post.objects.bulk_create(Post(text=f'запись {i}', author=author)
+                             for i in range(20))
+
+    results = {scenario: [run_child(scenario, db_name)
+                          for _ in range(args.runs)]
+               for scenario in CHILD_SCENARIOS}
+
+    #  мастер в режиме preload: прогрев, закрытые соединения, gc.freeze()
+    warm_process()
+    preload_modules()
+    connections.close_all()
+    gc.collect()
+    gc.freeze()
+    results['fork'] = [run_forked() for _ in range(args.runs)]
+
+    print(f'{"mode":<8}{"setup, ms":>11}{"1st request, ms":>17}'
+          f'{"wall, ms":>10}{"modules":>9}')
+    for mode, runs in results.items():
+        setup, request, wall = (
+            statistics.median(run[key] for run in runs) * 1000
+            for key in ('setup', 'request', 'wall'))
+        print(f'{mode:<8}{setup:>11.1f}{request:>17.1f}{wall:>10.1f}'
+              f'{runs[0]["modules"]:>9}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,73 @@
+"""Время до первого байта, полное время и пик памяти для главной
+страницы с большим числом записей: обычный render() и потоковая отдача
+(STREAM_FEEDS).
+
+    python benchmarks/streaming_ttfb.py --posts 2000 --page-size 500
+"""
+import argparse
+import time
+import tracemalloc
+
+from utils import setup_django
+
+setup_django()
+
+from django.core.cache import cache  # noqa: E402
+from django.test import Client, override_settings  # noqa: E402
+from django.urls import reverse  # noqa: E402
+
+from posts import views  # noqa: E402
+from posts.models import Group, Post, User  # noqa: E402
+
+
+def measure(client, url):
+    cache.clear()
+    tracemalloc.start()
+    start = time.perf_counter()
+    response = client.get(url)
+    if response.streaming:
+        chunks = iter(response.streaming_content)
+        size = len(next(chunks))
+        ttfb = time.perf_counter() - start
+        size += sum(len(chunk) for chunk in chunks)
+    else:
+        ttfb = time.perf_counter() - start
+        size = len(response.content)
+    total = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return ttfb, total, peak, size
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--posts', type=int, default=2000)
+    parser.add_argument('--page-size', type=int, default=500)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    author = User.objects.create_user('author', password='JimBeam1234')
+    group = Group.objects.create(title='Группа', slug='group',
+                                 description='описание')
+    Post.objects.bulk_create(
+        Post(text='текст записи ' * 20, author=author, group=group)
+        for _ in range(args.posts))
+    views.POST_ON_PAGE = args.page_size
+
+    url = reverse('index')
+    print(f'{"mode":<10}{"ttfb, ms":>10}{"total, ms":>11}'
+          f'{"peak, KiB":>11}{"bytes":>10}')
+    for mode, stream in (('render', False), ('stream', True)):
+        with override_settings(STREAM_FEEDS=stream, PAGE_CACHE={}):
+            client = Client()
+            client.force_login(author)
+            measure(client, url)
+            results = [measure(client, url) for _ in range(args.repeat)]
+        ttfb, total, peak, size = (sorted(values)[len(values) // 2]
+                                   for values in zip(*results))
+        print(f'{mode:<10}{ttfb * 1000:>10.1f}{total * 1000:>11.1f}'
+              f'{peak // 1024:>11}{size:>10}')
+
+
+if __name__ == '__main__':
+    main()
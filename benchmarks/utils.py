@@ -0,0 +1,29 @@
+"""Общая настройка Django для скриптов из каталога benchmarks.
+
+Замеры выполняются на тестовой базе (test_<DB_NAME> или SQLite в
+памяти), поэтому рабочие данные не затрагиваются. Без переменных
+окружения DB_* используется SQLite.
+"""
+import os
+import sys
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+
+
+def setup_django(test_db_name=None):
+    sys.path.insert(0, str(BASE_DIR))
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'yatube.settings')
+    os.environ.setdefault('DB_ENGINE', 'django.db.backends.sqlite3')
+    os.environ.setdefault('DB_NAME', str(BASE_DIR / 'db.sqlite3'))
+
+    import django
+    django.setup()
+
+    from django.db import connection
+    from django.test.utils import setup_test_environment
+
+    setup_test_environment()
+    if test_db_name:
+        connection.settings_dict['TEST']['NAME'] = test_db_name
+    connection.creation.create_test_db(verbosity=0)
@@ -0,0 +1,23 @@
+import os
+import shutil
+import tempfile
+
+from django.conf import settings
+
+#  тесты вызывают cache.clear() и оставляют страницы из тестовых данных:
+#  им нужен свой каталог, а не общий кэш воркеров в BASE_DIR/cache
+TEST_DIR = tempfile.mkdtemp(prefix='yatube-test-')
+
+
+def pytest_configure():
+    settings.CACHES['default']['LOCATION'] = os.path.join(TEST_DIR, 'cache')
+    database = settings.DATABASES['default']
+    #  SQLite в памяти не даёт писать из нескольких потоков сразу —
+    #  тестовая база в файле, чтобы проверки конкурентности не пропускались
+    if 'sqlite' in (database['ENGINE'] or ''):
+        database.setdefault('TEST', {})['NAME'] = os.path.join(
+            TEST_DIR, 'test.sqlite3')
+
+
+def pytest_unconfigure():
+    shutil.rmtree(TEST_DIR, ignore_errors=True)
@@ -0,0 +1,41 @@
+"""Настройки gunicorn: gunicorn -c gunicorn.conf.py yatube.wsgi
+
+При GUNICORN_PRELOAD=1 приложение загружается один раз в мастере: там же
+прогреваются шаблоны и URL и импортируются отложенные модули, после чего
+gc.freeze() переносит все объекты в постоянное поколение. Воркеры
+получают это состояние через fork, и сборщик мусора в них не трогает
+унаследованные объекты, так что их страницы памяти остаются общими
+(copy-on-write), а новый воркер готов к запросам сразу после fork.
+"""
+import gc
+import multiprocessing
+import os
+
+bind = os.environ.get('GUNICORN_BIND', '0.0.0.0:8000')
+workers = int(os.environ.get('GUNICORN_WORKERS',
+                             multiprocessing.cpu_count() * 2 + 1))
+preload_app = os.environ.get('GUNICORN_PRELOAD') == '1'
+
+if preload_app:
+    #  без сборок до fork объекты не разбросаны по поколениям
+    gc.disable()
+
+
+def when_ready(server):
+    if not preload_app:
+        return
+    from django.db import connections
+
+    from posts.warmup import preload_modules, warm_process
+
+    warm_process()
+    preload_modules()
+    #  соединения мастера не должны достаться воркерам
+    connections.close_all()
+    gc.collect()
+    gc.freeze()
+
+
+def post_fork(server, worker):
+    if preload_app:
+        gc.enable()
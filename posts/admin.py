@@ -1,12 +1,89 @@
+from django.conf import settings
 from django.contrib import admin
+from django.core.paginator import Paginator
+from django.db import connections, transaction
+from django.utils import timezone
+from django.utils.functional import cached_property
 
-from .models import Post, Group, Comment, Follow
+from .models import Post, Group, Comment, Follow, ListingChange
+
+
+class EstimatedCountPaginator(Paginator):
+    """Для всей таблицы в PostgreSQL берёт число строк из pg_class вместо
+    COUNT(*); небольшие таблицы и отфильтрованные списки считает точно."""
+
+    @cached_property
+    def count(self):
+        query = self.object_list.query
+        connection = connections[self.object_list.db]
+        if not query.where and connection.vendor == 'postgresql':
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    'SELECT reltuples::bigint FROM pg_class '
+                    'WHERE oid = %s::regclass',
+                    [query.model._meta.db_table],
+                )
+                row = cursor.fetchone()
+            if row and row[0] > settings.ADMIN_EXACT_COUNT_LIMIT:
+                return row[0]
+        return super().count
+
+
+def in_batches(queryset):
+    """Первичные ключи выборки пачками по ADMIN_BATCH_SIZE."""
+    pks = queryset.order_by('pk').values_list('pk', flat=True)
+    last_pk = None
+    while True:
+        batch = pks if last_pk is None else pks.filter(pk__gt=last_pk)
+        batch = list(batch[:settings.ADMIN_BATCH_SIZE])
+        if not batch:
+            return
+        yield batch
+        last_pk = batch[-1]
+
+
+def delete_in_batches(modeladmin, request, queryset):
+    deleted = 0
+    for batch in in_batches(queryset):
+        with transaction.atomic():
+            _, per_model = queryset.model.objects.filter(
+                pk__in=batch).delete()
+        deleted += per_model.get(queryset.model._meta.label, 0)
+    modeladmin.message_user(request, f'Удалено: {deleted}')
+
+
+delete_in_batches.short_description = 'Удалить выбранные пачками'
+delete_in_batches.allowed_permissions = ('delete',)
+
+
+def clear_group(modeladmin, request, queryset):
+    updated = 0
+    for batch in in_batches(queryset):
+        posts = Post.objects.filter(pk__in=batch)
+        with transaction.atomic():
+            #  update() минует Post.save(): ленты групп для статической
+            #  копии отмечаем сами
+            group_ids = set(posts.exclude(group=None)
+                            .values_list('group_id', flat=True))
+            ListingChange.objects.bulk_create(
+                ListingChange(group_id=group_id) for group_id in group_ids)
+            updated += posts.update(group=None, updated=timezone.now())
+    modeladmin.message_user(request, f'Убрано из групп: {updated}')
+
+
+clear_group.short_description = 'Убрать выбранные записи из групп'
+clear_group.allowed_permissions = ('change',)
 
 
 class PostAdmin(admin.ModelAdmin):
     list_display = ('pk', 'text', 'pub_date', 'author', 'group')
+    list_select_related = ('author', 'group')
+    raw_id_fields = ('author', 'group')
     search_fields = ('text',)
     list_filter = ('pub_date', 'group')
+    show_full_result_count = False
+    paginator = EstimatedCountPaginator
+    actions = (delete_in_batches, clear_group)
     empty_value_display = '-пусто-'
 
 
@@ -17,10 +94,18 @@ class GroupAdmin(admin.ModelAdmin):
 
 class CommentAdmin(admin.ModelAdmin):
     list_display = ('post', 'author', 'text', 'created')
+    list_select_related = ('post', 'author')
+    raw_id_fields = ('post', 'author')
+    list_filter = ('created',)
+    show_full_result_count = False
+    paginator = EstimatedCountPaginator
+    actions = (delete_in_batches,)
 
 
 class FollowAdmin(admin.ModelAdmin):
     list_display = ('user', 'author')
+    list_select_related = ('user', 'author')
+    raw_id_fields = ('user', 'author')
 
 
 admin.site.register(Post, PostAdmin)
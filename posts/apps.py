@@ -1,5 +1,43 @@
 from django.apps import AppConfig
+from django.db.models.signals import m2m_changed, post_delete, post_save
+
+
+def duplicates_post_saved(sender, **kwargs):
+    #  NumPy загружается при первом сохранении записи, а не в django.setup()
+    from . import duplicates
+
+    duplicates.post_saved(sender, **kwargs)
 
 
 class PostsConfig(AppConfig):
     name = 'posts'
+
+    def ready(self):
+        from django.contrib.flatpages.models import FlatPage
+
+        from yatube import checks  # noqa: F401
+        from yatube import flatpages
+
+        from . import events, snapshot, storage
+        from .models import Comment, Follow, Post
+
+        post_save.connect(events.post_created, sender=Post,
+                          dispatch_uid='posts.events.post_created')
+        post_save.connect(events.comment_created, sender=Comment,
+                          dispatch_uid='posts.events.comment_created')
+        post_save.connect(duplicates_post_saved, sender=Post,
+                          dispatch_uid='posts.duplicates.post_saved')
+        post_delete.connect(storage.post_deleted, sender=Post,
+                            dispatch_uid='posts.storage.post_deleted')
+        post_save.connect(snapshot.follow_changed, sender=Follow,
+                          dispatch_uid='posts.snapshot.follow_saved')
+        post_delete.connect(snapshot.follow_changed, sender=Follow,
+                            dispatch_uid='posts.snapshot.follow_deleted')
+
+        post_save.connect(flatpages.invalidate_index, sender=FlatPage,
+                          dispatch_uid='yatube.flatpages.invalidate_save')
+        post_delete.connect(flatpages.invalidate_index, sender=FlatPage,
+                            dispatch_uid='yatube.flatpages.invalidate_delete')
+        m2m_changed.connect(flatpages.invalidate_index,
+                            sender=FlatPage.sites.through,
+                            dispatch_uid='yatube.flatpages.invalidate_sites')
@@ -0,0 +1,167 @@
+"""Отложенная запись комментариев (write-behind).
+
+add_comment только валидирует форму и дописывает комментарий в локальный
+журнал на диске, а воркер (manage.py flush_comments) забирает журнал
+пачками и вставляет их одним bulk_create. Автор видит свои ещё не
+записанные комментарии из сессии, пока их uid не появится в базе
+(Comment.queue_uid).
+
+Если воркер упадёт между вставкой пачки и удалением её файла, пачка
+будет прочитана повторно, но уже записанные uid пропускаются.
+"""
+import fcntl
+import glob
+import json
+import os
+import time
+import uuid
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from . import fragments
+from .events import publish_comment
+from .models import Comment, Post, render_text
+
+QUEUE_FILE = 'comments.log'
+BATCH_SUFFIX = '.batch'
+SESSION_KEY = 'pending_comments'
+PENDING_MAX_AGE = 60 * 60
+
+
+def queue_dir():
+    return settings.COMMENT_QUEUE_DIR
+
+
+def queue_path():
+    return os.path.join(queue_dir(), QUEUE_FILE)
+
+
+def append(entry):
+    line = (json.dumps(entry, ensure_ascii=False) + '\n').encode()
+    os.makedirs(queue_dir(), exist_ok=True)
+    while True:
+        with open(queue_path(), 'ab') as queue:
+            fcntl.flock(queue, fcntl.LOCK_EX)
+            #  воркер мог переименовать журнал, пока мы ждали блокировку
+            try:
+                current = os.stat(queue_path()).st_ino
+            except FileNotFoundError:
+                current = None
+            if current != os.fstat(queue.fileno()).st_ino:
+                continue
+            queue.write(line)
+            queue.flush()
+            os.fsync(queue.fileno())
+            return
+
+
+def enqueue(request, post_id, username, text):
+    entry = {
+        'uid': uuid.uuid4().hex,
+        'post_id': post_id,
+        'username': username,
+        'author_id': request.user.pk,
+        'author_username': request.user.username,
+        'text': text,
+        'created': timezone.now().isoformat(),
+    }
+    append(entry)
+
+    pending = request.session.get(SESSION_KEY, [])
+    pending.append(entry)
+    request.session[SESSION_KEY] = pending
+    return entry
+
+
+def stored_uids(entries):
+    """uid из entries, которые воркер уже записал в базу."""
+    return set(Comment.objects.filter(
+        queue_uid__in=[entry['uid'] for entry in entries],
+    ).values_list('queue_uid', flat=True))
+
+
+def pending_for(request, post):
+    """Незаписанные комментарии автора к посту — для read-your-own-writes."""
+    entries = request.session.get(SESSION_KEY)
+    if not entries:
+        return []
+
+    oldest = time.time() - PENDING_MAX_AGE
+    stored = stored_uids(entries)
+    remaining = [
+        entry for entry in entries
+        if entry['uid'] not in stored
+        and parse_datetime(entry['created']).timestamp() > oldest
+    ]
+    if len(remaining) != len(entries):
+        request.session[SESSION_KEY] = remaining
+
+    return [
+        Comment(post=post, author=request.user, text=entry['text'],
+                created=parse_datetime(entry['created']))
+        for entry in remaining if entry['post_id'] == post.pk
+    ]
+
+
+def claim():
+    """Переименовывает текущий журнал в файл пачки под блокировкой."""
+    try:
+        queue = open(queue_path(), 'rb')
+    except FileNotFoundError:
+        return
+    with queue:
+        fcntl.flock(queue, fcntl.LOCK_EX)
+        if os.fstat(queue.fileno()).st_size:
+            batch = f'{queue_path()}.{time.time_ns()}{BATCH_SUFFIX}'
+            os.replace(queue_path(), batch)
+
+
+def read_batch(path):
+    with open(path, encoding='utf-8') as batch:
+        return [json.loads(line) for line in batch if line.endswith('\n')]
+
+
+def write_batch(entries, batch_size):
+    posts = dict(
+        Post.objects.filter(pk__in={entry['post_id'] for entry in entries})
+        .values_list('pk', 'author__username')
+    )
+    stored = stored_uids(entries)
+    entries = [entry for entry in entries
+               if posts.get(entry['post_id']) == entry['username']
+               and entry['uid'] not in stored]
+    comments = [
+        Comment(post_id=entry['post_id'], author_id=entry['author_id'],
+                text=entry['text'], text_html=render_text(entry['text']),
+                created=parse_datetime(entry['created']),
+                queue_uid=entry['uid'])
+        for entry in entries
+    ]
+    with transaction.atomic():
+        Comment.objects.bulk_create(comments, batch_size=batch_size)
+    #  bulk_create не отправляет post_save
+    for comment, entry in zip(comments, entries):
+        publish_comment(comment, entry['author_username'])
+    return len(comments)
+
+
+def flush(batch_size=500):
+    """Записывает накопленные комментарии; возвращает число вставленных."""
+    claim()
+    written = 0
+    authors = set()
+    pattern = os.path.join(queue_dir(), f'{QUEUE_FILE}.*{BATCH_SUFFIX}')
+    for path in sorted(glob.glob(pattern)):
+        entries = read_batch(path)
+        if entries:
+            written += write_batch(entries, batch_size)
+            authors.update(entry['author_id'] for entry in entries)
+        os.remove(path)
+
+    if written:
+        #  фрагменты ленты со счётчиками комментариев
+        fragments.invalidate(authors)
+    return written
@@ -0,0 +1,157 @@
+"""Счётчики просмотров записей.
+
+Просмотры копятся в словаре внутри процесса и записываются в базу одним
+UPDATE ... CASE на все накопленные записи. Пишет их фоновый поток раз в
+VIEW_COUNTER_INTERVAL секунд, а раньше — когда в буфере набралось
+VIEW_COUNTER_MAX_PENDING записей; сам запрос в базу не ходит. При
+падении процесса теряются только просмотры за последний интервал; при
+обычной остановке буфер сбрасывается через atexit. Ошибка базы в потоке
+пишется в лог, а просмотры возвращаются в буфер до следующей попытки.
+"""
+import atexit
+import logging
+import os
+import threading
+
+from django.conf import settings
+from django.db import DatabaseError, close_old_connections
+from django.db.models import Case, F, IntegerField, Value, When
+
+from .models import Post
+
+logger = logging.getLogger(__name__)
+
+_lock = threading.Lock()
+_pending = {}
+#  будит поток записи, когда буфер заполнен
+_wake = threading.Event()
+#  pid процесса, в котором запущен поток: после fork() его надо запустить
+#  заново, в дочерний процесс потоки не копируются. None — поток не
+#  запускали (тесты, команды manage.py), полный буфер пишется сразу
+_flusher_pid = None
+
+
+def incr(post_id, amount=1):
+    """Учитывает просмотр; полный буфер будит поток записи."""
+    with _lock:
+        _pending[post_id] = _pending.get(post_id, 0) + amount
+        full = len(_pending) >= settings.VIEW_COUNTER_MAX_PENDING
+    if _flusher_pid is None:
+        if full:
+            flush_safely()
+        return
+    start_flusher()
+    if full:
+        _wake.set()
+
+
+def discard(post_id, amount=1):
+    """Отменяет учтённый просмотр, например для несуществующей записи."""
+    with _lock:
+        left = _pending.get(post_id, 0) - amount
+        if left > 0:
+            _pending[post_id] = left
+        else:
+            _pending.pop(post_id, None)
+
+
+def pending(post_id):
+    """Просмотры записи, ещё не записанные в базу этим процессом."""
+    return _pending.get(post_id, 0)
+
+
+def take():
+    global _pending
+    with _lock:
+        batch, _pending = _pending, {}
+    return batch
+
+
+def restore(batch):
+    with _lock:
+        for post_id, amount in batch.items():
+            _pending[post_id] = _pending.get(post_id, 0) + amount
+
+
+def flush():
+    """Записывает накопленные просмотры одним запросом."""
+    batch = take()
+    if not batch:
+        return 0
+    increment = Case(
+        *[When(pk=post_id, then=Value(amount))
+          for post_id, amount in batch.items()],
+        default=Value(0),
+        output_field=IntegerField(),
+    )
+    try:
+        Post.objects.filter(pk__in=batch).update(views=F('views') + increment)
+    except DatabaseError:
+        #  база недоступна — вернём просмотры в буфер до следующей попытки
+        restore(batch)
+        raise
+    return len(batch)
+
+
+def flush_safely():
+    try:
+        return flush()
+    except DatabaseError:
+        logger.exception('Не удалось записать просмотры записей')
+        return 0
+
+
+def run_flusher():
+    while True:
+        _wake.wait(settings.VIEW_COUNTER_INTERVAL)
+        _wake.clear()
+        flush_safely()
+        close_old_connections()
+
+
+def start_flusher():
+    """Запускает поток записи в этом процессе; вызывается при загрузке
+    wsgi.py и asgi.py и повторно из incr() после fork()."""
+    global _flusher_pid
+    if _flusher_pid == os.getpid():
+        return
+    with _lock:
+        if _flusher_pid == os.getpid():
+            return
+        threading.Thread(target=run_flusher, name='view-counters',
+                         daemon=True).start()
+        _flusher_pid = os.getpid()
+
+
+@atexit.register
+def flush_on_exit():
+    try:
+        flush()
+    except Exception:
+        pass
+
+
+class ViewCounterMiddleware:
+    """Считает просмотры страницы записи, в том числе отданные из кэша.
+
+    Просмотр учитывается до вызова представления, чтобы страница уже
+    показывала его, и отменяется, если записи не нашлось.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        response = self.get_response(request)
+        post_id = getattr(request, 'counted_post_id', None)
+        if post_id is not None and response.status_code == 404:
+            discard(post_id)
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        match = request.resolver_match
+        if (match and match.url_name == 'post'
+                and request.method == 'GET'):
+            request.counted_post_id = view_kwargs['post_id']
+            incr(request.counted_post_id)
+        return None
@@ -0,0 +1,108 @@
+"""Письма «новые записи в ваших подписках».
+
+Записи за период [since, until) выбираются одним запросом: подписки
+Follow соединяются с записями авторов и упорядочиваются по подписчику,
+так что письмо собирается из подряд идущих строк без запроса на
+пользователя. Подписчики делятся на шарды по user_id % shards, каждый
+шард обрабатывается отдельным процессом и после каждой отправленной пачки
+писем записывает последний user_id в свой файл в DIGEST_STATE_DIR.
+Прерванный запуск продолжается с того же места и с тем же периодом.
+"""
+import json
+import os
+from itertools import groupby
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.db.models import F
+from django.template import loader
+
+from .models import Follow
+
+RUN_FILE = 'run.json'
+LAST_RUN_FILE = 'last_run.json'
+SUBJECT = 'Новые записи в ваших подписках'
+
+
+def state_path(name):
+    return os.path.join(settings.DIGEST_STATE_DIR, name)
+
+
+def read_json(name, default=None):
+    try:
+        with open(state_path(name), encoding='utf-8') as state:
+            return json.load(state)
+    except FileNotFoundError:
+        return default
+
+
+def write_json(name, data):
+    os.makedirs(settings.DIGEST_STATE_DIR, exist_ok=True)
+    temp = state_path(f'{name}.tmp')
+    with open(temp, 'w', encoding='utf-8') as state:
+        json.dump(data, state)
+        state.flush()
+        os.fsync(state.fileno())
+    os.replace(temp, state_path(name))
+
+
+def shard_file(shard):
+    return f'shard-{shard}.json'
+
+
+def digest_rows(since, until, shard, shards, after_user_id=0):
+    return (
+        Follow.objects
+        .annotate(shard=F('user_id') % shards)
+        .filter(shard=shard, user_id__gt=after_user_id,
+                user__email__gt='',
+                author__posts__pub_date__gte=since,
+                author__posts__pub_date__lt=until)
+        .order_by('user_id', '-author__posts__pub_date')
+        .values_list('user_id', 'user__username', 'user__email',
+                     'author__username', 'author__posts__id',
+                     'author__posts__text', 'author__posts__pub_date')
+    )
+
+
+def build_messages(rows, template, site_url):
+    limit = settings.DIGEST_MAX_POSTS
+    for (user_id, username, email), posts in groupby(
+            rows, key=lambda row: row[:3]):
+        posts = [
+            {'author': author, 'id': post_id, 'text': text,
+             'pub_date': pub_date}
+            for _, _, _, author, post_id, text, pub_date in posts
+        ]
+        body = template.render({
+            'username': username,
+            'posts': posts[:limit],
+            'more': max(len(posts) - limit, 0),
+            'site_url': site_url,
+        })
+        yield user_id, EmailMessage(SUBJECT, body, to=[email])
+
+
+def send_shard(since, until, shard, shards, site_url):
+    """Отправляет письма шарда; возвращает (шард, число писем)."""
+    progress = read_json(shard_file(shard), {})
+    if progress.get('done'):
+        return shard, 0
+
+    template = loader.get_template('emails/digest.txt')
+    rows = digest_rows(since, until, shard, shards,
+                       progress.get('user_id', 0)).iterator()
+    sent = 0
+    batch = []
+    connection = get_connection()
+    with connection:
+        for user_id, message in build_messages(rows, template, site_url):
+            batch.append(message)
+            if len(batch) >= settings.DIGEST_BATCH_SIZE:
+                sent += connection.send_messages(batch) or 0
+                write_json(shard_file(shard), {'user_id': user_id})
+                batch = []
+        if batch:
+            sent += connection.send_messages(batch) or 0
+    write_json(shard_file(shard), {'done': True})
+    return shard, sent
@@ -0,0 +1,124 @@
+"""Поиск почти одинаковых записей по MinHash.
+
+Текст приводится к нижнему регистру без знаков препинания и режется на
+шинглы по SHINGLE_SIZE символов. Хэши шинглов и NUM_PERM функций
+перемешивания считаются векторно в NumPy, минимум по каждой функции
+даёт подпись записи. Доля совпавших позиций двух подписей оценивает
+сходство Жаккара их текстов.
+
+Подпись делится на BANDS полос по ROWS позиций; хэш каждой полосы —
+ключ корзины в таблице PostBucket с индексом. Тексты с похожими
+подписями почти наверняка совпадают хотя бы в одной полосе, поэтому
+кандидаты находятся одним запросом по BANDS ключам, а сходство
+проверяется только для них.
+"""
+import hashlib
+import re
+
+import numpy as np
+from django.conf import settings
+
+from .models import PostBucket, PostSignature
+
+SHINGLE_SIZE = 5
+BANDS = 16
+ROWS = 8
+NUM_PERM = BANDS * ROWS
+
+#  base для полиномиального хэша шингла и параметры функций вида
+#  (a * x + b) >> 32 в арифметике по модулю 2 ** 64
+_BASE = np.uint64(1000003)
+_rng = np.random.RandomState(20200301)
+_A = (_rng.randint(1, 2 ** 31, NUM_PERM, dtype=np.uint64) << np.uint64(32)
+      | _rng.randint(0, 2 ** 31, NUM_PERM, dtype=np.uint64)
+      | np.uint64(1))
+_B = _rng.randint(0, 2 ** 62, NUM_PERM, dtype=np.uint64)
+
+_NON_WORD = re.compile(r'[\W_]+')
+
+
+def normalize(text):
+    return _NON_WORD.sub(' ', text.lower()).strip()
+
+
+def shingles(text):
+    """Хэши всех шинглов текста, без повторов."""
+    codes = np.frombuffer(normalize(text).encode('utf-32-le'),
+                          dtype=np.uint32).astype(np.uint64)
+    size = min(SHINGLE_SIZE, len(codes))
+    count = len(codes) - size + 1 if size else 0
+    hashes = np.zeros(count, dtype=np.uint64)
+    for offset in range(size):
+        hashes = hashes * _BASE + codes[offset:offset + count]
+    return np.unique(hashes & np.uint64(0xFFFFFFFF))
+
+
+def signature(text):
+    """MinHash-подпись текста: NUM_PERM чисел uint32."""
+    hashes = shingles(text)
+    if not len(hashes):
+        return None
+    with np.errstate(over='ignore'):
+        permuted = (_A[:, None] * hashes[None, :] + _B[:, None])
+    return (permuted >> np.uint64(32)).min(axis=1).astype(np.uint32)
+
+
+def similarity(first, second):
+    return float(np.mean(first == second))
+
+
+def bucket_keys(sig):
+    keys = []
+    for band, row in enumerate(sig.reshape(BANDS, ROWS)):
+        digest = hashlib.blake2b(bytes([band]) + row.tobytes(),
+                                 digest_size=8).digest()
+        keys.append(int.from_bytes(digest, 'big', signed=True))
+    return keys
+
+
+def load_signature(data):
+    return np.frombuffer(bytes(data), dtype=np.uint32)
+
+
+def should_check(text):
+    return len(normalize(text)) >= settings.DUPLICATE_MIN_LENGTH
+
+
+def find_duplicates(text, exclude=None):
+    """Записи, похожие на текст не меньше DUPLICATE_THRESHOLD."""
+    sig = signature(text)
+    if sig is None:
+        return []
+    candidates = PostSignature.objects.filter(post_id__in=(
+        PostBucket.objects.filter(key__in=bucket_keys(sig))
+        .values('post_id')))
+    if exclude is not None:
+        candidates = candidates.exclude(post_id=exclude)
+    return [
+        candidate.post_id
+        for candidate in candidates
+        if similarity(sig, load_signature(candidate.minhash))
+        >= settings.DUPLICATE_THRESHOLD
+    ]
+
+
+def store(signatures):
+    """Сохраняет подписи {post_id: подпись} и их корзины."""
+    PostBucket.objects.filter(post_id__in=signatures).delete()
+    PostSignature.objects.filter(post_id__in=signatures).delete()
+    signatures = {post_id: sig for post_id, sig in signatures.items()
+                  if sig is not None}
+    PostSignature.objects.bulk_create([
+        PostSignature(post_id=post_id, minhash=sig.tobytes())
+        for post_id, sig in signatures.items()
+    ])
+    PostBucket.objects.bulk_create([
+        PostBucket(post_id=post_id, key=key)
+        for post_id, sig in signatures.items()
+        for key in bucket_keys(sig)
+    ])
+
+
+def post_saved(sender, instance, raw=False, **kwargs):
+    if not raw:
+        store({instance.pk: signature(instance.text)})
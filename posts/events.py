@@ -0,0 +1,175 @@
+"""События о новых записях и комментариях для SSE.
+
+Любой процесс (WSGI, ASGI, manage.py) публикует событие строкой в
+таблицу-журнал в отдельном SQLite-файле. Каждый ASGI-процесс опрашивает
+журнал фоновой задачей и раздаёт новые строки подписчикам через Hub —
+pub/sub на asyncio внутри процесса. Очередь подписчика ограничена:
+при переполнении медленный клиент теряет самые старые события.
+
+Каналы: author:<id> — новые записи автора (их слушают подписчики
+автора по Follow), post:<id> — новые комментарии к записи.
+
+Публикация — по возможности: ошибка SQLite (например, «database is
+locked» при многих писателях) пишется в лог, а запрос, сохранивший
+запись или комментарий, не падает.
+"""
+import asyncio
+import json
+import logging
+import sqlite3
+import threading
+import time
+
+from django.conf import settings
+from django.db import transaction
+from django.urls import reverse
+from django.utils.text import Truncator
+
+logger = logging.getLogger(__name__)
+
+_local = threading.local()
+
+
+def get_connection():
+    connection = getattr(_local, 'connection', None)
+    if connection is None:
+        connection = sqlite3.connect(settings.EVENTS_DB, timeout=5,
+                                     isolation_level=None)
+        connection.execute('PRAGMA journal_mode=WAL')
+        connection.execute(
+            'CREATE TABLE IF NOT EXISTS events ('
+            'id INTEGER PRIMARY KEY AUTOINCREMENT, '
+            'channel TEXT NOT NULL, '
+            'payload TEXT NOT NULL, '
+            'created REAL NOT NULL)'
+        )
+        _local.connection = connection
+    return connection
+
+
+def publish(channel, event_type, data):
+    if not settings.EVENTS_ENABLED:
+        return
+    payload = json.dumps({'type': event_type, 'data': data},
+                         ensure_ascii=False)
+    try:
+        get_connection().execute(
+            'INSERT INTO events (channel, payload, created) VALUES (?, ?, ?)',
+            (channel, payload, time.time()),
+        )
+    except sqlite3.Error:
+        logger.exception('Не удалось опубликовать событие в %s', channel)
+
+
+def publish_post(post):
+    publish(f'author:{post.author_id}', 'post', {
+        'id': post.pk,
+        'author': post.author.username,
+        'text': Truncator(post.text).chars(200),
+        'url': reverse('post', args=[post.author.username, post.pk]),
+    })
+
+
+def publish_comment(comment, username):
+    publish(f'post:{comment.post_id}', 'comment', {
+        'id': comment.pk,
+        'author': username,
+        'text_html': comment.text_html,
+    })
+
+
+def post_created(sender, instance, created, **kwargs):
+    if created and settings.EVENTS_ENABLED:
+        transaction.on_commit(lambda: publish_post(instance))
+
+
+def comment_created(sender, instance, created, **kwargs):
+    if created and settings.EVENTS_ENABLED:
+        transaction.on_commit(
+            lambda: publish_comment(instance, instance.author.username))
+
+
+def read_since(last_id, limit=1000):
+    return get_connection().execute(
+        'SELECT id, channel, payload FROM events WHERE id > ? '
+        'ORDER BY id LIMIT ?', (last_id, limit),
+    ).fetchall()
+
+
+def last_event_id():
+    row = get_connection().execute('SELECT MAX(id) FROM events').fetchone()
+    return row[0] or 0
+
+
+def prune():
+    get_connection().execute(
+        'DELETE FROM events WHERE created < ?',
+        (time.time() - settings.EVENTS_RETENTION,),
+    )
+
+
+class Subscription:
+    def __init__(self, hub, channels):
+        self.hub = hub
+        self.channels = channels
+        self.queue = asyncio.Queue(maxsize=settings.EVENTS_QUEUE_SIZE)
+
+    def put(self, event):
+        if self.queue.full():
+            self.queue.get_nowait()
+        self.queue.put_nowait(event)
+
+    def close(self):
+        self.hub.unsubscribe(self)
+
+
+class Hub:
+    def __init__(self):
+        self.channels = {}
+        self.connections = 0
+        self.poller = None
+
+    def subscribe(self, channels):
+        subscription = Subscription(self, frozenset(channels))
+        for channel in subscription.channels:
+            self.channels.setdefault(channel, set()).add(subscription)
+        self.connections += 1
+        return subscription
+
+    def unsubscribe(self, subscription):
+        for channel in subscription.channels:
+            subscribers = self.channels.get(channel)
+            if subscribers is not None:
+                subscribers.discard(subscription)
+                if not subscribers:
+                    del self.channels[channel]
+        self.connections -= 1
+
+    def dispatch(self, event_id, channel, payload):
+        subscribers = self.channels.get(channel)
+        if not subscribers:
+            return
+        event = (event_id, json.loads(payload))
+        for subscription in subscribers:
+            subscription.put(event)
+
+    def ensure_poller(self):
+        if self.poller is None or self.poller.done():
+            self.poller = asyncio.ensure_future(self.poll())
+
+    async def poll(self):
+        loop = asyncio.get_event_loop()
+        last_id = await loop.run_in_executor(None, last_event_id)
+        last_prune = time.time()
+        while True:
+            await asyncio.sleep(settings.EVENTS_POLL_INTERVAL)
+            rows = await loop.run_in_executor(None, read_since, last_id)
+            for event_id, channel, payload in rows:
+                self.dispatch(event_id, channel, payload)
+                last_id = event_id
+            if time.time() - last_prune > settings.EVENTS_RETENTION:
+                await loop.run_in_executor(None, prune)
+                last_prune = time.time()
+
+
+hub = Hub()
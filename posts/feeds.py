@@ -0,0 +1,163 @@
+"""Atom и RSS ленты: все записи, записи группы и записи автора.
+
+Записи берутся одним запросом values() с автором и группой и пишутся
+в ответ по мере чтения, без сборки документа в памяти. В ленту попадает
+не больше FEED_MAX_ITEMS записей не старше FEED_MAX_AGE_DAYS дней.
+
+Условный GET сверяет ETag по id и Post.updated записей ленты, так что
+правка или удаление любой из них отдаёт новую ленту, а не 304.
+Last-Modified — самое позднее Post.updated для клиентов без ETag.
+"""
+import hashlib
+from datetime import timedelta
+from xml.sax.saxutils import escape, quoteattr
+
+from django.conf import settings
+from django.db.models import Max
+from django.http import StreamingHttpResponse
+from django.shortcuts import get_object_or_404
+from django.urls import reverse
+from django.utils import timezone
+from django.utils.cache import patch_cache_control
+from django.utils.feedgenerator import rfc2822_date, rfc3339_date
+from django.utils.text import Truncator
+from django.views.decorators.http import condition
+
+from .models import Group, Post, User, render_text
+
+CONTENT_TYPES = {
+    'atom': 'application/atom+xml; charset=utf-8',
+    'rss': 'application/rss+xml; charset=utf-8',
+}
+
+FIELDS = ('id', 'text', 'text_html', 'pub_date', 'updated',
+          'author__username', 'group__title')
+
+
+def feed_queryset(filters):
+    since = timezone.now() - timedelta(days=settings.FEED_MAX_AGE_DAYS)
+    return Post.objects.filter(pub_date__gte=since, **filters)
+
+
+def feed_posts(filters):
+    return feed_queryset(filters).values(*FIELDS)[:settings.FEED_MAX_ITEMS]
+
+
+def feed_etag(filters):
+    rows = (feed_queryset(filters)
+            .values_list('id', 'updated')[:settings.FEED_MAX_ITEMS])
+    digest = hashlib.md5()
+    for pk, updated in rows:
+        digest.update(f'{pk}:{updated.isoformat()};'.encode())
+    return digest.hexdigest()
+
+
+def last_modified(filters):
+    return (feed_queryset(filters).order_by('-updated')
+            .values_list('updated', flat=True).first())
+
+
+def entry_html(post):
+    return post['text_html'] or render_text(post['text'])
+
+
+def write_atom(request, title, link, posts):
+    #  дата ленты — самая поздняя правка среди её записей
+    updated = (posts.aggregate(updated=Max('updated'))['updated']
+               or timezone.now())
+    yield ('<?xml version="1.0" encoding="utf-8"?>\n'
+           '<feed xmlns="http://www.w3.org/2005/Atom">'
+           f'<title>{escape(title)}</title>'
+           f'<link href={quoteattr(link)} rel="alternate"/>'
+           f'<link href={quoteattr(request.build_absolute_uri())} '
+           'rel="self"/>'
+           f'<id>{escape(link)}</id>'
+           f'<updated>{rfc3339_date(updated)}</updated>')
+    for post in posts.iterator():
+        url = request.build_absolute_uri(
+            reverse('post', args=[post['author__username'], post['id']]))
+        category = ''
+        if post['group__title']:
+            category = f'<category term={quoteattr(post["group__title"])}/>'
+        yield ('<entry>'
+               f'<title>{escape(Truncator(post["text"]).chars(50))}</title>'
+               f'<link href={quoteattr(url)} rel="alternate"/>'
+               f'<id>{escape(url)}</id>'
+               f'<updated>{rfc3339_date(post["updated"])}</updated>'
+               f'<published>{rfc3339_date(post["pub_date"])}</published>'
+               f'<author><name>{escape(post["author__username"])}</name>'
+               '</author>'
+               f'{category}'
+               f'<content type="html">{escape(entry_html(post))}</content>'
+               '</entry>')
+    yield '</feed>'
+
+
+def write_rss(request, title, link, posts):
+    yield ('<?xml version="1.0" encoding="utf-8"?>\n'
+           '<rss version="2.0" '
+           'xmlns:dc="http://purl.org/dc/elements/1.1/"><channel>'
+           f'<title>{escape(title)}</title>'
+           f'<link>{escape(link)}</link>'
+           f'<description>{escape(title)}</description>'
+           f'<lastBuildDate>{rfc2822_date(timezone.now())}</lastBuildDate>')
+    for post in posts.iterator():
+        url = request.build_absolute_uri(
+            reverse('post', args=[post['author__username'], post['id']]))
+        category = ''
+        if post['group__title']:
+            category = f'<category>{escape(post["group__title"])}</category>'
+        yield ('<item>'
+               f'<title>{escape(Truncator(post["text"]).chars(50))}</title>'
+               f'<link>{escape(url)}</link>'
+               f'<guid>{escape(url)}</guid>'
+               f'<pubDate>{rfc2822_date(post["pub_date"])}</pubDate>'
+               f'<dc:creator>{escape(post["author__username"])}'
+               '</dc:creator>'
+               f'{category}'
+               f'<description>{escape(entry_html(post))}</description>'
+               '</item>')
+    yield '</channel></rss>'
+
+
+WRITERS = {'atom': write_atom, 'rss': write_rss}
+
+
+def feed_response(request, fmt, title, link, filters):
+    writer = WRITERS[fmt]
+    response = StreamingHttpResponse(
+        writer(request, title, request.build_absolute_uri(link),
+               feed_posts(filters)),
+        content_type=CONTENT_TYPES[fmt],
+    )
+    patch_cache_control(response, public=True,
+                        max_age=settings.FEED_CACHE_SECONDS)
+    return response
+
+
+@condition(etag_func=lambda request, fmt: feed_etag({}),
+           last_modified_func=lambda request, fmt: last_modified({}))
+def index_feed(request, fmt):
+    return feed_response(request, fmt, 'Последние обновления на сайте',
+                         reverse('index'), {})
+
+
+@condition(etag_func=lambda request, slug, fmt:
+           feed_etag({'group__slug': slug}),
+           last_modified_func=lambda request, slug, fmt:
+           last_modified({'group__slug': slug}))
+def group_feed(request, slug, fmt):
+    group = get_object_or_404(Group, slug=slug)
+    return feed_response(request, fmt, f'Записи сообщества {group.title}',
+                         reverse('group', args=[slug]), {'group': group})
+
+
+@condition(etag_func=lambda request, username, fmt:
+           feed_etag({'author__username': username}),
+           last_modified_func=lambda request, username, fmt:
+           last_modified({'author__username': username}))
+def profile_feed(request, username, fmt):
+    author = get_object_or_404(User, username=username)
+    return feed_response(request, fmt, f'Записи пользователя {username}',
+                         reverse('profile', args=[username]),
+                         {'author': author})
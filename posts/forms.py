@@ -8,6 +8,18 @@ class PostCreateForm(forms.ModelForm):
         model = Post
         fields = ['group', 'text', 'image']
 
+    def clean_text(self):
+        #  NumPy загружается при первой проверке, а не при старте процесса
+        from . import duplicates
+
+        text = self.cleaned_data['text']
+        if (duplicates.should_check(text)
+                and duplicates.find_duplicates(text,
+                                               exclude=self.instance.pk)):
+            raise forms.ValidationError(
+                'Почти такая же запись уже опубликована')
+        return text
+
 
 class CommentForm(forms.ModelForm):
     class Meta:
@@ -0,0 +1,18 @@
+"""Кэшированные фрагменты лент из index.html и follow.html.
+
+Фрагменты различаются по пользователю ({% cache 20 page user.pk %}),
+потому что в карточках есть его отметки «нравится». Сбрасываются
+фрагменты анонимных пользователей и переданных пользователей.
+"""
+from django.core.cache import cache
+from django.core.cache.utils import make_template_fragment_key
+
+CACHED_FRAGMENTS = ('index_page', 'page')
+
+
+def invalidate(user_ids=()):
+    cache.delete_many([
+        make_template_fragment_key(name, [user_id])
+        for name in CACHED_FRAGMENTS
+        for user_id in {None, *user_ids}
+    ])
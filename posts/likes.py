@@ -0,0 +1,79 @@
+"""Отметки «нравится».
+
+Сама отметка — строка Like с уникальной парой (пользователь, запись).
+Число отметок хранится в LIKE_COUNTER_SHARDS строках LikeCounter на запись:
+каждая отметка увеличивает случайную из них, поэтому одновременные
+отметки популярной записи не ждут блокировку одной строки. Для страницы
+ленты число отметок и отметки текущего пользователя читаются двумя
+запросами на все карточки сразу.
+"""
+import random
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import F, Sum
+
+from .models import Like, LikeCounter
+
+
+def bump(post_id, delta):
+    shard = random.randrange(settings.LIKE_COUNTER_SHARDS)
+    counter = LikeCounter.objects.filter(post_id=post_id, shard=shard)
+    if counter.update(count=F('count') + delta):
+        return
+    try:
+        with transaction.atomic():
+            LikeCounter.objects.create(post_id=post_id, shard=shard,
+                                       count=delta)
+    except IntegrityError:
+        #  строку этой части успел создать параллельный запрос
+        counter.update(count=F('count') + delta)
+
+
+def like(user, post_id):
+    """Ставит отметку; False, если она уже стояла."""
+    with transaction.atomic():
+        try:
+            with transaction.atomic():
+                Like.objects.create(user=user, post_id=post_id)
+        except IntegrityError:
+            return False
+        bump(post_id, 1)
+    return True
+
+
+def unlike(user, post_id):
+    """Снимает отметку; False, если её не было."""
+    with transaction.atomic():
+        deleted, _ = Like.objects.filter(user=user, post_id=post_id).delete()
+        if deleted:
+            bump(post_id, -1)
+    return bool(deleted)
+
+
+def toggle(user, post_id):
+    if not unlike(user, post_id):
+        like(user, post_id)
+
+
+def like_counts(post_ids):
+    return dict(
+        LikeCounter.objects.filter(post_id__in=post_ids)
+        .values('post_id').annotate(total=Sum('count'))
+        .values_list('post_id', 'total')
+    )
+
+
+def attach_likes(posts, user):
+    """Проставляет записям like_count и liked; возвращает список записей."""
+    posts = list(posts)
+    ids = [post.pk for post in posts]
+    counts = like_counts(ids) if ids else {}
+    liked = set()
+    if ids and user.is_authenticated:
+        liked = set(Like.objects.filter(user=user, post_id__in=ids)
+                    .values_list('post_id', flat=True))
+    for post in posts:
+        post.like_count = counts.get(post.pk, 0)
+        post.liked = post.pk in liked
+    return posts
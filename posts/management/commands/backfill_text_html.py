@@ -0,0 +1,37 @@
+from django.core.management.base import BaseCommand
+
+from posts.models import Comment, Post, render_text
+
+
+class Command(BaseCommand):
+    help = 'Заполняет text_html у записей и комментариев пачками'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000)
+        parser.add_argument(
+            '--force', action='store_true',
+            help='Пересчитать text_html и у уже заполненных строк',
+        )
+
+    def handle(self, *args, **options):
+        for model in (Post, Comment):
+            updated = self.backfill(model, options['batch_size'],
+                                    options['force'])
+            self.stdout.write(f'{model.__name__}: обновлено {updated}')
+
+    def backfill(self, model, batch_size, force):
+        queryset = model.objects.only('pk', 'text').order_by('pk')
+        if not force:
+            queryset = queryset.filter(text_html='')
+
+        updated = 0
+        last_pk = 0
+        while True:
+            batch = list(queryset.filter(pk__gt=last_pk)[:batch_size])
+            if not batch:
+                return updated
+            for obj in batch:
+                obj.text_html = render_text(obj.text)
+            model.objects.bulk_update(batch, ['text_html'])
+            updated += len(batch)
+            last_pk = batch[-1].pk
@@ -0,0 +1,110 @@
+import hashlib
+import os
+import shutil
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Count
+from sorl.thumbnail import delete as delete_thumbnails
+from sorl.thumbnail.images import ImageFile
+
+from posts.models import ImageBlob, Post
+from posts.storage import content_name, image_storage, is_content_name
+
+PREFIX = 'posts'
+CHUNK_SIZE = 1024 * 1024
+
+
+def hash_file(path):
+    sha256 = hashlib.sha256()
+    with open(path, 'rb') as source:
+        for chunk in iter(lambda: source.read(CHUNK_SIZE), b''):
+            sha256.update(chunk)
+    return sha256.hexdigest()
+
+
+class Command(BaseCommand):
+    help = ('Переносит картинки из MEDIA_ROOT/posts/ в хранилище по '
+            'содержимому, удаляет копии и пересчитывает ссылки')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=os.cpu_count())
+        parser.add_argument(
+            '--dry-run', action='store_true',
+            help='Только посчитать, сколько места освободится',
+        )
+
+    def handle(self, *args, **options):
+        names = self.legacy_names()
+        with ThreadPoolExecutor(max_workers=options['workers']) as executor:
+            digests = executor.map(
+                hash_file, [image_storage.path(name) for name in names])
+            groups = {}
+            for name, digest in zip(names, digests):
+                ext = os.path.splitext(name)[1]
+                groups.setdefault(content_name(PREFIX, digest, ext),
+                                  []).append(name)
+
+        reclaimed = 0
+        for target, sources in groups.items():
+            size = image_storage.size(sources[0])
+            copies = len(sources) - (not image_storage.exists(target))
+            reclaimed += size * copies
+            if not options['dry_run']:
+                self.move(target, sources)
+
+        if not options['dry_run']:
+            self.recount()
+        self.stdout.write(
+            f'Файлов: {len(names)}, уникальных: {len(groups)}, '
+            f'освобождено байт: {reclaimed}')
+
+    def legacy_names(self):
+        root = image_storage.path(PREFIX)
+        names = []
+        for directory, _, files in os.walk(root):
+            for filename in files:
+                name = os.path.relpath(os.path.join(directory, filename),
+                                       image_storage.location)
+                name = name.replace(os.sep, '/')
+                if not is_content_name(name) and not name.endswith('.upload'):
+                    names.append(name)
+        return sorted(names)
+
+    def move(self, target, sources):
+        path = image_storage.path(target)
+        if not os.path.exists(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            try:
+                os.link(image_storage.path(sources[0]), path)
+            except OSError:
+                shutil.copyfile(image_storage.path(sources[0]), path)
+
+        #  сначала записи ссылаются на новый файл, потом удаляются старые
+        with transaction.atomic():
+            Post.objects.filter(image__in=sources).update(image=target)
+        for name in sources:
+            delete_thumbnails(ImageFile(name, image_storage), delete_file=True)
+
+    def recount(self):
+        refs = dict(
+            Post.objects.filter(image__startswith=f'{PREFIX}/')
+            .order_by().values('image').annotate(refs=Count('pk'))
+            .values_list('image', 'refs')
+        )
+        refs = {name: count for name, count in refs.items()
+                if is_content_name(name)}
+        with transaction.atomic():
+            ImageBlob.objects.exclude(name__in=refs).delete()
+            blobs = ImageBlob.objects.in_bulk(list(refs))
+            for name, blob in blobs.items():
+                blob.refs = refs[name]
+            ImageBlob.objects.bulk_update(blobs.values(), ['refs'],
+                                          batch_size=1000)
+            ImageBlob.objects.bulk_create([
+                ImageBlob(name=name, refs=count,
+                          size=image_storage.size(name))
+                for name, count in refs.items()
+                if name not in blobs and image_storage.exists(name)
+            ], batch_size=1000)
@@ -0,0 +1,92 @@
+import glob
+import json
+import os
+from collections import Counter
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+SPEEDSCOPE_SCHEMA = 'https://www.speedscope.app/file-format-schema.json'
+
+
+def read_collapsed(path):
+    counter = Counter()
+    with open(path, encoding='utf-8') as profile:
+        for line in profile:
+            stack, _, count = line.rstrip('\n').rpartition(' ')
+            if stack:
+                counter[stack] += int(count)
+    return counter
+
+
+def to_speedscope(profiles):
+    frames = {}
+    result = []
+    for url_name, counter in profiles.items():
+        samples = []
+        weights = []
+        for stack, count in counter.most_common():
+            samples.append([frames.setdefault(name, len(frames))
+                            for name in stack.split(';')])
+            weights.append(count)
+        result.append({
+            'type': 'sampled',
+            'name': url_name,
+            'unit': 'none',
+            'startValue': 0,
+            'endValue': sum(weights),
+            'samples': samples,
+            'weights': weights,
+        })
+    return {
+        '$schema': SPEEDSCOPE_SCHEMA,
+        'name': 'yatube',
+        'exporter': 'yatube export_profiles',
+        'shared': {'frames': [{'name': name} for name in frames]},
+        'profiles': result,
+    }
+
+
+class Command(BaseCommand):
+    help = ('Собирает стеки профилировщика из PROFILER_DIR в формат '
+            'collapsed (flamegraph.pl) или speedscope')
+
+    def add_arguments(self, parser):
+        parser.add_argument('url_names', nargs='*',
+                            help='Имена URL; по умолчанию все')
+        parser.add_argument('--format', choices=('collapsed', 'speedscope'),
+                            default='speedscope')
+        parser.add_argument('--output', '-o', default='-')
+        parser.add_argument('--clear', action='store_true',
+                            help='Удалить собранные стеки после выгрузки')
+
+    def handle(self, *args, **options):
+        paths = sorted(glob.glob(
+            os.path.join(settings.PROFILER_DIR, '*.collapsed')))
+        profiles = {}
+        for path in paths:
+            url_name = os.path.basename(path)[:-len('.collapsed')]
+            if not options['url_names'] or url_name in options['url_names']:
+                profiles[url_name] = read_collapsed(path)
+        if not profiles:
+            raise CommandError('Нет собранных стеков')
+
+        if options['format'] == 'speedscope':
+            output = json.dumps(to_speedscope(profiles), ensure_ascii=False)
+        else:
+            output = ''.join(
+                f'{url_name};{stack} {count}\n'
+                for url_name, counter in profiles.items()
+                for stack, count in counter.most_common()
+            )
+
+        if options['output'] == '-':
+            self.stdout.write(output)
+        else:
+            with open(options['output'], 'w', encoding='utf-8') as target:
+                target.write(output)
+
+        if options['clear']:
+            for url_name in profiles:
+                os.remove(os.path.join(settings.PROFILER_DIR,
+                                       f'{url_name}.collapsed'))
@@ -0,0 +1,62 @@
+import os
+import shutil
+from functools import partial
+from multiprocessing import Pool
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import connections
+from django.utils import timezone
+
+from posts import snapshot
+
+
+class Command(BaseCommand):
+    help = ('Сохраняет публичные страницы ленты, групп, профилей и записей '
+            'в SNAPSHOT_DIR; повторный запуск обновляет только изменённые')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=os.cpu_count())
+        parser.add_argument(
+            '--full', action='store_true',
+            help='Собрать все страницы заново и убрать удалённые записи',
+        )
+
+    def handle(self, *args, **options):
+        root = settings.SNAPSHOT_DIR
+        since = None if options['full'] else snapshot.read_state(root)
+        #  изменения во время сборки попадут в следующий запуск
+        until = timezone.now()
+
+        if since is None:
+            #  полная сборка идёт рядом и подменяет каталог в конце
+            target = f'{root}.new'
+            shutil.rmtree(target, ignore_errors=True)
+            pages = snapshot.all_pages()
+        else:
+            target = root
+            pages = snapshot.changed_pages(since)
+
+        render = partial(snapshot.render_page, target)
+        rendered = 0
+        if options['workers'] > 1 and len(pages) > 1:
+            #  процессы открывают свои соединения с базой
+            connections.close_all()
+            with Pool(options['workers']) as pool:
+                rendered = sum(pool.imap_unordered(render, pages,
+                                                   chunksize=16))
+        else:
+            rendered = sum(map(render, pages))
+
+        os.makedirs(target, exist_ok=True)
+        snapshot.write_state(target, until)
+        snapshot.prune_changes(until)
+        if target != root:
+            shutil.rmtree(f'{root}.old', ignore_errors=True)
+            if os.path.exists(root):
+                os.rename(root, f'{root}.old')
+            os.rename(target, root)
+            shutil.rmtree(f'{root}.old', ignore_errors=True)
+
+        changes = '' if since is None else f' (изменения с {since})'
+        self.stdout.write(f'Страниц: {rendered} из {len(pages)}{changes}')
@@ -0,0 +1,25 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from posts import comment_queue
+
+
+class Command(BaseCommand):
+    help = 'Записывает в базу комментарии из очереди отложенной записи'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500)
+        parser.add_argument(
+            '--interval', type=float, default=0,
+            help='Работать в цикле, сбрасывая очередь раз в N секунд',
+        )
+
+    def handle(self, *args, **options):
+        while True:
+            written = comment_queue.flush(options['batch_size'])
+            if written:
+                self.stdout.write(f'Записано комментариев: {written}')
+            if not options['interval']:
+                break
+            time.sleep(options['interval'])
@@ -0,0 +1,26 @@
+from django.core.management.base import BaseCommand
+
+from posts.models import Post
+from posts.tags import index_posts
+
+
+class Command(BaseCommand):
+    help = 'Заполняет хэштеги и упоминания у существующих записей пачками'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        queryset = Post.objects.only('pk', 'text', 'pub_date').order_by('pk')
+
+        indexed = 0
+        last_pk = 0
+        while True:
+            batch = list(queryset.filter(pk__gt=last_pk)
+                         [:options['batch_size']])
+            if not batch:
+                break
+            index_posts(batch)
+            indexed += len(batch)
+            last_pk = batch[-1].pk
+        self.stdout.write(f'Post: обработано {indexed}')
@@ -0,0 +1,88 @@
+import os
+from multiprocessing import Pool
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import connections
+from django.db.models import Count
+
+from posts import duplicates
+from posts.models import Post, PostBucket, PostSignature
+
+
+def sign_batch(rows):
+    return [(pk, duplicates.signature(text)) for pk, text in rows]
+
+
+class Command(BaseCommand):
+    help = ('Пересчитывает MinHash-подписи всех записей в нескольких '
+            'процессах и выводит пары почти одинаковых записей')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=os.cpu_count())
+        parser.add_argument('--batch-size', type=int, default=1000)
+        parser.add_argument('--threshold', type=float,
+                            default=settings.DUPLICATE_THRESHOLD)
+
+    def handle(self, *args, **options):
+        indexed = self.index(options['workers'], options['batch_size'])
+        self.stdout.write(f'Подписей пересчитано: {indexed}')
+
+        pairs = self.find_pairs(options['threshold'])
+        for first, second, score in pairs:
+            self.stdout.write(f'{first}\t{second}\t{score:.2f}')
+        self.stdout.write(f'Похожих пар: {len(pairs)}')
+
+    def index(self, workers, batch_size):
+        queryset = Post.objects.values_list('pk', 'text').order_by('pk')
+        chunk = max(1, batch_size // (workers * 4))
+        #  дочерние процессы к базе не обращаются, но не должны
+        #  унаследовать открытые соединения
+        connections.close_all()
+
+        indexed = 0
+        last_pk = 0
+        with Pool(workers) as pool:
+            while True:
+                rows = list(queryset.filter(pk__gt=last_pk)[:batch_size])
+                if not rows:
+                    return indexed
+                chunks = [rows[i:i + chunk]
+                          for i in range(0, len(rows), chunk)]
+                signatures = {}
+                for signed in pool.map(sign_batch, chunks):
+                    signatures.update(signed)
+                duplicates.store(signatures)
+                indexed += len(rows)
+                last_pk = rows[-1][0]
+
+    def find_pairs(self, threshold):
+        keys = (PostBucket.objects.values('key')
+                .annotate(posts=Count('post_id')).filter(posts__gt=1)
+                .values('key'))
+        buckets = {}
+        for key, post_id in (PostBucket.objects.filter(key__in=keys)
+                             .values_list('key', 'post_id')):
+            buckets.setdefault(key, []).append(post_id)
+
+        candidates = set()
+        for post_ids in buckets.values():
+            post_ids.sort()
+            candidates.update(
+                (first, second)
+                for i, first in enumerate(post_ids)
+                for second in post_ids[i + 1:]
+            )
+
+        involved = {post_id for pair in candidates for post_id in pair}
+        signatures = {
+            row.post_id: duplicates.load_signature(row.minhash)
+            for row in PostSignature.objects.filter(post_id__in=involved)
+        }
+        pairs = []
+        for first, second in sorted(candidates):
+            score = duplicates.similarity(signatures[first],
+                                          signatures[second])
+            if score >= threshold:
+                pairs.append((first, second, score))
+        return pairs
@@ -0,0 +1,68 @@
+import os
+from datetime import timedelta
+from multiprocessing import Pool
+
+from django.contrib.sites.models import Site
+from django.core.management.base import BaseCommand
+from django.db import connections
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from posts import digests
+
+
+def send_shard(args):
+    return digests.send_shard(*args)
+
+
+class Command(BaseCommand):
+    help = ('Рассылает письма о новых записях авторов, на которых '
+            'подписаны пользователи; прерванный запуск продолжается')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=os.cpu_count())
+        parser.add_argument(
+            '--shards', type=int, default=0,
+            help='На сколько частей делить подписчиков (по умолчанию '
+                 'четыре на процесс)',
+        )
+
+    def handle(self, *args, **options):
+        run = digests.read_json(digests.RUN_FILE)
+        if run is None:
+            last_run = digests.read_json(digests.LAST_RUN_FILE, {})
+            until = timezone.now()
+            since = (parse_datetime(last_run['until']) if last_run
+                     else until - timedelta(days=1))
+            run = {
+                'since': since.isoformat(),
+                'until': until.isoformat(),
+                'shards': options['shards'] or options['workers'] * 4,
+            }
+            digests.write_json(digests.RUN_FILE, run)
+        else:
+            self.stdout.write(f'Продолжаю рассылку за {run["since"]} — '
+                              f'{run["until"]}')
+
+        since = parse_datetime(run['since'])
+        until = parse_datetime(run['until'])
+        site_url = f'https://{Site.objects.get_current().domain}'
+        tasks = [(since, until, shard, run['shards'], site_url)
+                 for shard in range(run['shards'])]
+
+        sent = 0
+        if options['workers'] > 1:
+            #  процессы открывают свои соединения с базой
+            connections.close_all()
+            with Pool(options['workers']) as pool:
+                for shard, count in pool.imap_unordered(send_shard, tasks):
+                    sent += count
+        else:
+            for task in tasks:
+                sent += send_shard(task)[1]
+
+        digests.write_json(digests.LAST_RUN_FILE, {'until': run['until']})
+        for shard in range(run['shards']):
+            os.remove(digests.state_path(digests.shard_file(shard)))
+        os.remove(digests.state_path(digests.RUN_FILE))
+        self.stdout.write(f'Отправлено писем: {sent}')
@@ -0,0 +1,30 @@
+import os
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from posts import warmup
+
+
+class Command(BaseCommand):
+    help = ('Прогревает общие кэши после выкладки: миниатюры и страницы '
+            'популярных групп и авторов')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--budget', type=float,
+                            default=settings.WARMUP_BUDGET,
+                            help='Сколько секунд можно потратить')
+        parser.add_argument('--top', type=int, default=settings.WARMUP_TOP,
+                            help='Сколько групп и авторов прогревать')
+        parser.add_argument('--workers', type=int, default=os.cpu_count())
+
+    def handle(self, *args, **options):
+        budget = warmup.Budget(options['budget'])
+        #  шаблоны и URL прогреваются в самих воркерах (WARMUP_ON_BOOT):
+        #  кэши этого процесса пропадут вместе с ним
+        result = warmup.warm_shared(budget, options['top'],
+                                    options['workers'])
+        for name, (done, total) in result.items():
+            self.stdout.write(f'{name}: {done} из {total}')
+        if budget.exhausted():
+            self.stdout.write('Время прогрева истекло')
@@ -1,9 +1,27 @@
 from django.contrib.auth import get_user_model
-from django.db import models
+from django.db import models, transaction
+from django.template.defaultfilters import linebreaksbr
+from django.utils import timezone
+
+from .storage import image_changed, image_storage
 
 User = get_user_model()
 
 
+def render_text(text):
+    """HTML текста, как его выводит фильтр linebreaksbr в шаблонах."""
+    return str(linebreaksbr(text, autoescape=True))
+
+
+class TextQuerySet(models.QuerySet):
+    def update(self, **kwargs):
+        #  update() минует save(): устаревший HTML стираем, и шаблоны
+        #  выводят text, пока backfill_text_html не заполнит его заново
+        if 'text' in kwargs and 'text_html' not in kwargs:
+            kwargs['text_html'] = ''
+        return super().update(**kwargs)
+
+
 class Group(models.Model):
     title = models.CharField(max_length=200, verbose_name='Название группы',
                              help_text='Введите название группы')
@@ -17,22 +35,55 @@ class Group(models.Model):
 class Post(models.Model):
     text = models.TextField(verbose_name='Текст записи',
                             help_text='Введите текст записи')
-    pub_date = models.DateTimeField('date published', auto_now_add=True)
+    text_html = models.TextField(blank=True, default='', editable=False)
+    pub_date = models.DateTimeField('date published', auto_now_add=True,
+                                    db_index=True)
+    updated = models.DateTimeField(auto_now=True, db_index=True)
     author = models.ForeignKey(User, on_delete=models.CASCADE,
                                related_name='posts', verbose_name='Автор')
     group = models.ForeignKey(Group, on_delete=models.SET_NULL,
                               related_name='posts', blank=True, null=True,
                               verbose_name='Группа',
                               help_text='Выберите группу для записи')
-    image = models.ImageField(upload_to='posts/', blank=True, null=True)
+    image = models.ImageField(upload_to='posts/', storage=image_storage,
+                              blank=True, null=True)
+    views = models.PositiveIntegerField(default=0, editable=False,
+                                        verbose_name='Просмотры')
+
+    objects = TextQuerySet.as_manager()
 
     class Meta:
         ordering = ['-pub_date']
         get_latest_by = 'pub_date'
+        indexes = [
+            models.Index(fields=['group', '-pub_date'],
+                         name='post_group_pub_date_idx'),
+            models.Index(fields=['author', '-pub_date'],
+                         name='post_author_pub_date_idx'),
+        ]
 
     def __str__(self):
         return self.text[:15]
 
+    def save(self, *args, **kwargs):
+        self.text_html = render_text(self.text)
+        update_fields = kwargs.get('update_fields')
+        if (update_fields is not None
+                and not {'image', 'group'} & set(update_fields)):
+            return super().save(*args, **kwargs)
+        #  ссылка на картинку меняется вместе с записью: откат транзакции
+        #  или ошибка сохранения не оставят лишней ссылки
+        with transaction.atomic():
+            old = {}
+            if self.pk is not None:
+                old = (Post.objects.filter(pk=self.pk)
+                       .values('image', 'group_id').first() or {})
+            super().save(*args, **kwargs)
+            image_changed(old.get('image') or '', self.image.name or '')
+            #  лента прежней группы больше не показывает запись
+            if old.get('group_id') and old['group_id'] != self.group_id:
+                ListingChange.objects.create(group_id=old['group_id'])
+
 
 class Comment(models.Model):
     post = models.ForeignKey(Post, related_name='comments', blank=True,
@@ -42,7 +93,20 @@ class Comment(models.Model):
                                null=False)
     text = models.TextField(verbose_name='Комментарий',
                             help_text='Введите комментарий')
-    created = models.DateTimeField('date published', auto_now_add=True)
+    text_html = models.TextField(blank=True, default='', editable=False)
+    #  не auto_now_add: комментарии из очереди отложенной записи хранят
+    #  время отправки, а не время вставки
+    created = models.DateTimeField('date published', default=timezone.now,
+                                   editable=False, db_index=True)
+    #  uid записи в очереди отложенной записи (posts/comment_queue.py)
+    queue_uid = models.CharField(max_length=32, unique=True, null=True,
+                                 blank=True, editable=False)
+
+    objects = TextQuerySet.as_manager()
+
+    def save(self, *args, **kwargs):
+        self.text_html = render_text(self.text)
+        super().save(*args, **kwargs)
 
 
 class Follow(models.Model):
@@ -58,3 +122,106 @@ class Follow(models.Model):
             models.UniqueConstraint(fields=['user', 'author'],
                                     name='unique following')
         ]
+
+
+class ListingChange(models.Model):
+    """Лента, которую не найти по Post.updated: группа, из которой ушла
+    запись, или профиль, у которого изменились подписки."""
+    group = models.ForeignKey(Group, on_delete=models.CASCADE, null=True,
+                              related_name='+')
+    user = models.ForeignKey(User, on_delete=models.CASCADE, null=True,
+                             related_name='+')
+    created = models.DateTimeField(default=timezone.now, db_index=True)
+
+
+class Like(models.Model):
+    user = models.ForeignKey(User, on_delete=models.CASCADE,
+                             related_name='likes')
+    post = models.ForeignKey(Post, on_delete=models.CASCADE,
+                             related_name='likes')
+    created = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['user', 'post'],
+                                    name='unique like')
+        ]
+
+
+class LikeCounter(models.Model):
+    """Часть счётчика отметок записи; сумма по shard — число отметок."""
+    post = models.ForeignKey(Post, on_delete=models.CASCADE,
+                             related_name='like_counters')
+    shard = models.PositiveSmallIntegerField()
+    count = models.IntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['post', 'shard'],
+                                    name='unique like counter shard')
+        ]
+
+
+class PostSignature(models.Model):
+    """MinHash-подпись текста записи (см. posts/duplicates.py)."""
+    post = models.OneToOneField(Post, on_delete=models.CASCADE,
+                                primary_key=True, related_name='signature')
+    minhash = models.BinaryField()
+
+
+class PostBucket(models.Model):
+    post = models.ForeignKey(Post, on_delete=models.CASCADE,
+                             related_name='buckets')
+    key = models.BigIntegerField(db_index=True)
+
+
+class ImageBlob(models.Model):
+    """Файл картинки в хранилище по содержимому и число ссылок на него."""
+    name = models.CharField(max_length=255, primary_key=True)
+    size = models.BigIntegerField(default=0)
+    refs = models.PositiveIntegerField(default=0)
+
+
+class Tag(models.Model):
+    name = models.CharField(max_length=50, unique=True)
+
+    def __str__(self):
+        return self.name
+
+
+class PostTag(models.Model):
+    """Хэштег в тексте записи; pub_date — копия даты записи для ленты."""
+    tag = models.ForeignKey(Tag, on_delete=models.CASCADE,
+                            related_name='post_tags')
+    post = models.ForeignKey(Post, on_delete=models.CASCADE,
+                             related_name='post_tags')
+    pub_date = models.DateTimeField()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['tag', 'post'],
+                                    name='unique post tag')
+        ]
+        indexes = [
+            models.Index(fields=['tag', '-pub_date', '-post'],
+                         name='post_tag_pub_date_idx'),
+        ]
+
+
+class Mention(models.Model):
+    """Упоминание пользователя в тексте записи."""
+    user = models.ForeignKey(User, on_delete=models.CASCADE,
+                             related_name='mentions')
+    post = models.ForeignKey(Post, on_delete=models.CASCADE,
+                             related_name='mentions')
+    pub_date = models.DateTimeField()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['user', 'post'],
+                                    name='unique mention')
+        ]
+        indexes = [
+            models.Index(fields=['user', '-pub_date', '-post'],
+                         name='mention_pub_date_idx'),
+        ]
@@ -0,0 +1,106 @@
+"""Кэш страниц ленты для анонимных пользователей.
+
+Страницу по ключу пересчитывает только один процесс: он берёт блокировку
+через cache.add, которая атомарна в общем кэше. Остальные в это время
+получают устаревшую копию, если она ещё в окне stale, или недолго ждут
+результата лидера. Свежесть и окно stale задаются по имени URL
+в settings.PAGE_CACHE.
+"""
+import hashlib
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.http import HttpResponse
+
+LOCK_TIMEOUT = 10
+WAIT_STEP = 0.05
+
+
+def page_key(request):
+    path = hashlib.md5(request.get_full_path().encode()).hexdigest()
+    return f'page_cache:{request.resolver_match.url_name}:{path}'
+
+
+def to_response(entry, state):
+    response = HttpResponse(entry['content'],
+                            content_type=entry['content_type'])
+    response['X-Page-Cache'] = state
+    return response
+
+
+class PageCacheMiddleware:
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        return self.get_response(request)
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        match = request.resolver_match
+        config = settings.PAGE_CACHE.get(match.url_name if match else None)
+        if (config is None or request.method not in ('GET', 'HEAD')
+                or request.user.is_authenticated):
+            return None
+
+        key = page_key(request)
+        entry = cache.get(key)
+        if entry and time.time() - entry['created'] < config['fresh']:
+            return to_response(entry, 'hit')
+
+        if cache.add(f'{key}:lock', True, LOCK_TIMEOUT):
+            captured = False
+            try:
+                response = view_func(request, *view_args, **view_kwargs)
+                captured = self.store(key, response, config)
+            finally:
+                #  потоковую страницу блокировка держит до конца отдачи
+                if not captured:
+                    cache.delete(f'{key}:lock')
+            return response
+
+        if entry:
+            return to_response(entry, 'stale')
+
+        #  устаревшей копии нет — ждём, пока лидер посчитает страницу
+        deadline = time.time() + settings.PAGE_CACHE_WAIT
+        while time.time() < deadline:
+            time.sleep(WAIT_STEP)
+            entry = cache.get(key)
+            if entry:
+                return to_response(entry, 'hit')
+        return None
+
+    def store(self, key, response, config):
+        """Сохраняет страницу; True, если блокировку снимет capture()."""
+        if response.status_code != 200:
+            return False
+        response['X-Page-Cache'] = 'miss'
+        if response.streaming:
+            #  страница сохраняется, когда поток отдан целиком
+            response.streaming_content = self.capture(
+                key, response, config, response.streaming_content)
+            return True
+        if hasattr(response, 'render') and callable(response.render):
+            response.render()
+        self.save(key, response, config, response.content)
+        return False
+
+    def capture(self, key, response, config, chunks):
+        try:
+            content = []
+            for chunk in chunks:
+                content.append(chunk)
+                yield chunk
+            self.save(key, response, config, b''.join(content))
+        finally:
+            #  и при обрыве соединения; неначатый поток освободит
+            #  LOCK_TIMEOUT
+            cache.delete(f'{key}:lock')
+
+    def save(self, key, response, config, content):
+        cache.set(key, {
+            'created': time.time(),
+            'content': content,
+            'content_type': response['Content-Type'],
+        }, config['fresh'] + config['stale'])
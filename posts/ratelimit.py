@@ -0,0 +1,121 @@
+import math
+import time
+from functools import wraps
+
+from django.conf import settings
+from django.core.cache import cache
+from django.shortcuts import render
+
+
+def get_limits(name):
+    return getattr(settings, 'RATELIMITS', {}).get(name, {})
+
+
+def get_client_ip(request):
+    return request.META.get('REMOTE_ADDR', '')
+
+
+def get_ident(request, scope):
+    if scope == 'user':
+        if request.user.is_authenticated:
+            return str(request.user.pk)
+        return None
+    if scope == 'ip':
+        return get_client_ip(request)
+    raise ValueError(f'Неизвестная область лимита: {scope}')
+
+
+def retry_after(limit, period, current, previous, elapsed):
+    """Через сколько секунд следующий запрос уложится в лимит.
+
+    current — уже принятые в текущем окне запросы; следующий разрешён,
+    когда previous * (1 - elapsed / period) + current + 1 <= limit.
+    """
+    if current < limit and previous:
+        wait = period * (1 - (limit - current - 1) / previous) - elapsed
+    elif current:
+        wait = (period - elapsed) + period * (1 - (limit - 1) / current)
+    else:
+        wait = period - elapsed
+    return max(1, math.ceil(wait))
+
+
+def hit(key, limit, period, now=None):
+    """Учитывает запрос в скользящем окне.
+
+    Окно приближается двумя соседними счётчиками фиксированных окон,
+    предыдущий берётся с весом оставшейся доли периода. Счётчики
+    увеличиваются атомарно через cache.incr в общем для процессов кэше
+    (memcached или yatube.cache.FileBasedCache), поэтому лимит
+    соблюдается для всех воркеров вместе.
+
+    Возвращает 0, если запрос разрешён, иначе число секунд для Retry-After.
+    """
+    if now is None:
+        now = time.time()
+    window = int(now // period)
+    elapsed = now - window * period
+    current_key = f'ratelimit:{key}:{window}'
+    previous_key = f'ratelimit:{key}:{window - 1}'
+
+    cache.add(current_key, 0, period * 2)
+    try:
+        current = cache.incr(current_key)
+    except ValueError:
+        #  ключ успел истечь между add и incr
+        cache.add(current_key, 1, period * 2)
+        current = 1
+    previous = cache.get(previous_key, 0)
+
+    if previous * (1 - elapsed / period) + current <= limit:
+        return 0
+
+    #  отклонённые запросы не расходуют лимит
+    cache.decr(current_key)
+    return retry_after(limit, period, current - 1, previous, elapsed)
+
+
+def undo(key, period, now):
+    window = int(now // period)
+    try:
+        cache.decr(f'ratelimit:{key}:{window}')
+    except ValueError:
+        pass
+
+
+def check(request, name):
+    now = time.time()
+    accepted = []
+    for scope, (limit, period) in get_limits(name).items():
+        ident = get_ident(request, scope)
+        if ident is None:
+            continue
+        key = f'{name}:{scope}:{ident}'
+        wait = hit(key, limit, period, now)
+        if wait:
+            for accepted_key, accepted_period in accepted:
+                undo(accepted_key, accepted_period, now)
+            return wait
+        accepted.append((key, period))
+    return 0
+
+
+def too_many_requests(request, wait):
+    response = render(request, 'misc/429.html', {'retry_after': wait},
+                      status=429)
+    response['Retry-After'] = str(wait)
+    return response
+
+
+def ratelimit(name, methods=('POST',)):
+    """Ограничивает частоту запросов к view по пользователю и по IP."""
+    def decorator(view_func):
+        @wraps(view_func)
+        def _wrapped_view(request, *args, **kwargs):
+            if request.method in methods:
+                wait = check(request, name)
+                if wait:
+                    return too_many_requests(request, wait)
+            return view_func(request, *args, **kwargs)
+        return _wrapped_view
+    return decorator
@@ -0,0 +1,162 @@
+"""Статическая копия публичных страниц для анонимных читателей.
+
+manage.py export_snapshot рендерит ленту, группы, профили и записи так,
+как их видит гость, и кладёт HTML в SNAPSHOT_DIR по пути URL: первая
+страница — <путь>/index.html, страница ?page=N — <путь>/page-N.html.
+Фронтовый сервер отдаёт эти файлы запросам без cookie сессии.
+
+Повторный запуск перестраивает только страницы, которых коснулись записи
+(Post.updated) и комментарии, изменённые с прошлого запуска: саму запись,
+страницу ленты, группы и профиля, на которой она лежит, а для новой
+записи — все страницы этих лент, потому что записи на них сдвигаются.
+Ленты из ListingChange — группа, из которой ушла запись, и профили,
+у которых изменились подписки, — перестраиваются целиком. Удалённые
+записи так не заметить — для этого есть --full.
+"""
+import json
+import math
+import os
+
+from django.conf import settings
+from django.contrib.auth.models import AnonymousUser
+from django.db.models import Q
+from django.http import HttpRequest, QueryDict
+from django.urls import resolve, reverse
+from django.utils.dateparse import parse_datetime
+
+from yatube.settings import POST_ON_PAGE
+from .models import Comment, Group, ListingChange, Post, User
+
+STATE_FILE = '.snapshot.json'
+
+
+def read_state(root):
+    try:
+        with open(os.path.join(root, STATE_FILE)) as state:
+            return parse_datetime(json.load(state)['until'])
+    except FileNotFoundError:
+        return None
+
+
+def write_state(root, until):
+    path = os.path.join(root, STATE_FILE)
+    with open(f'{path}.tmp', 'w') as state:
+        json.dump({'until': until.isoformat()}, state)
+    os.replace(f'{path}.tmp', path)
+
+
+def page_count(posts):
+    return max(math.ceil(posts.count() / POST_ON_PAGE), 1)
+
+
+def listings():
+    """Ленты страницы: (имя URL, аргументы, записи)."""
+    yield 'index', (), Post.objects.all()
+    for group in Group.objects.all():
+        yield 'group', (group.slug,), group.posts.all()
+    for user in User.objects.all():
+        yield 'profile', (user.username,), user.posts.all()
+
+
+def all_pages():
+    pages = []
+    for url_name, args, posts in listings():
+        pages += [(url_name, args, number)
+                  for number in range(1, page_count(posts) + 1)]
+    posts = Post.objects.values_list('pk', 'author__username')
+    pages += [('post', (username, pk), 1) for pk, username in posts]
+    return pages
+
+
+def changed_pages(since):
+    commented = Comment.objects.filter(created__gte=since).values('post')
+    changed = (Post.objects.filter(Q(updated__gte=since) | Q(pk__in=commented))
+               .select_related('author', 'group'))
+
+    pages = set()
+    for post in changed:
+        pages.add(('post', (post.author.username, post.pk), 1))
+        post_listings = [('index', (), Post.objects.all()),
+                         ('profile', (post.author.username,),
+                          post.author.posts.all())]
+        if post.group:
+            post_listings.append(('group', (post.group.slug,),
+                                  post.group.posts.all()))
+        for url_name, args, posts in post_listings:
+            if post.pub_date >= since:
+                numbers = range(1, page_count(posts) + 1)
+            else:
+                newer = posts.filter(pub_date__gt=post.pub_date).count()
+                numbers = [newer // POST_ON_PAGE + 1]
+            pages.update((url_name, args, number) for number in numbers)
+
+    changes = (ListingChange.objects.filter(created__gte=since)
+               .select_related('group', 'user'))
+    for change in changes:
+        if change.group:
+            listing = ('group', (change.group.slug,),
+                       change.group.posts.all())
+        else:
+            listing = ('profile', (change.user.username,),
+                       change.user.posts.all())
+        url_name, args, posts = listing
+        pages.update((url_name, args, number)
+                     for number in range(1, page_count(posts) + 1))
+    return sorted(pages)
+
+
+def prune_changes(until):
+    ListingChange.objects.filter(created__lt=until).delete()
+
+
+def follow_changed(sender, instance, raw=False, **kwargs):
+    #  счётчики подписчиков и подписок выводятся на каждой странице профиля
+    if not raw:
+        ListingChange.objects.bulk_create([
+            ListingChange(user_id=instance.author_id),
+            ListingChange(user_id=instance.user_id),
+        ])
+
+
+def page_file(root, path, number):
+    name = 'index.html' if number == 1 else f'page-{number}.html'
+    return os.path.join(root, path.strip('/'), name)
+
+
+def guest_request(path, number):
+    request = HttpRequest()
+    request.method = 'GET'
+    request.path = request.path_info = path
+    request.GET = QueryDict(f'page={number}')
+    request.META = {
+        'SERVER_NAME': next((host.lstrip('.')
+                             for host in settings.ALLOWED_HOSTS
+                             if host != '*'), 'localhost'),
+        'SERVER_PORT': '80',
+    }
+    request.user = AnonymousUser()
+    #  потоковый рендер ленты не читает фрагмент {% cache %} index.html —
+    #  он общий для всех страниц ленты и мог устареть на 20 секунд
+    request.stream_feed = True
+    return request
+
+
+def render_page(root, page):
+    url_name, args, number = page
+    path = reverse(url_name, args=args)
+    request = guest_request(path, number)
+    request.resolver_match = match = resolve(path)
+    response = match.func(request, *match.args, **match.kwargs)
+    content = (b''.join(response.streaming_content)
+               if response.streaming else response.content)
+
+    target = page_file(root, path, number)
+    if response.status_code != 200:
+        if os.path.exists(target):
+            os.remove(target)
+        return False
+    os.makedirs(os.path.dirname(target), exist_ok=True)
+    with open(f'{target}.tmp', 'wb') as html:
+        html.write(content)
+    os.replace(f'{target}.tmp', target)
+    return True
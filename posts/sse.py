@@ -0,0 +1,124 @@
+"""ASGI-приложение Server-Sent Events поверх Django.
+
+    /events/follow/          — новые записи авторов, на которых подписан
+                               пользователь сессии
+    /events/post/<post_id>/  — новые комментарии к записи
+
+Остальные запросы передаются Django. Соединение держит одну корутину и
+ограниченную очередь, поэтому тысячи простаивающих клиентов на процесс
+стоят лишь памяти под эти объекты.
+"""
+import asyncio
+import json
+import re
+from http.cookies import SimpleCookie
+from importlib import import_module
+from types import SimpleNamespace
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.contrib.auth import get_user
+from django.db import close_old_connections
+
+from .events import hub
+from .models import Follow
+
+POST_EVENTS = re.compile(r'^/events/post/(\d+)/$')
+
+HEADERS = [
+    (b'content-type', b'text/event-stream; charset=utf-8'),
+    (b'cache-control', b'no-cache'),
+    (b'x-accel-buffering', b'no'),
+]
+
+
+def followed_channels(headers):
+    """Каналы авторов, на которых подписан пользователь из cookie сессии."""
+    cookies = SimpleCookie()
+    for name, value in headers:
+        if name == b'cookie':
+            cookies.load(value.decode('latin-1'))
+    morsel = cookies.get(settings.SESSION_COOKIE_NAME)
+    if morsel is None:
+        return None
+
+    engine = import_module(settings.SESSION_ENGINE)
+    try:
+        user = get_user(SimpleNamespace(
+            session=engine.SessionStore(morsel.value)))
+        if not user.is_authenticated:
+            return None
+        authors = Follow.objects.filter(user=user).values_list(
+            'author_id', flat=True)
+        return [f'author:{author_id}' for author_id in authors]
+    finally:
+        close_old_connections()
+
+
+def format_event(event_id, event):
+    data = json.dumps(event['data'], ensure_ascii=False)
+    return f'id: {event_id}\nevent: {event["type"]}\ndata: {data}\n\n'
+
+
+async def send_status(send, status):
+    await send({'type': 'http.response.start', 'status': status,
+                'headers': [(b'content-type', b'text/plain')]})
+    await send({'type': 'http.response.body', 'body': b''})
+
+
+async def wait_disconnect(receive):
+    while True:
+        message = await receive()
+        if message['type'] == 'http.disconnect':
+            return
+
+
+class EventStreamApp:
+    def __init__(self, application):
+        self.application = application
+
+    async def __call__(self, scope, receive, send):
+        path = scope.get('path', '')
+        if scope['type'] != 'http' or not path.startswith('/events/'):
+            return await self.application(scope, receive, send)
+
+        match = POST_EVENTS.match(path)
+        if match:
+            channels = [f'post:{match.group(1)}']
+        elif path == '/events/follow/':
+            channels = await sync_to_async(followed_channels)(
+                scope.get('headers', []))
+            if channels is None:
+                return await send_status(send, 403)
+        else:
+            return await send_status(send, 404)
+
+        if hub.connections >= settings.EVENTS_MAX_CONNECTIONS:
+            return await send_status(send, 503)
+        await self.stream(channels, receive, send)
+
+    async def stream(self, channels, receive, send):
+        hub.ensure_poller()
+        subscription = hub.subscribe(channels)
+        disconnect = asyncio.ensure_future(wait_disconnect(receive))
+        try:
+            await send({'type': 'http.response.start', 'status': 200,
+                        'headers': HEADERS})
+            await send({'type': 'http.response.body',
+                        'body': b'retry: 5000\n\n', 'more_body': True})
+            while not disconnect.done():
+                get = asyncio.ensure_future(subscription.queue.get())
+                done, _ = await asyncio.wait(
+                    {get, disconnect}, timeout=settings.EVENTS_HEARTBEAT,
+                    return_when=asyncio.FIRST_COMPLETED)
+                if get in done:
+                    body = format_event(*get.result())
+                else:
+                    get.cancel()
+                    body = ': ping\n\n'
+                if not disconnect.done():
+                    await send({'type': 'http.response.body',
+                                'body': body.encode(), 'more_body': True})
+        finally:
+            disconnect.cancel()
+            subscription.close()
@@ -0,0 +1,125 @@
+"""Хранилище картинок записей по содержимому.
+
+Загрузка пишется во временный файл и одновременно хэшируется sha256;
+итоговое имя — posts/ab/cd/<sha256>.<расширение>. Если такой файл уже
+есть, временный удаляется, и запись ссылается на существующий. Число
+ссылок хранится в ImageBlob и меняется в Post.save() в одной транзакции
+с записью: новая картинка увеличивает его, удаление записи или замена
+картинки уменьшает, а последняя ссылка удаляет файл вместе с
+миниатюрами. Если запись так и не сохранилась, файл остаётся без ссылки
+и используется повторно при такой же загрузке. Ключ миниатюры sorl
+строится из имени файла, поэтому одинаковые картинки делят и миниатюры.
+"""
+import hashlib
+import os
+import re
+import tempfile
+
+from django.core.files.storage import FileSystemStorage
+from django.db import IntegrityError, transaction
+from django.db.models import F
+from django.utils.deconstruct import deconstructible
+
+HASHED_NAME = re.compile(
+    r'^[^/]+/[0-9a-f]{2}/[0-9a-f]{2}/[0-9a-f]{64}(\.\w+)?$')
+
+
+def content_name(prefix, digest, ext):
+    return f'{prefix}/{digest[:2]}/{digest[2:4]}/{digest}{ext.lower()}'
+
+
+def is_content_name(name):
+    return bool(name and HASHED_NAME.match(name))
+
+
+@deconstructible
+class ContentAddressedStorage(FileSystemStorage):
+    def _save(self, name, content):
+        prefix = os.path.dirname(name) or 'files'
+        ext = os.path.splitext(name)[1]
+        directory = self.path(prefix)
+        os.makedirs(directory, exist_ok=True)
+
+        sha256 = hashlib.sha256()
+        if hasattr(content, 'seek'):
+            content.seek(0)
+        fd, temp_path = tempfile.mkstemp(dir=directory, suffix='.upload')
+        try:
+            with os.fdopen(fd, 'wb') as temp:
+                for chunk in content.chunks():
+                    sha256.update(chunk)
+                    temp.write(chunk)
+            name = content_name(prefix, sha256.hexdigest(), ext)
+            path = self.path(name)
+            if os.path.exists(path):
+                os.remove(temp_path)
+            else:
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                if self.file_permissions_mode is not None:
+                    os.chmod(temp_path, self.file_permissions_mode)
+                os.replace(temp_path, path)
+        except BaseException:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+        return name
+
+    def get_available_name(self, name, max_length=None):
+        #  имя всё равно заменяется хэшем содержимого в _save
+        return name
+
+
+image_storage = ContentAddressedStorage()
+
+
+def retain(name):
+    from .models import ImageBlob
+
+    if ImageBlob.objects.filter(name=name).update(refs=F('refs') + 1):
+        return
+    size = image_storage.size(name) if image_storage.exists(name) else 0
+    try:
+        with transaction.atomic():
+            ImageBlob.objects.create(name=name, size=size, refs=1)
+    except IntegrityError:
+        ImageBlob.objects.filter(name=name).update(refs=F('refs') + 1)
+
+
+def release(name):
+    """Снимает ссылку на файл; последняя ссылка удаляет файл."""
+    from .models import ImageBlob
+
+    if not is_content_name(name):
+        return
+    with transaction.atomic():
+        if ImageBlob.objects.filter(name=name, refs__gt=1).update(
+                refs=F('refs') - 1):
+            return
+        deleted, _ = ImageBlob.objects.filter(name=name).delete()
+    if deleted:
+        transaction.on_commit(lambda: purge(name))
+
+
+def purge(name):
+    from sorl.thumbnail import delete as delete_thumbnails
+    from sorl.thumbnail.images import ImageFile
+
+    from .models import ImageBlob
+
+    #  файл могли загрузить заново, пока шла транзакция
+    if not ImageBlob.objects.filter(name=name).exists():
+        delete_thumbnails(ImageFile(name, image_storage), delete_file=True)
+
+
+def image_changed(old_name, new_name):
+    """Переносит ссылку со старой картинки записи на новую."""
+    if old_name == new_name:
+        return
+    if is_content_name(new_name):
+        retain(new_name)
+    if old_name:
+        release(old_name)
+
+
+def post_deleted(sender, instance, **kwargs):
+    release(instance.image.name)
@@ -0,0 +1,53 @@
+"""Потоковая отдача страниц ленты (включается настройкой STREAM_FEEDS или
+атрибутом запроса stream_feed).
+
+Шаблон страницы рендерится с streaming=True: вместо карточек в нём
+выводится метка cards_marker. Всё до метки — head, меню, заголовок —
+отправляется сразу, затем карточки рендерятся пачками по мере чтения
+записей из базы, и в конце отправляется остаток страницы.
+"""
+import uuid
+from itertools import islice
+
+from django.conf import settings
+from django.http import StreamingHttpResponse
+from django.middleware.csrf import get_token
+from django.shortcuts import render
+from django.template import loader
+from django.utils.safestring import mark_safe
+
+from .likes import attach_likes
+
+#  карточек на одну пачку: отметки «нравится» читаются на всю пачку
+CHUNK_SIZE = 5
+
+
+def render_feed(request, template_name, context):
+    if not getattr(request, 'stream_feed', settings.STREAM_FEEDS):
+        return render(request, template_name, context)
+    #  cookie CSRF выставляется до начала ответа, а форма отметки
+    #  «нравится» в карточке рендерится уже во время отдачи
+    get_token(request)
+    return StreamingHttpResponse(
+        stream_feed(request, template_name, context),
+        content_type='text/html; charset=utf-8',
+    )
+
+
+def stream_feed(request, template_name, context):
+    marker = f'<!--cards-{uuid.uuid4().hex}-->'
+    page = loader.get_template(template_name).render(
+        dict(context, streaming=True, cards_marker=mark_safe(marker)),
+        request,
+    )
+    head, tail = page.split(marker, 1)
+    yield head
+
+    card = loader.get_template('includes/card_post.html')
+    posts = context['page'].object_list.iterator()
+    while True:
+        chunk = attach_likes(islice(posts, CHUNK_SIZE), request.user)
+        if not chunk:
+            break
+        yield ''.join(card.render({'post': post}, request) for post in chunk)
+    yield tail
@@ -0,0 +1,89 @@
+"""Хэштеги (#тег) и упоминания (@username) в текстах записей.
+
+index_posts() разбирает тексты и переписывает строки PostTag и Mention
+для переданных записей. В строках хранится копия pub_date записи, так что
+ленты /tag/<имя>/ и /mentions/ читаются по индексу (тег, pub_date) без
+обращения к таблице записей, а листаются курсором ?before=, а не номером
+страницы: OFFSET на глубоких страницах пришлось бы перечитывать.
+"""
+import re
+from datetime import datetime, timedelta, timezone
+
+from django.db import transaction
+from django.db.models import Q
+
+from .models import Mention, PostTag, Tag, User
+
+TAG_MAX_LENGTH = 50
+TAG_RE = re.compile(r'(?<![&\w])#(\w+)')
+#  точка или дефис в конце — знак препинания, а не часть имени
+MENTION_RE = re.compile(r'(?<![\w.@+-])@([\w.@+-]*\w)')
+
+EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+
+def extract_tags(text):
+    return {tag.lower() for tag in TAG_RE.findall(text)
+            if len(tag) <= TAG_MAX_LENGTH}
+
+
+def extract_mentions(text):
+    return set(MENTION_RE.findall(text))
+
+
+def index_posts(posts):
+    parsed = {post.pk: (extract_tags(post.text), extract_mentions(post.text))
+              for post in posts}
+    names = set().union(*(tags for tags, _ in parsed.values()))
+    usernames = set().union(*(mentions for _, mentions in parsed.values()))
+
+    with transaction.atomic():
+        PostTag.objects.filter(post__in=parsed).delete()
+        Mention.objects.filter(post__in=parsed).delete()
+
+        Tag.objects.bulk_create([Tag(name=name) for name in names],
+                                ignore_conflicts=True)
+        tag_ids = dict(Tag.objects.filter(name__in=names)
+                       .values_list('name', 'pk'))
+        user_ids = dict(User.objects.filter(username__in=usernames)
+                        .values_list('username', 'pk'))
+
+        PostTag.objects.bulk_create(
+            PostTag(tag_id=tag_ids[name], post=post, pub_date=post.pub_date)
+            for post in posts for name in parsed[post.pk][0]
+        )
+        Mention.objects.bulk_create(
+            Mention(user_id=user_ids[username], post=post,
+                    pub_date=post.pub_date)
+            for post in posts for username in parsed[post.pk][1]
+            if username in user_ids
+        )
+
+
+def make_cursor(row):
+    delta = row.pub_date - EPOCH
+    microseconds = (delta.days * 86400 + delta.seconds) * 10 ** 6
+    return f'{microseconds + delta.microseconds}-{row.post_id}'
+
+
+def parse_cursor(cursor):
+    try:
+        microseconds, post_id = map(int, cursor.split('-'))
+    except (AttributeError, ValueError):
+        return None
+    return EPOCH + timedelta(microseconds=microseconds), post_id
+
+
+def keyset_page(queryset, cursor, size):
+    """Записи страницы по строкам PostTag или Mention и курсор следующей."""
+    queryset = queryset.order_by('-pub_date', '-post_id')
+    position = parse_cursor(cursor)
+    if position is not None:
+        pub_date, post_id = position
+        queryset = queryset.filter(
+            Q(pub_date__lt=pub_date) | Q(pub_date=pub_date,
+                                         post_id__lt=post_id))
+    rows = list(queryset.select_related('post__author', 'post__group')
+                [:size + 1])
+    next_cursor = make_cursor(rows[size - 1]) if len(rows) > size else None
+    return [row.post for row in rows[:size]], next_cursor
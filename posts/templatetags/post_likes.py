@@ -0,0 +1,12 @@
+from django import template
+
+from posts.likes import attach_likes as attach
+
+register = template.Library()
+
+
+@register.simple_tag
+def attach_likes(posts, user):
+    """{% attach_likes page user as posts %} — внутри {% cache %}, чтобы
+    отметки не читались, когда фрагмент уже в кэше."""
+    return attach(posts, user)
@@ -0,0 +1,91 @@
+from django.contrib.admin.helpers import ACTION_CHECKBOX_NAME
+from django.db import connection
+from django.test import Client, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from ..admin import EstimatedCountPaginator
+from ..models import Comment, Group, Post, User
+from ..snapshot import changed_pages
+
+
+@override_settings(ADMIN_BATCH_SIZE=2)
+class PostAdminTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+
+        cls.admin = User.objects.create_superuser(
+            username='admin', email='admin@mail.com', password='JimBeam1234')
+        cls.user = User.objects.create(
+            username='test-author',
+            email='testauthor@mail.com',
+            password='JimBeam1234',
+        )
+        cls.group = Group.objects.create(
+            title='Название тестовой группы',
+            description='текст ' * 10,
+            slug='test-slug',
+        )
+
+    def setUp(self):
+        self.admin_client = Client()
+        self.admin_client.force_login(PostAdminTests.admin)
+
+    def create_posts(self, count):
+        return [Post.objects.create(text=f'запись {i}', author=self.user,
+                                    group=self.group)
+                for i in range(count)]
+
+    def changelist_queries(self, url):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.admin_client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return len(queries)
+
+    def test_changelist_queries_do_not_grow_with_rows(self):
+        for model in (Post, Comment):
+            url = reverse(f'admin:posts_{model._meta.model_name}_changelist')
+            with self.subTest(model=model.__name__):
+                posts = self.create_posts(3)
+                for post in posts:
+                    Comment.objects.create(post=post, author=self.user,
+                                           text='комментарий')
+                #  первый запрос кладёт пользователя в кэш
+                self.changelist_queries(url)
+                few = self.changelist_queries(url)
+
+                posts = self.create_posts(10)
+                for post in posts:
+                    Comment.objects.create(post=post, author=self.user,
+                                           text='комментарий')
+                self.assertEqual(self.changelist_queries(url), few)
+
+    def test_paginator_counts_exactly_on_sqlite(self):
+        self.create_posts(3)
+        paginator = EstimatedCountPaginator(Post.objects.all(), 2)
+        self.assertEqual(paginator.count, 3)
+
+    def test_batched_actions(self):
+        posts = self.create_posts(5)
+        url = reverse('admin:posts_post_changelist')
+        selected = [post.pk for post in posts[:3]]
+
+        self.admin_client.post(url, {
+            'action': 'clear_group', ACTION_CHECKBOX_NAME: selected})
+        self.assertEqual(Post.objects.filter(group=None).count(), 3)
+
+        self.admin_client.post(url, {
+            'action': 'delete_in_batches', ACTION_CHECKBOX_NAME: selected})
+        self.assertEqual(Post.objects.count(), 2)
+
+    def test_clear_group_marks_group_pages_changed(self):
+        posts = self.create_posts(3)
+        since = timezone.now()
+        self.admin_client.post(reverse('admin:posts_post_changelist'), {
+            'action': 'clear_group',
+            ACTION_CHECKBOX_NAME: [post.pk for post in posts]})
+
+        self.assertIn(('group', (self.group.slug,), 1),
+                      changed_pages(since))
@@ -0,0 +1,125 @@
+import shutil
+import tempfile
+from datetime import timedelta
+
+from django.core.cache import cache
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from .. import comment_queue
+from ..models import Comment, Post, User
+
+QUEUE_DIR = tempfile.mkdtemp()
+
+
+@override_settings(COMMENT_WRITE_BEHIND=True, COMMENT_QUEUE_DIR=QUEUE_DIR)
+class CommentQueueTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+
+        cls.user = User.objects.create(
+            username='test-author',
+            email='testauthor@mail.com',
+            password='JimBeam1234',
+        )
+
+        cls.post = Post.objects.create(
+            text='текст ' * 10,
+            author=cls.user,
+        )
+
+        cls.post_url = reverse('post', kwargs={
+            'username': cls.user.username,
+            'post_id': cls.post.id})
+
+        cls.comment_url = reverse('add_comment', kwargs={
+            'username': cls.user.username,
+            'post_id': cls.post.id})
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(QUEUE_DIR, ignore_errors=True)
+        super().tearDownClass()
+
+    def setUp(self):
+        cache.clear()
+        self.authorized_client = Client()
+        self.authorized_client.force_login(CommentQueueTests.user)
+        self.guest_client = Client()
+
+    def tearDown(self):
+        comment_queue.flush()
+
+    def test_comment_is_deferred(self):
+        self.authorized_client.post(CommentQueueTests.comment_url,
+                                    data={'text': 'Комментарий'})
+
+        self.assertFalse(Comment.objects.exists())
+
+        self.assertEqual(comment_queue.flush(), 1)
+        self.assertTrue(Comment.objects.filter(
+            post=CommentQueueTests.post, text='Комментарий').exists())
+
+    def test_read_your_own_writes(self):
+        self.authorized_client.post(CommentQueueTests.comment_url,
+                                    data={'text': 'Комментарий'})
+
+        response = self.authorized_client.get(CommentQueueTests.post_url)
+        texts = [item.text for item in response.context['comments']]
+        self.assertEqual(texts, ['Комментарий'])
+
+        response = self.guest_client.get(CommentQueueTests.post_url)
+        self.assertEqual(len(response.context['comments']), 0)
+
+        comment_queue.flush()
+        response = self.authorized_client.get(CommentQueueTests.post_url)
+        texts = [item.text for item in response.context['comments']]
+        self.assertEqual(texts, ['Комментарий'])
+
+    def test_wrong_author_is_dropped(self):
+        self.authorized_client.post(
+            reverse('add_comment', kwargs={
+                'username': 'someone-else',
+                'post_id': CommentQueueTests.post.id}),
+            data={'text': 'Комментарий'})
+
+        self.assertEqual(comment_queue.flush(), 0)
+        self.assertFalse(Comment.objects.exists())
+
+    def test_invalid_form_is_not_queued(self):
+        self.authorized_client.post(CommentQueueTests.comment_url,
+                                    data={'text': ''})
+        self.assertEqual(comment_queue.flush(), 0)
+
+    def test_flushed_comment_is_shown_once(self):
+        self.authorized_client.post(CommentQueueTests.comment_url,
+                                    data={'text': 'Комментарий'})
+        comment_queue.flush()
+        #  отметки в кэше процесса воркера веб-процессу не видны
+        cache.clear()
+
+        response = self.authorized_client.get(CommentQueueTests.post_url)
+        texts = [item.text for item in response.context['comments']]
+        self.assertEqual(texts, ['Комментарий'])
+
+    def test_flush_keeps_submit_time_and_skips_redelivery(self):
+        created = timezone.now() - timedelta(minutes=5)
+        entry = {
+            'uid': 'a' * 32,
+            'post_id': CommentQueueTests.post.pk,
+            'username': CommentQueueTests.user.username,
+            'author_id': CommentQueueTests.user.pk,
+            'author_username': CommentQueueTests.user.username,
+            'text': 'Комментарий',
+            'created': created.isoformat(),
+        }
+        comment_queue.append(entry)
+        self.assertEqual(comment_queue.flush(), 1)
+        self.assertEqual(Comment.objects.get().created, created)
+
+        #  пачка, прочитанная повторно после падения воркера
+        comment_queue.append(entry)
+        self.assertEqual(comment_queue.flush(), 0)
+        self.assertEqual(Comment.objects.count(), 1)
@@ -0,0 +1,116 @@
+import os
+from unittest import mock
+
+from django.db import DatabaseError
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+from .. import counters
+from ..models import Post, User
+
+
+@override_settings(VIEW_COUNTER_INTERVAL=3600, VIEW_COUNTER_MAX_PENDING=100,
+                   PAGE_CACHE={})
+class ViewCounterTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+
+        cls.user = User.objects.create(
+            username='test-author',
+            email='testauthor@mail.com',
+            password='JimBeam1234',
+        )
+        cls.post = Post.objects.create(text='первая запись', author=cls.user)
+        cls.other = Post.objects.create(text='вторая запись', author=cls.user)
+
+    def setUp(self):
+        counters.take()
+        self.guest_client = Client()
+
+    def tearDown(self):
+        counters.take()
+
+    def test_views_are_buffered_and_flushed_in_one_query(self):
+        for _ in range(3):
+            counters.incr(self.post.pk)
+        counters.incr(self.other.pk)
+
+        self.post.refresh_from_db()
+        self.assertEqual(self.post.views, 0)
+
+        with self.assertNumQueries(1):
+            self.assertEqual(counters.flush(), 2)
+        self.post.refresh_from_db()
+        self.other.refresh_from_db()
+        self.assertEqual(self.post.views, 3)
+        self.assertEqual(self.other.views, 1)
+        self.assertEqual(counters.pending(self.post.pk), 0)
+
+    @override_settings(VIEW_COUNTER_MAX_PENDING=2)
+    def test_full_buffer_is_flushed(self):
+        counters.incr(self.post.pk)
+        counters.incr(self.other.pk)
+
+        self.post.refresh_from_db()
+        self.assertEqual(self.post.views, 1)
+
+    def test_failed_flush_keeps_views(self):
+        counters.incr(self.post.pk, 5)
+        with mock.patch.object(Post.objects, 'filter',
+                               side_effect=DatabaseError):
+            with self.assertRaises(DatabaseError):
+                counters.flush()
+
+        self.assertEqual(counters.pending(self.post.pk), 5)
+
+    def test_failed_flush_does_not_fail_request(self):
+        counters.incr(self.post.pk, 5)
+        with mock.patch.object(Post.objects, 'filter',
+                               side_effect=DatabaseError):
+            with self.assertLogs('posts.counters', 'ERROR'):
+                self.assertEqual(counters.flush_safely(), 0)
+            with override_settings(VIEW_COUNTER_MAX_PENDING=1):
+                with self.assertLogs('posts.counters', 'ERROR'):
+                    counters.incr(self.post.pk)
+
+        self.assertEqual(counters.pending(self.post.pk), 6)
+
+    def test_full_buffer_wakes_flusher(self):
+        with mock.patch.object(counters, '_flusher_pid', os.getpid()), \
+                mock.patch.object(counters, '_wake') as wake, \
+                override_settings(VIEW_COUNTER_MAX_PENDING=2):
+            counters.incr(self.post.pk)
+            wake.set.assert_not_called()
+            with self.assertNumQueries(0):
+                counters.incr(self.other.pk)
+            wake.set.assert_called_once_with()
+
+    def test_flusher_is_restarted_after_fork(self):
+        with mock.patch.object(counters, '_flusher_pid', None), \
+                mock.patch.object(counters.threading, 'Thread') as thread:
+            counters.start_flusher()
+            counters.start_flusher()
+            self.assertEqual(thread.return_value.start.call_count, 1)
+
+            #  в дочернем процессе pid другой
+            counters._flusher_pid = -1
+            counters.incr(self.post.pk)
+            self.assertEqual(thread.return_value.start.call_count, 2)
+            self.assertEqual(counters._flusher_pid, os.getpid())
+
+    def test_unknown_post_is_not_counted(self):
+        response = self.guest_client.get(
+            reverse('post', args=[self.user.username, 10 ** 6]))
+
+        self.assertEqual(response.status_code, 404)
+        self.assertEqual(counters.pending(10 ** 6), 0)
+        self.assertNotIn(10 ** 6, counters.take())
+
+    def test_post_page_shows_views(self):
+        url = reverse('post', args=[self.user.username, self.post.pk])
+        self.guest_client.get(url)
+        response = self.guest_client.get(url)
+
+        self.assertEqual(counters.pending(self.post.pk), 2)
+        self.assertContains(response, 'Просмотров: 2')
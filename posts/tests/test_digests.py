@@ -0,0 +1,87 @@
+import shutil
+import tempfile
+from datetime import timedelta
+from io import StringIO
+
+from django.core import mail
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from .. import digests
+from ..models import Follow, Post, User
+
+
+class DigestTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+
+        cls.author = User.objects.create(username='test-author')
+        cls.other = User.objects.create(username='other-author')
+        cls.readers = [
+            User.objects.create(username=f'reader-{i}',
+                                email=f'reader{i}@mail.com')
+            for i in range(5)
+        ]
+        cls.silent = User.objects.create(username='no-email')
+        for reader in cls.readers + [cls.silent]:
+            Follow.objects.create(user=reader, author=cls.author)
+        Follow.objects.create(user=cls.readers[0], author=cls.other)
+
+        Post.objects.create(text='новая запись', author=cls.author)
+        Post.objects.create(text='запись другого автора', author=cls.other)
+        old = Post.objects.create(text='старая запись', author=cls.author)
+        Post.objects.filter(pk=old.pk).update(
+            pub_date=timezone.now() - timedelta(days=3))
+
+    def setUp(self):
+        self.state_dir = tempfile.mkdtemp()
+        self.state = override_settings(DIGEST_STATE_DIR=self.state_dir)
+        self.state.enable()
+
+    def tearDown(self):
+        self.state.disable()
+        shutil.rmtree(self.state_dir, ignore_errors=True)
+
+    def send(self, **options):
+        call_command('send_digests', workers=1, shards=2, stdout=StringIO(),
+                     **options)
+
+    def test_digests_are_sent_to_followers(self):
+        #  запрос сайта и по одному запросу на шард
+        with self.assertNumQueries(3):
+            self.send()
+
+        self.assertEqual(sorted(message.to[0] for message in mail.outbox),
+                         sorted(reader.email for reader in self.readers))
+        first = next(message for message in mail.outbox
+                     if message.to == [self.readers[0].email])
+        self.assertIn('новая запись', first.body)
+        self.assertIn('запись другого автора', first.body)
+        self.assertNotIn('старая запись', first.body)
+
+    def test_next_run_starts_where_previous_ended(self):
+        self.send()
+        mail.outbox = []
+
+        self.send()
+        self.assertEqual(mail.outbox, [])
+
+    def test_interrupted_run_is_resumed(self):
+        now = timezone.now()
+        digests.write_json(digests.RUN_FILE, {
+            'since': (now - timedelta(days=1)).isoformat(),
+            'until': now.isoformat(),
+            'shards': 2,
+        })
+        digests.write_json(digests.shard_file(0), {'done': True})
+        digests.write_json(digests.shard_file(1), {
+            'user_id': self.readers[0].pk})
+
+        self.send()
+
+        expected = [reader.email for reader in self.readers
+                    if reader.pk % 2 == 1 and reader.pk > self.readers[0].pk]
+        self.assertEqual(sorted(message.to[0] for message in mail.outbox),
+                         sorted(expected))
@@ -0,0 +1,80 @@
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import Client, TestCase, TransactionTestCase
+from django.urls import reverse
+
+from ..duplicates import find_duplicates, signature, similarity
+from ..models import Post, PostBucket, PostSignature, User
+
+SPAM = ('Купите наши часы со скидкой 90% только сегодня! Переходите '
+        'по ссылке и получите подарок бесплатно.')
+SPAM_VARIANT = ('Купите наши часы со скидкой 95% только сегодня!! '
+                'Переходите по ссылке и получите подарок бесплатно')
+OTHER = ('Сегодня гуляли в парке, видели уток и белок. Погода была '
+         'отличная, хотя к вечеру похолодало.')
+
+
+class DuplicateTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+
+        cls.user = User.objects.create(
+            username='test-author',
+            email='testauthor@mail.com',
+            password='JimBeam1234',
+        )
+        cls.post = Post.objects.create(text=SPAM, author=cls.user)
+
+    def setUp(self):
+        self.authorized_client = Client()
+        self.authorized_client.force_login(DuplicateTests.user)
+
+    def test_signature_similarity(self):
+        self.assertGreater(similarity(signature(SPAM),
+                                      signature(SPAM_VARIANT)), 0.8)
+        self.assertLess(similarity(signature(SPAM), signature(OTHER)), 0.2)
+        self.assertIsNone(signature('!!!'))
+
+    def test_index_is_updated_on_save(self):
+        self.assertTrue(PostSignature.objects.filter(post=self.post).exists())
+        self.assertEqual(find_duplicates(SPAM_VARIANT), [self.post.pk])
+        self.assertEqual(find_duplicates(OTHER), [])
+
+        self.post.text = OTHER
+        self.post.save()
+        self.assertEqual(find_duplicates(SPAM_VARIANT), [])
+        self.assertEqual(find_duplicates(OTHER), [self.post.pk])
+
+    def test_form_rejects_near_duplicate(self):
+        response = self.authorized_client.post(
+            reverse('new_post'), data={'text': SPAM_VARIANT})
+
+        self.assertFormError(response, 'form', 'text',
+                             'Почти такая же запись уже опубликована')
+        self.assertEqual(Post.objects.count(), 1)
+
+        response = self.authorized_client.post(
+            reverse('edit_post', args=[self.user.username, self.post.pk]),
+            data={'text': SPAM_VARIANT})
+        self.assertEqual(response.status_code, 302)
+
+
+class DuplicateScanTests(TransactionTestCase):
+    #  процессы команды читают базу своими соединениями и видят только
+    #  зафиксированные записи
+    def test_scan_duplicates(self):
+        user = User.objects.create(username='test-author')
+        post = Post.objects.create(text=SPAM, author=user)
+        duplicate = Post.objects.create(text=SPAM_VARIANT, author=user)
+        Post.objects.create(text=OTHER, author=user)
+        PostSignature.objects.all().delete()
+        PostBucket.objects.all().delete()
+
+        out = StringIO()
+        call_command('scan_duplicates', workers=2, batch_size=2, stdout=out)
+
+        self.assertEqual(PostSignature.objects.count(), 3)
+        self.assertIn(f'{post.pk}\t{duplicate.pk}\t', out.getvalue())
+        self.assertIn('Похожих пар: 1', out.getvalue())
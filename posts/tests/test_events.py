@@ -0,0 +1,101 @@
+import asyncio
+import json
+import shutil
+import sqlite3
+import tempfile
+from unittest import mock
+
+from django.test import SimpleTestCase, override_settings
+
+from .. import events
+from ..events import Hub
+from ..sse import EventStreamApp
+
+EVENTS_DIR = tempfile.mkdtemp()
+
+
+@override_settings(EVENTS_ENABLED=True, EVENTS_QUEUE_SIZE=2,
+                   EVENTS_DB=f'{EVENTS_DIR}/events.sqlite3')
+class EventsTests(SimpleTestCase):
+    @classmethod
+    def tearDownClass(cls):
+        events._local.__dict__.clear()
+        shutil.rmtree(EVENTS_DIR, ignore_errors=True)
+        super().tearDownClass()
+
+    def test_bridge_journal(self):
+        last_id = events.last_event_id()
+        events.publish('post:1', 'comment', {'text_html': 'текст'})
+
+        rows = events.read_since(last_id)
+        self.assertEqual(len(rows), 1)
+        event_id, channel, payload = rows[0]
+        self.assertEqual(channel, 'post:1')
+        self.assertEqual(json.loads(payload)['data'], {'text_html': 'текст'})
+
+    def test_failed_publish_is_logged(self):
+        locked = sqlite3.OperationalError('database is locked')
+        with mock.patch.object(events, 'get_connection',
+                               side_effect=locked), \
+                self.assertLogs('posts.events', 'ERROR') as logs:
+            events.publish('post:1', 'comment', {'text_html': 'текст'})
+        self.assertIn('post:1', logs.output[0])
+
+    def test_hub_bounded_queue(self):
+        async def run():
+            hub = Hub()
+            subscription = hub.subscribe(['post:1'])
+            other = hub.subscribe(['post:2'])
+            for event_id in range(3):
+                hub.dispatch(event_id, 'post:1', '{"type": "comment"}')
+
+            #  медленный клиент теряет самые старые события
+            self.assertEqual(subscription.queue.get_nowait()[0], 1)
+            self.assertEqual(other.queue.qsize(), 0)
+
+            subscription.close()
+            other.close()
+            self.assertEqual(hub.channels, {})
+            self.assertEqual(hub.connections, 0)
+
+        asyncio.run(run())
+
+    def test_event_stream(self):
+        sent = []
+
+        async def run():
+            disconnected = asyncio.Event()
+
+            async def receive():
+                await disconnected.wait()
+                return {'type': 'http.disconnect'}
+
+            async def send(message):
+                sent.append(message)
+
+            app = EventStreamApp(None)
+            task = asyncio.ensure_future(app(
+                {'type': 'http', 'path': '/events/post/7/'}, receive, send))
+            await asyncio.sleep(0.01)
+            events.hub.dispatch(
+                5, 'post:7', '{"type": "comment", "data": {"id": 3}}')
+            await asyncio.sleep(0.01)
+            disconnected.set()
+            await task
+
+        asyncio.run(run())
+
+        self.assertEqual(sent[0]['status'], 200)
+        body = b''.join(message.get('body', b'') for message in sent[1:])
+        self.assertIn(b'id: 5\nevent: comment\ndata: {"id": 3}\n\n', body)
+        self.assertEqual(events.hub.connections, 0)
+
+    def test_unknown_stream(self):
+        sent = []
+
+        async def send(message):
+            sent.append(message)
+
+        asyncio.run(EventStreamApp(None)(
+            {'type': 'http', 'path': '/events/nothing/'}, None, send))
+        self.assertEqual(sent[0]['status'], 404)
@@ -0,0 +1,108 @@
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+from django.utils.feedgenerator import rfc3339_date
+
+from ..models import Group, Post, User
+
+
+class FeedsTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+
+        cls.user = User.objects.create(
+            username='test-author',
+            email='testauthor@mail.com',
+            password='JimBeam1234',
+        )
+
+        cls.group = Group.objects.create(
+            title='Название тестовой группы',
+            description='текст ' * 10,
+            slug='test-group',
+        )
+
+        Post.objects.create(
+            text='запись в группе <b>',
+            author=cls.user,
+            group=cls.group,
+        )
+
+        Post.objects.create(
+            text='запись без группы',
+            author=cls.user,
+        )
+
+    def setUp(self):
+        self.guest_client = Client()
+
+    def get_feed(self, url, **extra):
+        response = self.guest_client.get(url, **extra)
+        if response.status_code != 200:
+            return response, ''
+        return response, b''.join(response.streaming_content).decode()
+
+    def test_index_feeds(self):
+        for fmt, content_type in (('atom', 'application/atom+xml'),
+                                  ('rss', 'application/rss+xml')):
+            with self.subTest(fmt=fmt):
+                response, content = self.get_feed(
+                    reverse('index_feed', args=[fmt]))
+                self.assertTrue(
+                    response['Content-Type'].startswith(content_type))
+                self.assertIn('запись без группы', content)
+                self.assertIn('запись в группе &amp;lt;b&amp;gt;', content)
+
+    def test_group_feed(self):
+        _, content = self.get_feed(reverse(
+            'group_feed', args=[FeedsTests.group.slug, 'atom']))
+        self.assertIn('запись в группе', content)
+        self.assertNotIn('запись без группы', content)
+
+    def test_profile_feed(self):
+        _, content = self.get_feed(reverse(
+            'profile_feed', args=[FeedsTests.user.username, 'rss']))
+        self.assertEqual(content.count('<item>'), 2)
+
+    @override_settings(FEED_MAX_ITEMS=1)
+    def test_max_items(self):
+        _, content = self.get_feed(reverse('index_feed', args=['atom']))
+        self.assertEqual(content.count('<entry>'), 1)
+
+    def test_conditional_get(self):
+        response, _ = self.get_feed(reverse('index_feed', args=['atom']))
+        response, _ = self.get_feed(
+            reverse('index_feed', args=['atom']),
+            HTTP_IF_MODIFIED_SINCE=response['Last-Modified'])
+        self.assertEqual(response.status_code, 304)
+
+    def test_conditional_get_sees_edit_and_delete(self):
+        url = reverse('index_feed', args=['atom'])
+        response, _ = self.get_feed(url)
+        etag = response['ETag']
+        response, _ = self.get_feed(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+        post = Post.objects.get(text='запись без группы')
+        post.text = 'исправленная запись'
+        post.save()
+        response, content = self.get_feed(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('исправленная запись', content)
+
+        etag = response['ETag']
+        post.delete()
+        response, content = self.get_feed(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn('исправленная запись', content)
+
+    def test_atom_updated_is_newest_entry(self):
+        newest = Post.objects.order_by('-updated').first()
+        _, content = self.get_feed(reverse('index_feed', args=['atom']))
+        head = content.split('<entry>')[0]
+        self.assertIn(f'<updated>{rfc3339_date(newest.updated)}</updated>',
+                      head)
+
+    def test_unknown_format(self):
+        response = self.guest_client.get('/feed/json/')
+        self.assertEqual(response.status_code, 404)
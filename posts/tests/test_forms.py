@@ -108,3 +108,14 @@ class PostCreateFormTests(TestCase):
         new_post.refresh_from_db()
 
         self.assertNotEqual(old_group, new_post.group)
+
+    def test_create_post_renders_text_html(self):
+        self.authorized_client.post(
+            reverse('new_post'),
+            data={'text': '<b>первая</b>\nвторая'},
+            follow=True,
+        )
+
+        post = Post.objects.get(text='<b>первая</b>\nвторая')
+        self.assertEqual(post.text_html,
+                         '&lt;b&gt;первая&lt;/b&gt;<br>вторая')
@@ -0,0 +1,97 @@
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.cache import cache
+from django.db import connection
+from django.test import Client, TestCase, TransactionTestCase
+from django.urls import reverse
+
+from ..likes import attach_likes, like, like_counts, unlike
+from ..models import Like, LikeCounter, Post, User
+
+
+class LikeTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+
+        cls.user = User.objects.create(
+            username='test-author',
+            email='testauthor@mail.com',
+            password='JimBeam1234',
+        )
+        cls.reader = User.objects.create(
+            username='test-reader',
+            email='testreader@mail.com',
+            password='JimBeam1234',
+        )
+        cls.post = Post.objects.create(text='первая запись', author=cls.user)
+
+    def setUp(self):
+        cache.clear()
+        self.authorized_client = Client()
+        self.authorized_client.force_login(LikeTests.reader)
+
+    def test_like_is_unique(self):
+        self.assertTrue(like(self.reader, self.post.pk))
+        self.assertFalse(like(self.reader, self.post.pk))
+
+        self.assertEqual(Like.objects.count(), 1)
+        self.assertEqual(like_counts([self.post.pk]), {self.post.pk: 1})
+
+        self.assertTrue(unlike(self.reader, self.post.pk))
+        self.assertFalse(unlike(self.reader, self.post.pk))
+        self.assertEqual(like_counts([self.post.pk]), {self.post.pk: 0})
+
+    def test_attach_likes_uses_two_queries(self):
+        posts = [Post.objects.create(text=f'запись {i}', author=self.user)
+                 for i in range(5)]
+        like(self.reader, posts[0].pk)
+        like(self.user, posts[0].pk)
+
+        with self.assertNumQueries(2):
+            posts = attach_likes(posts, self.reader)
+
+        self.assertEqual(posts[0].like_count, 2)
+        self.assertTrue(posts[0].liked)
+        self.assertEqual(posts[1].like_count, 0)
+        self.assertFalse(posts[1].liked)
+
+    def test_like_view_toggles(self):
+        url = reverse('like_post', args=[self.user.username, self.post.pk])
+        self.assertEqual(self.authorized_client.get(url).status_code, 405)
+
+        self.authorized_client.post(url)
+        response = self.authorized_client.get(reverse('index'))
+        self.assertContains(response, '♥ 1')
+        self.assertContains(response, 'btn-danger')
+
+        self.authorized_client.post(url)
+        response = self.authorized_client.get(reverse('index'))
+        self.assertContains(response, '♥ 0')
+        self.assertFalse(Like.objects.exists())
+
+
+class LikeConcurrencyTests(TransactionTestCase):
+    def test_concurrent_likes_on_one_post(self):
+        if connection.vendor == 'sqlite' and connection.is_in_memory_db():
+            self.skipTest('общая SQLite-база в памяти не допускает '
+                          'параллельной записи')
+        author = User.objects.create(username='test-author')
+        post = Post.objects.create(text='популярная запись', author=author)
+        users = [User.objects.create(username=f'reader-{i}')
+                 for i in range(40)]
+
+        def like_twice(user):
+            try:
+                return like(user, post.pk) + like(user, post.pk)
+            finally:
+                connection.close()
+
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            liked = sum(executor.map(like_twice, users))
+
+        self.assertEqual(liked, len(users))
+        self.assertEqual(Like.objects.filter(post=post).count(), len(users))
+        self.assertEqual(like_counts([post.pk]), {post.pk: len(users)})
+        self.assertLessEqual(
+            LikeCounter.objects.filter(post=post).count(), 8)
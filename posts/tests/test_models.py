@@ -1,6 +1,7 @@
-from django.test import TestCase
+from django.test import Client, TestCase
+from django.urls import reverse
 
-from ..models import Group, Post, User
+from ..models import Comment, Group, Post, User
 
 
 class PostModelTest(TestCase):
@@ -48,6 +49,49 @@ class PostModelTest(TestCase):
                     post._meta.get_field(value).help_text, expected)
 
 
+class TextHtmlTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+
+        cls.user = User.objects.create_superuser(
+            username='admin', email='admin@mail.com', password='JimBeam1234')
+
+    def setUp(self):
+        self.post = Post.objects.create(text='первая', author=self.user)
+
+    def test_save_renders_text_html(self):
+        self.post.text = '<b>новая</b>\nстрока'
+        self.post.save()
+
+        self.post.refresh_from_db()
+        self.assertEqual(self.post.text_html,
+                         '&lt;b&gt;новая&lt;/b&gt;<br>строка')
+
+        comment = Comment.objects.create(post=self.post, author=self.user,
+                                         text='а\nб')
+        self.assertEqual(comment.text_html, 'а<br>б')
+
+    def test_update_clears_stale_html(self):
+        Post.objects.filter(pk=self.post.pk).update(text='изменённая')
+
+        self.post.refresh_from_db()
+        self.assertEqual(self.post.text_html, '')
+        response = self.client.get(
+            reverse('post', args=[self.user.username, self.post.pk]))
+        self.assertContains(response, 'изменённая')
+
+    def test_admin_edit_is_shown(self):
+        client = Client()
+        client.force_login(self.user)
+        client.post(
+            reverse('admin:posts_post_change', args=[self.post.pk]),
+            {'text': 'из админки', 'author': self.user.pk, 'group': ''})
+
+        self.post.refresh_from_db()
+        self.assertEqual(self.post.text_html, 'из админки')
+
+
 class GroupModelTest(TestCase):
     @classmethod
     def setUpClass(cls):
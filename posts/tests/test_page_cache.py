@@ -0,0 +1,84 @@
+import hashlib
+
+from django.core.cache import cache
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+from ..models import Post, User
+
+PAGE_CACHE = {'index': {'fresh': 60, 'stale': 60}}
+INDEX_LOCK = f'page_cache:index:{hashlib.md5(b"/").hexdigest()}:lock'
+
+
+@override_settings(PAGE_CACHE=PAGE_CACHE, PAGE_CACHE_WAIT=0.1)
+class PageCacheTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+
+        cls.user = User.objects.create(
+            username='test-author',
+            email='testauthor@mail.com',
+            password='JimBeam1234',
+        )
+
+    def setUp(self):
+        cache.clear()
+        self.guest_client = Client()
+        self.authorized_client = Client()
+        self.authorized_client.force_login(PageCacheTests.user)
+
+    def create_post(self, text):
+        return Post.objects.create(text=text, author=PageCacheTests.user)
+
+    def test_anonymous_page_is_cached(self):
+        self.create_post('первая запись')
+        response = self.guest_client.get(reverse('index'))
+        self.assertEqual(response['X-Page-Cache'], 'miss')
+
+        self.create_post('вторая запись')
+        response = self.guest_client.get(reverse('index'))
+        self.assertEqual(response['X-Page-Cache'], 'hit')
+        self.assertNotContains(response, 'вторая запись')
+
+    def test_authorized_page_is_not_cached(self):
+        response = self.authorized_client.get(reverse('index'))
+        self.assertFalse(response.has_header('X-Page-Cache'))
+
+    @override_settings(PAGE_CACHE={'index': {'fresh': 0, 'stale': 60}})
+    def test_stale_while_revalidate(self):
+        self.create_post('первая запись')
+        self.guest_client.get(reverse('index'))
+        self.create_post('вторая запись')
+
+        #  страницу пересчитывает другой процесс
+        cache.add(INDEX_LOCK, True)
+        response = self.guest_client.get(reverse('index'))
+        self.assertEqual(response['X-Page-Cache'], 'stale')
+        self.assertNotContains(response, 'вторая запись')
+
+    def test_waits_for_leader_without_stale_copy(self):
+        cache.add(INDEX_LOCK, True)
+
+        #  лидер не успел — страница считается без кэша
+        response = self.guest_client.get(reverse('index'))
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(response.has_header('X-Page-Cache'))
+
+    @override_settings(STREAM_FEEDS=True)
+    def test_streamed_page_holds_lock_until_sent(self):
+        self.create_post('первая запись')
+        leader = self.guest_client.get(reverse('index'))
+        self.assertTrue(leader.streaming)
+        self.assertTrue(cache.get(INDEX_LOCK))
+
+        #  пока лидер отдаёт поток, второй запрос страницу не считает
+        follower = Client().get(reverse('index'))
+        self.assertFalse(follower.has_header('X-Page-Cache'))
+        self.assertTrue(cache.get(INDEX_LOCK))
+
+        content = b''.join(leader.streaming_content)
+        self.assertIsNone(cache.get(INDEX_LOCK))
+        response = Client().get(reverse('index'))
+        self.assertEqual(response['X-Page-Cache'], 'hit')
+        self.assertEqual(response.content, content)
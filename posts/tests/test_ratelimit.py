@@ -0,0 +1,104 @@
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.cache import cache
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+from ..models import Post, User
+from ..ratelimit import hit
+
+RATELIMITS = {
+    'new_post': {'user': (3, 60), 'ip': (5, 60)},
+    'add_comment': {'user': (3, 60)},
+    'profile_follow': {'user': (3, 60)},
+}
+
+
+@override_settings(RATELIMITS=RATELIMITS)
+class RateLimitTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+
+        cls.user = User.objects.create(
+            username='test-author',
+            email='testauthor@mail.com',
+            password='JimBeam1234',
+        )
+
+        cls.user1 = User.objects.create(
+            username='test-author-1',
+            email='test1author@mail.com',
+            password='JimBeam1234',
+        )
+
+    def setUp(self):
+        cache.clear()
+        self.authorized_client = Client()
+        self.authorized_client.force_login(RateLimitTests.user)
+        self.another_authorized_client = Client()
+        self.another_authorized_client.force_login(RateLimitTests.user1)
+
+    def test_new_post_user_limit(self):
+        for _ in range(3):
+            response = self.authorized_client.post(
+                reverse('new_post'), data={'text': 'Тестовый текст'})
+            self.assertEqual(response.status_code, 302)
+
+        response = self.authorized_client.post(
+            reverse('new_post'), data={'text': 'Тестовый текст'})
+        self.assertEqual(response.status_code, 429)
+        self.assertGreater(int(response['Retry-After']), 0)
+        self.assertEqual(Post.objects.count(), 3)
+
+    def test_get_is_not_limited(self):
+        for _ in range(5):
+            response = self.authorized_client.get(reverse('new_post'))
+            self.assertEqual(response.status_code, 200)
+
+    def test_ip_limit_shared_between_users(self):
+        for _ in range(3):
+            self.authorized_client.post(
+                reverse('new_post'), data={'text': 'Тестовый текст'})
+        for _ in range(2):
+            response = self.another_authorized_client.post(
+                reverse('new_post'), data={'text': 'Тестовый текст'})
+            self.assertEqual(response.status_code, 302)
+
+        response = self.another_authorized_client.post(
+            reverse('new_post'), data={'text': 'Тестовый текст'})
+        self.assertEqual(response.status_code, 429)
+
+    def test_follow_limit(self):
+        url = reverse('profile_follow', kwargs={
+            'username': RateLimitTests.user1.username})
+        for _ in range(3):
+            self.assertEqual(self.authorized_client.get(url).status_code, 302)
+        self.assertEqual(self.authorized_client.get(url).status_code, 429)
+
+    def test_concurrent_burst(self):
+        def burst(_):
+            return sum(not hit('burst', 25, 60, now=30.0) for _ in range(10))
+
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            allowed = sum(executor.map(burst, range(8)))
+
+        self.assertEqual(allowed, 25)
+
+    def test_sliding_window(self):
+        for _ in range(10):
+            self.assertEqual(hit('window', 10, 60, now=59.0), 0)
+
+        #  в начале следующего окна предыдущее почти целиком учитывается
+        self.assertGreater(hit('window', 10, 60, now=61.0), 0)
+        #  к концу окна вес предыдущего падает
+        self.assertEqual(hit('window', 10, 60, now=115.0), 0)
+
+    def test_retry_after_is_exact(self):
+        for _ in range(10):
+            self.assertEqual(hit('retry', 10, 60, now=59.0), 0)
+
+        #  10 * (1 - 6 / 60) + 1 = 10: через 5 секунд запрос проходит
+        self.assertEqual(hit('retry', 10, 60, now=61.0), 5)
+        self.assertGreater(hit('retry', 10, 60, now=65.9), 0)
+        self.assertEqual(hit('retry', 10, 60, now=66.0), 0)
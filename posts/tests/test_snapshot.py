@@ -0,0 +1,142 @@
+import os
+import shutil
+import tempfile
+from io import StringIO
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+
+from yatube.settings import POST_ON_PAGE
+from ..models import Comment, Follow, Group, ListingChange, Post, User
+
+
+class SnapshotTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+
+        cls.user = User.objects.create(
+            username='test-author',
+            email='testauthor@mail.com',
+            password='JimBeam1234',
+        )
+        cls.group = Group.objects.create(
+            title='Название тестовой группы',
+            description='текст ' * 10,
+            slug='test-slug',
+        )
+        Post.objects.bulk_create(
+            Post(text=f'запись {i}', author=cls.user, group=cls.group)
+            for i in range(POST_ON_PAGE + 1))
+
+    def setUp(self):
+        cache.clear()
+        self.tmp = tempfile.mkdtemp(dir=settings.BASE_DIR)
+        self.root = os.path.join(self.tmp, 'snapshot')
+        self.settings = override_settings(SNAPSHOT_DIR=self.root)
+        self.settings.enable()
+
+    def tearDown(self):
+        self.settings.disable()
+        shutil.rmtree(self.tmp, ignore_errors=True)
+
+    def export(self, *args):
+        out = StringIO()
+        call_command('export_snapshot', *args, workers=1, stdout=out)
+        return out.getvalue()
+
+    def read(self, *path):
+        with open(os.path.join(self.root, *path), encoding='utf-8') as html:
+            return html.read()
+
+    def test_full_export(self):
+        self.export()
+
+        post = Post.objects.earliest()
+        pages = (
+            ('index.html',),
+            ('page-2.html',),
+            ('group', 'test-slug', 'index.html'),
+            ('group', 'test-slug', 'page-2.html'),
+            ('test-author', 'index.html'),
+            ('test-author', 'page-2.html'),
+            ('test-author', str(post.pk), 'index.html'),
+        )
+        for path in pages:
+            with self.subTest(path=path):
+                self.assertIn('запись', self.read(*path))
+        self.assertIn(post.text, self.read('group', 'test-slug',
+                                           'page-2.html'))
+
+    def test_incremental_export_rebuilds_touched_pages(self):
+        self.export()
+        edited = Post.objects.latest()
+        commented = Post.objects.earliest()
+        untouched = Post.objects.exclude(
+            pk__in=[edited.pk, commented.pk]).first()
+        untouched_path = ('test-author', str(untouched.pk), 'index.html')
+        with open(os.path.join(self.root, *untouched_path), 'w') as html:
+            html.write('старая копия')
+
+        edited.text = 'исправленная запись'
+        edited.save()
+        Comment.objects.create(post=commented, author=self.user,
+                               text='новый комментарий')
+        output = self.export()
+
+        #  две записи, первые страницы трёх лент с исправленной записью и
+        #  вторые — с прокомментированной
+        self.assertIn('Страниц: 8 из 8', output)
+        self.assertIn('исправленная запись', self.read('index.html'))
+        self.assertIn('новый комментарий', self.read(
+            'test-author', str(commented.pk), 'index.html'))
+        self.assertIn('Комментариев: 1', self.read('page-2.html'))
+        self.assertEqual(self.read(*untouched_path), 'старая копия')
+
+    def test_moved_post_leaves_old_group_page(self):
+        other = Group.objects.create(title='Другая группа', slug='other',
+                                     description='текст')
+        self.export()
+        post = Post.objects.latest()
+        post.text = 'перенесённая запись'
+        post.group = other
+        post.save()
+
+        self.export()
+        self.assertNotIn('перенесённая запись',
+                         self.read('group', 'test-slug', 'index.html'))
+        self.assertIn('перенесённая запись',
+                      self.read('group', 'other', 'index.html'))
+
+    def test_follow_rebuilds_profile_pages(self):
+        reader = User.objects.create(username='reader')
+        self.export()
+
+        Follow.objects.create(user=reader, author=self.user)
+        self.export()
+        for page in ('index.html', 'page-2.html'):
+            with self.subTest(page=page):
+                self.assertIn('Подписчиков: 1',
+                              self.read('test-author', page))
+        self.assertIn('Подписан: 1', self.read('reader', 'index.html'))
+
+        Follow.objects.get().delete()
+        output = self.export()
+        self.assertIn('Страниц: 3 из 3', output)
+        self.assertIn('Подписчиков: 0', self.read('test-author',
+                                                  'index.html'))
+        #  обработанные изменения удаляются
+        self.assertFalse(ListingChange.objects.exists())
+
+    def test_full_export_removes_deleted_posts(self):
+        self.export()
+        post = Post.objects.earliest()
+        post_path = os.path.join(self.root, 'test-author', str(post.pk))
+        post.delete()
+
+        self.export()
+        self.assertTrue(os.path.exists(post_path))
+        self.export('--full')
+        self.assertFalse(os.path.exists(post_path))
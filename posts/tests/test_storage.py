@@ -0,0 +1,157 @@
+import os
+import shutil
+import tempfile
+from io import StringIO
+from unittest import mock
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.db import DatabaseError, transaction
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+from ..models import ImageBlob, Post, User
+from ..storage import is_content_name, purge
+
+SMALL_GIF = (
+    b'\x47\x49\x46\x38\x39\x61\x02\x00'
+    b'\x01\x00\x80\x00\x00\x00\x00\x00'
+    b'\xFF\xFF\xFF\x21\xF9\x04\x00\x00'
+    b'\x00\x00\x00\x2C\x00\x00\x00\x00'
+    b'\x02\x00\x01\x00\x00\x02\x02\x0C'
+    b'\x0A\x00\x3B'
+)
+OTHER_GIF = SMALL_GIF.replace(b'\xFF\xFF\xFF', b'\x00\xFF\x00')
+
+
+class ContentAddressedStorageTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.media_root = tempfile.mkdtemp(dir=settings.BASE_DIR)
+        cls.media = override_settings(MEDIA_ROOT=cls.media_root)
+        cls.media.enable()
+
+        cls.user = User.objects.create(
+            username='test-author',
+            email='testauthor@mail.com',
+            password='JimBeam1234',
+        )
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.media.disable()
+        shutil.rmtree(cls.media_root, ignore_errors=True)
+        super().tearDownClass()
+
+    def setUp(self):
+        self.authorized_client = Client()
+        self.authorized_client.force_login(ContentAddressedStorageTests.user)
+
+    def upload(self, text, name='small.gif', content=SMALL_GIF):
+        self.authorized_client.post(reverse('new_post'), data={
+            'text': text,
+            'image': SimpleUploadedFile(name, content, 'image/gif'),
+        })
+        return Post.objects.get(text=text)
+
+    def test_identical_uploads_share_one_file(self):
+        first = self.upload('первая', name='meme.gif')
+        second = self.upload('вторая', name='meme-copy.gif')
+
+        self.assertTrue(is_content_name(first.image.name))
+        self.assertEqual(first.image.name, second.image.name)
+        self.assertEqual(ImageBlob.objects.get(name=first.image.name).refs, 2)
+
+        directory = os.path.dirname(first.image.path)
+        self.assertEqual(os.listdir(directory),
+                         [os.path.basename(first.image.name)])
+
+    def test_last_reference_removes_blob(self):
+        first = self.upload('первая')
+        second = self.upload('вторая')
+        name = first.image.name
+
+        first.delete()
+        self.assertEqual(ImageBlob.objects.get(name=name).refs, 1)
+
+        second.delete()
+        self.assertFalse(ImageBlob.objects.filter(name=name).exists())
+        purge(name)
+        self.assertFalse(os.path.exists(os.path.join(self.media_root, name)))
+
+    def test_replaced_image_is_released(self):
+        post = self.upload('запись')
+        old_name = post.image.name
+
+        self.authorized_client.post(
+            reverse('edit_post', args=[self.user.username, post.pk]),
+            data={'text': 'запись',
+                  'image': SimpleUploadedFile('new.gif', OTHER_GIF,
+                                              'image/gif')})
+
+        post.refresh_from_db()
+        self.assertNotEqual(post.image.name, old_name)
+        self.assertFalse(ImageBlob.objects.filter(name=old_name).exists())
+        self.assertEqual(ImageBlob.objects.get(name=post.image.name).refs, 1)
+
+    def test_unsaved_post_keeps_no_reference(self):
+        with self.assertRaises(RuntimeError), transaction.atomic():
+            post = Post(text='откат', author=self.user)
+            post.image.save('small.gif', ContentFile(SMALL_GIF))
+            name = post.image.name
+            raise RuntimeError
+        self.assertFalse(ImageBlob.objects.filter(name=name).exists())
+
+        post = Post(text='ошибка', author=self.user,
+                    image=SimpleUploadedFile('small.gif', SMALL_GIF))
+        with mock.patch.object(Post, '_do_insert', side_effect=DatabaseError):
+            with self.assertRaises(DatabaseError):
+                post.save()
+        self.assertFalse(ImageBlob.objects.filter(name=name).exists())
+
+    def test_name_without_extension_is_released(self):
+        post = Post(text='без расширения', author=self.user)
+        post.image.save('image', ContentFile(SMALL_GIF))
+
+        self.assertTrue(is_content_name(post.image.name))
+        self.assertEqual(ImageBlob.objects.get(name=post.image.name).refs, 1)
+        post.delete()
+        self.assertFalse(
+            ImageBlob.objects.filter(name=post.image.name).exists())
+
+    def test_orm_edit_moves_reference(self):
+        post = self.upload('запись')
+        old_name = post.image.name
+
+        post = Post.objects.get(pk=post.pk)
+        post.image.save('new.gif', ContentFile(OTHER_GIF))
+        post.text = 'правка'
+        post.save()
+
+        self.assertFalse(ImageBlob.objects.filter(name=old_name).exists())
+        self.assertEqual(ImageBlob.objects.get(name=post.image.name).refs, 1)
+
+    def test_dedupe_media(self):
+        legacy = os.path.join(self.media_root, 'posts')
+        os.makedirs(legacy, exist_ok=True)
+        for name, content in (('a.gif', SMALL_GIF), ('b.gif', SMALL_GIF),
+                              ('c.gif', OTHER_GIF)):
+            with open(os.path.join(legacy, name), 'wb') as image:
+                image.write(content)
+            Post.objects.create(text=name, author=self.user,
+                                image=f'posts/{name}')
+
+        out = StringIO()
+        call_command('dedupe_media', workers=2, stdout=out)
+
+        self.assertIn('Файлов: 3, уникальных: 2, '
+                      f'освобождено байт: {len(SMALL_GIF)}', out.getvalue())
+        names = {post.text: post.image.name for post in Post.objects.all()}
+        self.assertEqual(names['a.gif'], names['b.gif'])
+        self.assertNotEqual(names['a.gif'], names['c.gif'])
+        self.assertTrue(is_content_name(names['c.gif']))
+        self.assertEqual(ImageBlob.objects.get(name=names['a.gif']).refs, 2)
+        self.assertFalse(os.path.exists(os.path.join(legacy, 'a.gif')))
@@ -0,0 +1,76 @@
+import gzip
+import zlib
+
+from django.core.cache import cache
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+from ..models import Group, Post, User
+
+
+@override_settings(STREAM_FEEDS=True, PAGE_CACHE={})
+class StreamingFeedTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+
+        cls.user = User.objects.create(
+            username='test-author',
+            email='testauthor@mail.com',
+            password='JimBeam1234',
+        )
+        cls.group = Group.objects.create(
+            title='Название тестовой группы',
+            description='текст ' * 10,
+            slug='test-slug',
+        )
+        for i in range(7):
+            Post.objects.create(text=f'запись номер {i}', author=cls.user,
+                                group=cls.group)
+
+    def setUp(self):
+        cache.clear()
+        self.guest_client = Client()
+        self.authorized_client = Client()
+        self.authorized_client.force_login(StreamingFeedTests.user)
+
+    def test_feed_pages_are_streamed(self):
+        urls = (
+            reverse('index'),
+            reverse('group', args=[self.group.slug]),
+            reverse('profile', args=[self.user.username]),
+        )
+        for url in urls:
+            with self.subTest(url=url):
+                response = self.authorized_client.get(url)
+                self.assertTrue(response.streaming)
+
+                chunks = [chunk.decode() for chunk in
+                          response.streaming_content]
+                self.assertIn('<head>', chunks[0])
+                self.assertNotIn('запись номер', chunks[0])
+                page = ''.join(chunks)
+                for i in range(7):
+                    self.assertIn(f'запись номер {i}', page)
+                self.assertIn('csrfmiddlewaretoken', page)
+
+    def test_stream_is_gzipped_incrementally(self):
+        response = self.guest_client.get(reverse('index'),
+                                         HTTP_ACCEPT_ENCODING='gzip')
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+
+        chunks = list(response.streaming_content)
+        head = zlib.decompressobj(16 + zlib.MAX_WBITS).decompress(chunks[0])
+        self.assertIn(b'<head>', head)
+        self.assertIn('запись номер 0',
+                      gzip.decompress(b''.join(chunks)).decode())
+
+    @override_settings(PAGE_CACHE={'index': {'fresh': 60, 'stale': 60}})
+    def test_streamed_page_is_cached(self):
+        response = self.guest_client.get(reverse('index'))
+        self.assertEqual(response['X-Page-Cache'], 'miss')
+        streamed = b''.join(response.streaming_content)
+
+        response = self.guest_client.get(reverse('index'))
+        self.assertEqual(response['X-Page-Cache'], 'hit')
+        self.assertEqual(response.content, streamed)
@@ -0,0 +1,120 @@
+from datetime import timedelta
+from io import StringIO
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import Client, TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from ..models import Mention, Post, PostTag, Tag, User
+from ..tags import extract_mentions, extract_tags, keyset_page
+
+
+class TagTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+
+        cls.user = User.objects.create(
+            username='test-author',
+            email='testauthor@mail.com',
+            password='JimBeam1234',
+        )
+        cls.reader = User.objects.create(
+            username='reader.one',
+            email='reader@mail.com',
+            password='JimBeam1234',
+        )
+
+    def setUp(self):
+        cache.clear()
+        self.authorized_client = Client()
+        self.authorized_client.force_login(TagTests.user)
+
+    def test_extract(self):
+        text = ('#Django и #джанго, не тег: a#b &#39; '
+                'привет @reader.one. почта a@mail.com')
+        self.assertEqual(extract_tags(text), {'django', 'джанго'})
+        self.assertEqual(extract_mentions(text), {'reader.one'})
+
+    def test_new_and_edit_post_index_tags(self):
+        self.authorized_client.post(
+            reverse('new_post'),
+            data={'text': 'запись #Первый для @reader.one и @nobody'})
+        post = Post.objects.get()
+
+        self.assertEqual(
+            list(post.post_tags.values_list('tag__name', flat=True)),
+            ['первый'])
+        mention = Mention.objects.get()
+        self.assertEqual(mention.user, self.reader)
+        self.assertEqual(mention.pub_date, post.pub_date)
+
+        self.authorized_client.post(
+            reverse('edit_post', args=[self.user.username, post.pk]),
+            data={'text': 'запись #второй'})
+
+        self.assertEqual(
+            list(post.post_tags.values_list('tag__name', flat=True)),
+            ['второй'])
+        self.assertFalse(Mention.objects.exists())
+
+    def make_posts(self, count, text):
+        posts = [Post.objects.create(text=text, author=self.user)
+                 for _ in range(count)]
+        #  у части записей одинаковое время — порядок решает id
+        now = timezone.now()
+        for i, post in enumerate(posts):
+            post.pub_date = now - timedelta(minutes=i // 2)
+        Post.objects.bulk_update(posts, ['pub_date'])
+        call_command('index_tags', batch_size=3, stdout=StringIO())
+        return sorted(posts, key=lambda post: (post.pub_date, post.pk),
+                      reverse=True)
+
+    def test_keyset_pages_cover_feed(self):
+        posts = self.make_posts(7, '#лента')
+        tag = Tag.objects.get(name='лента')
+
+        seen = []
+        cursor = None
+        while True:
+            page, cursor = keyset_page(tag.post_tags.all(), cursor, 3)
+            seen += page
+            if cursor is None:
+                break
+        self.assertEqual(seen, posts)
+
+    def test_tag_page(self):
+        posts = self.make_posts(12, 'про #Котов')
+
+        response = self.client.get(reverse('tag', args=['котов']))
+        self.assertEqual(response.context['posts'], posts[:10])
+        cursor = response.context['next_cursor']
+
+        response = self.client.get(reverse('tag', args=['Котов']),
+                                   {'before': cursor})
+        self.assertEqual(response.context['posts'], posts[10:])
+        self.assertIsNone(response.context['next_cursor'])
+
+        response = self.client.get(reverse('tag', args=['собак']))
+        self.assertEqual(response.status_code, 404)
+
+    def test_mentions_page(self):
+        posts = self.make_posts(2, 'спасибо, @reader.one!')
+        Post.objects.create(text='без упоминаний', author=self.user)
+
+        reader_client = Client()
+        reader_client.force_login(self.reader)
+        response = reader_client.get(reverse('mentions'))
+        self.assertEqual(response.context['posts'], posts)
+
+        response = self.client.get(reverse('mentions'))
+        self.assertEqual(response.status_code, 302)
+
+    def test_backfill_is_idempotent(self):
+        self.make_posts(4, '#один #два')
+        call_command('index_tags', stdout=StringIO())
+
+        self.assertEqual(Tag.objects.count(), 2)
+        self.assertEqual(PostTag.objects.count(), 8)
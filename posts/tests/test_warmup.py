@@ -0,0 +1,90 @@
+import shutil
+import tempfile
+from io import StringIO
+from unittest import mock
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.test import Client, TransactionTestCase, override_settings
+from django.urls import reverse
+
+from ..models import Follow, Group, Post, User
+from ..warmup import THUMBNAIL_GEOMETRY, preload_templates
+
+SMALL_GIF = (
+    b'\x47\x49\x46\x38\x39\x61\x02\x00'
+    b'\x01\x00\x80\x00\x00\x00\x00\x00'
+    b'\xFF\xFF\xFF\x21\xF9\x04\x00\x00'
+    b'\x00\x00\x00\x2C\x00\x00\x00\x00'
+    b'\x02\x00\x01\x00\x00\x02\x02\x0C'
+    b'\x0A\x00\x3B'
+)
+PAGE_CACHE = {
+    'index': {'fresh': 60, 'stale': 60},
+    'group': {'fresh': 60, 'stale': 60},
+    'profile': {'fresh': 60, 'stale': 60},
+}
+
+
+class WarmupTests(TransactionTestCase):
+    def setUp(self):
+        cache.clear()
+        self.media_root = tempfile.mkdtemp(dir=settings.BASE_DIR)
+        self.settings = override_settings(MEDIA_ROOT=self.media_root,
+                                          PAGE_CACHE=PAGE_CACHE)
+        self.settings.enable()
+
+        self.author = User.objects.create(username='test-author')
+        reader = User.objects.create(username='reader')
+        Follow.objects.create(user=reader, author=self.author)
+        self.group = Group.objects.create(title='Группа', slug='group',
+                                          description='описание')
+        self.post = Post(text='запись с картинкой', author=self.author,
+                         group=self.group)
+        self.post.image.save('small.gif', SimpleUploadedFile(
+            'small.gif', SMALL_GIF, 'image/gif'))
+
+    def tearDown(self):
+        self.settings.disable()
+        shutil.rmtree(self.media_root, ignore_errors=True)
+
+    @mock.patch('posts.warmup.get_thumbnail')
+    def test_warmup_fills_caches(self, get_thumbnail):
+        out = StringIO()
+        call_command('warmup', budget=30, top=1, workers=2, stdout=out)
+
+        self.assertIn('thumbnails: 1 из 1', out.getvalue())
+        self.assertIn('pages: 3 из 3', out.getvalue())
+        get_thumbnail.assert_called_once()
+        image, geometry = get_thumbnail.call_args[0]
+        self.assertEqual(image.name, self.post.image.name)
+        self.assertEqual(geometry, THUMBNAIL_GEOMETRY)
+
+        guest_client = Client()
+        urls = (
+            reverse('index'),
+            reverse('group', args=[self.group.slug]),
+            reverse('profile', args=[self.author.username]),
+        )
+        for url in urls:
+            with self.subTest(url=url):
+                response = guest_client.get(url)
+                self.assertEqual(response['X-Page-Cache'], 'hit')
+
+    @mock.patch('posts.warmup.get_thumbnail')
+    def test_exhausted_budget_skips_pages(self, get_thumbnail):
+        out = StringIO()
+        call_command('warmup', budget=0, top=1, workers=2, stdout=out)
+
+        self.assertIn('pages: 0 из 3', out.getvalue())
+        self.assertIn('Время прогрева истекло', out.getvalue())
+
+    def test_templates_are_preloaded_only_by_cached_loader(self):
+        for debug, preloaded in ((True, False), (False, True)):
+            templates = [dict(settings.TEMPLATES[0], OPTIONS=dict(
+                settings.TEMPLATES[0]['OPTIONS'], debug=debug))]
+            with self.subTest(debug=debug), \
+                    override_settings(TEMPLATES=templates):
+                self.assertEqual(preload_templates() > 0, preloaded)
@@ -1,12 +1,23 @@
-from django.urls import path
+from django.urls import path, re_path
 
-from . import views
+from . import feeds, views
+
+FEED_FORMAT = r'(?P<fmt>atom|rss)'
 
 urlpatterns = [
     path('follow/', views.follow_index, name='follow_index'),
     path('new/', views.new_post, name='new_post'),
     path('', views.index, name='index'),
     path('group/<slug:slug>/', views.group_posts, name='group'),
+    path('tag/<str:name>/', views.tag_posts, name='tag'),
+    path('mentions/', views.mentions, name='mentions'),
+
+    # Ленты Atom/RSS
+    re_path(rf'^feed/{FEED_FORMAT}/$', feeds.index_feed, name='index_feed'),
+    re_path(rf'^group/(?P<slug>[-\w]+)/feed/{FEED_FORMAT}/$',
+            feeds.group_feed, name='group_feed'),
+    re_path(rf'^(?P<username>[^/]+)/feed/{FEED_FORMAT}/$',
+            feeds.profile_feed, name='profile_feed'),
 
     # Профайл пользователя
     path('<str:username>/', views.profile, name='profile'),
@@ -19,6 +30,8 @@ urlpatterns = [
     ),
     path('<str:username>/<int:post_id>/comment/', views.add_comment,
          name='add_comment'),
+    path('<str:username>/<int:post_id>/like/', views.like_post,
+         name='like_post'),
     path('<str:username>/follow/', views.profile_follow,
          name='profile_follow'),
     path('<str:username>/unfollow/', views.profile_unfollow,
@@ -1,10 +1,15 @@
+from django.conf import settings
 from django.contrib.auth.decorators import login_required
 from django.core.paginator import Paginator
 from django.shortcuts import render, get_object_or_404, redirect
+from django.views.decorators.http import require_POST
 
 from yatube.settings import POST_ON_PAGE
+from . import comment_queue, counters, fragments, likes, tags
 from .forms import PostCreateForm, CommentForm
-from .models import Post, Group, User, Follow
+from .models import Post, Group, User, Follow, Tag
+from .ratelimit import ratelimit
+from .streaming import render_feed
 
 
 def index(request):
@@ -12,7 +17,7 @@ def index(request):
     paginator = Paginator(posts, POST_ON_PAGE)
     page_number = request.GET.get('page')
     page = paginator.get_page(page_number)
-    return render(
+    return render_feed(
         request,
         'index.html',
         {'page': page, 'paginator': paginator}
@@ -27,19 +32,38 @@ def group_posts(request, slug):
     page_number = request.GET.get('page')
     page = paginator.get_page(page_number)
 
-    return render(
+    return render_feed(
         request,
         'group.html',
         {'group': group, 'page': page, 'paginator': paginator})
 
 
+def tag_posts(request, name):
+    tag = get_object_or_404(Tag, name=name.lower())
+    posts, next_cursor = tags.keyset_page(
+        tag.post_tags.all(), request.GET.get('before'), POST_ON_PAGE)
+    return render(request, 'tag.html',
+                  {'tag': tag, 'posts': posts, 'next_cursor': next_cursor})
+
+
+@login_required
+def mentions(request):
+    posts, next_cursor = tags.keyset_page(
+        request.user.mentions.all(), request.GET.get('before'), POST_ON_PAGE)
+    return render(request, 'mentions.html',
+                  {'posts': posts, 'next_cursor': next_cursor})
+
+
 @login_required
+@ratelimit('new_post')
 def new_post(request):
     form = PostCreateForm(request.POST or None, files=request.FILES or None)
     if form.is_valid():
         post = form.save(commit=False)
         post.author = request.user
         post.save()
+        form.save_m2m()
+        tags.index_posts([post])
         return redirect('index')
     return render(request, 'new_post.html', {'form': form})
 
@@ -62,18 +86,24 @@ def profile(request, username):
     followers = profile.following.count()
     followings = profile.follower.count()
 
-    return render(request, 'profile.html',
-                  {'profile': profile, 'count_posts': count_posts,
-                   'page': page,
-                   'paginator': paginator,
-                   'followed': followed,
-                   'followers': followers,
-                   'followings': followings})
+    return render_feed(request, 'profile.html',
+                       {'profile': profile, 'count_posts': count_posts,
+                        'page': page,
+                        'paginator': paginator,
+                        'followed': followed,
+                        'followers': followers,
+                        'followings': followings})
 
 
 def post_view(request, username, post_id):
     post = get_object_or_404(Post, id=post_id, author__username=username)
+    post.views += counters.pending(post.pk)
+    likes.attach_likes([post], request.user)
     comments = post.comments.all()
+    if request.user.is_authenticated:
+        pending = comment_queue.pending_for(request, post)
+        if pending:
+            comments = list(comments) + pending
     profile = post.author
     count_posts = profile.posts.count()
 
@@ -96,7 +126,7 @@ def edit_post(request, username, post_id):
                           instance=post)
 
     if form.is_valid():
-        form.save()
+        tags.index_posts([form.save()])
         return redirect('post', username=request.user.username,
                         post_id=post_id)
 
@@ -119,10 +149,14 @@ def server_error(request):
 
 
 @login_required
+@ratelimit('add_comment')
 def add_comment(request, username, post_id):
     form = CommentForm(request.POST or None)
 
-    if form.is_valid():
+    if form.is_valid() and settings.COMMENT_WRITE_BEHIND:
+        comment_queue.enqueue(request, post_id, username,
+                              form.cleaned_data['text'])
+    elif form.is_valid():
         comment = form.save(commit=False)
         comment.author = request.user
         comment.post = get_object_or_404(Post, id=post_id,
@@ -132,17 +166,28 @@ def add_comment(request, username, post_id):
     return redirect('post', username=username, post_id=post_id)
 
 
+@login_required
+@require_POST
+@ratelimit('like_post')
+def like_post(request, username, post_id):
+    post = get_object_or_404(Post, id=post_id, author__username=username)
+    likes.toggle(request.user, post.pk)
+    fragments.invalidate([request.user.pk])
+    return redirect('post', username=username, post_id=post_id)
+
+
 @login_required
 def follow_index(request):
     posts = Post.objects.filter(author__following__user=request.user)
     paginator = Paginator(posts, POST_ON_PAGE)
     page_number = request.GET.get('page')
     page = paginator.get_page(page_number)
-    return render(request, "follow.html",
-                  {'page': page, 'paginator': paginator})
+    return render_feed(request, "follow.html",
+                       {'page': page, 'paginator': paginator})
 
 
 @login_required
+@ratelimit('profile_follow', methods=('GET', 'POST'))
 def profile_follow(request, username):
     author = get_object_or_404(User, username=username)
 
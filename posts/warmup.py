@@ -0,0 +1,182 @@
+"""Прогрев после выкладки.
+
+warm_process() заполняет кэши одного процесса — скомпилированные шаблоны
+и URL-резолвер; её вызывает wsgi.py/asgi.py при WARMUP_ON_BOOT и мастер
+gunicorn в режиме preload. Шаблоны кэширует только cached.Loader, который
+Django включает при DEBUG = False; при DEBUG шаблоны не прогреваются.
+preload_modules() импортирует то, что posts обычно откладывает до
+первого использования (NumPy, Pillow и движок миниатюр); её вызывает
+мастер gunicorn в режиме preload, чтобы воркеры получили всё через fork.
+warm_shared() заполняет общие кэши: миниатюры sorl (файлы и key-value
+хранилище) для первых страниц ленты, самых больших групп и авторов с
+наибольшим числом подписчиков, затем кэш страниц для этих URL — запросами
+гостя через обработчик Django со всеми middleware, как в воркере. Её
+вызывает manage.py warmup один раз на выкладку; результат переживает
+команду, потому что кэш общий (см. yatube.checks). Каждый шаг
+укладывается в оставшееся время бюджета.
+"""
+import io
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+
+from django.conf import settings
+from django.core.handlers.wsgi import WSGIHandler, WSGIRequest
+from django.db import connections
+from django.db.models import Count
+from django.template import TemplateDoesNotExist, TemplateSyntaxError, engines
+from django.template.loaders.cached import Loader as CachedLoader
+from django.urls import get_resolver, reverse
+from sorl.thumbnail import get_thumbnail
+
+from yatube.settings import POST_ON_PAGE
+from .models import Group, Post, User
+
+#  миниатюра из includes/card_post.html
+THUMBNAIL_GEOMETRY = '960x339'
+THUMBNAIL_OPTIONS = {'crop': 'center', 'upscale': True}
+
+
+class Budget:
+    def __init__(self, seconds):
+        self.deadline = time.monotonic() + seconds
+
+    def left(self):
+        return max(self.deadline - time.monotonic(), 0)
+
+    def exhausted(self):
+        return self.left() == 0
+
+
+def template_names(engine):
+    for directory in engine.template_dirs:
+        for root, _, files in os.walk(directory):
+            for filename in files:
+                yield os.path.relpath(os.path.join(root, filename),
+                                      directory).replace(os.sep, '/')
+
+
+def is_cached(engine):
+    return any(isinstance(loader, CachedLoader)
+               for loader in engine.engine.template_loaders)
+
+
+def preload_templates():
+    loaded = 0
+    for engine in engines.all():
+        #  без cached.Loader (DEBUG = True) разобранный шаблон не сохранится
+        if not is_cached(engine):
+            continue
+        for name in sorted(set(template_names(engine))):
+            try:
+                engine.get_template(name)
+            except (TemplateDoesNotExist, TemplateSyntaxError,
+                    UnicodeDecodeError):
+                continue
+            loaded += 1
+    return loaded
+
+
+def preload_urls():
+    resolver = get_resolver()
+    return len(resolver.reverse_dict)
+
+
+def warm_process():
+    return preload_templates(), preload_urls()
+
+
+def preload_modules():
+    from sorl.thumbnail import default
+
+    from . import duplicates  # noqa: F401
+
+    #  LazyObject: обращение к атрибуту загружает движок и Pillow
+    return type(default.engine).__name__
+
+
+def top_pages(limit):
+    """Первые страницы ленты, групп и авторов и их записи с картинками."""
+    groups = list(
+        Group.objects.annotate(count=Count('posts'))
+        .order_by('-count').values_list('slug', flat=True)[:limit])
+    authors = list(
+        User.objects.annotate(count=Count('following'))
+        .order_by('-count').values_list('username', flat=True)[:limit])
+
+    urls = [reverse('index')]
+    urls += [reverse('group', args=[slug]) for slug in groups]
+    urls += [reverse('profile', args=[username]) for username in authors]
+
+    with_images = Post.objects.exclude(image='').exclude(image=None)
+    pages = [with_images]
+    pages += [with_images.filter(group__slug=slug) for slug in groups]
+    pages += [with_images.filter(author__username=username)
+              for username in authors]
+    images = {}
+    for page in pages:
+        for post in page.only('pk', 'image')[:POST_ON_PAGE]:
+            images[post.image.name] = post.image
+    return urls, list(images.values())
+
+
+def make_thumbnail(image):
+    try:
+        get_thumbnail(image, THUMBNAIL_GEOMETRY, **THUMBNAIL_OPTIONS)
+    finally:
+        connections.close_all()
+
+
+def warm_thumbnails(images, budget, workers):
+    if not images:
+        return 0
+    executor = ThreadPoolExecutor(max_workers=workers)
+    futures = [executor.submit(make_thumbnail, image) for image in images]
+    done, not_done = wait(futures, timeout=budget.left())
+    for future in not_done:
+        future.cancel()
+    executor.shutdown(wait=False)
+    return sum(1 for future in done if future.exception() is None)
+
+
+def guest_request(path):
+    """GET гостя без cookie, как его строит WSGI-сервер."""
+    host = next((host.lstrip('.') for host in settings.ALLOWED_HOSTS
+                 if host != '*'), 'localhost')
+    return WSGIRequest({
+        'REQUEST_METHOD': 'GET',
+        'PATH_INFO': path,
+        'QUERY_STRING': '',
+        'SERVER_NAME': host,
+        'SERVER_PORT': '80',
+        'wsgi.input': io.BytesIO(),
+        'wsgi.url_scheme': 'http',
+    })
+
+
+def warm_pages(urls, budget):
+    handler = WSGIHandler()
+    warmed = 0
+    for url in urls:
+        if budget.exhausted():
+            break
+        response = handler.get_response(guest_request(url))
+        try:
+            #  потоковая страница попадает в кэш, когда прочитана целиком
+            for _ in response:
+                pass
+        finally:
+            response.close()
+        if response.status_code == 200:
+            warmed += 1
+    return warmed
+
+
+def warm_shared(budget, top, workers):
+    urls, images = top_pages(top)
+    thumbnails = warm_thumbnails(images, budget, workers)
+    pages = warm_pages(urls, budget)
+    return {
+        'thumbnails': (thumbnails, len(images)),
+        'pages': (pages, len(urls)),
+    }
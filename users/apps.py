@@ -1,5 +1,16 @@
 from django.apps import AppConfig
+from django.contrib.auth import get_user_model
+from django.db.models.signals import post_delete, post_save
 
 
 class UsersConfig(AppConfig):
     name = 'users'
+
+    def ready(self):
+        from .backends import invalidate_user
+
+        User = get_user_model()
+        post_save.connect(invalidate_user, sender=User,
+                          dispatch_uid='users.invalidate_user_save')
+        post_delete.connect(invalidate_user, sender=User,
+                            dispatch_uid='users.invalidate_user_delete')
@@ -0,0 +1,32 @@
+from django.conf import settings
+from django.contrib.auth.backends import ModelBackend
+from django.core.cache import cache
+
+
+def user_cache_key(user_id):
+    return f'auth:user:{user_id}'
+
+
+def invalidate_user(sender, instance, **kwargs):
+    cache.delete(user_cache_key(instance.pk))
+
+
+class CachedModelBackend(ModelBackend):
+    """ModelBackend, который берёт пользователя сессии из кэша.
+
+    В пределах запроса пользователь уже запоминается
+    AuthenticationMiddleware (request._cached_user), а этот бэкенд убирает
+    SELECT по auth_user между запросами. Запись сбрасывается при
+    сохранении или удалении пользователя (см. UsersConfig.ready). Кэш
+    общий для воркеров (проверка yatube.E001), поэтому смена пароля или
+    is_active=False сразу завершает сессии во всех процессах.
+    """
+
+    def get_user(self, user_id):
+        key = user_cache_key(user_id)
+        user = cache.get(key)
+        if user is None:
+            user = super().get_user(user_id)
+            if user is not None:
+                cache.set(key, user, settings.USER_CACHE_TIMEOUT)
+        return user
@@ -1,11 +1,24 @@
+from django import forms
 from django.contrib.auth.forms import UserCreationForm
 from django.contrib.auth import get_user_model
 
 
 User = get_user_model()
 
+#  первые сегменты адресов, которые стоят раньше профиля /<username>/
+#  и перекрыли бы страницы пользователя с таким именем; /events/
+#  перехватывает ASGI-приложение posts.sse ещё до URLconf
+RESERVED_USERNAMES = {'about', 'about-author', 'about-spec', 'admin',
+                      'events', 'follow', 'group', 'mentions', 'new', 'tag'}
+
 
 class CreationForm(UserCreationForm):
     class Meta(UserCreationForm.Meta):
         model = User
         fields = ("first_name", "last_name", "username", "email")
+
+    def clean_username(self):
+        username = self.cleaned_data['username']
+        if username.lower() in RESERVED_USERNAMES:
+            raise forms.ValidationError('Это имя пользователя занято')
+        return username
@@ -1,3 +1,101 @@
-from django.test import TestCase
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache, caches
+from django.test import Client, TestCase
+from django.urls import Resolver404, resolve, reverse
 
-# Create your tests here.
+from .backends import CachedModelBackend, user_cache_key
+from .forms import RESERVED_USERNAMES
+
+User = get_user_model()
+
+
+class CachedUserTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+
+        cls.user = User.objects.create(
+            username='test-author',
+            email='testauthor@mail.com',
+            password='JimBeam1234',
+        )
+
+    def setUp(self):
+        cache.clear()
+        self.backend = CachedModelBackend()
+
+    def test_user_is_cached(self):
+        self.backend.get_user(CachedUserTests.user.pk)
+        with self.assertNumQueries(0):
+            user = self.backend.get_user(CachedUserTests.user.pk)
+        self.assertEqual(user, CachedUserTests.user)
+
+    def test_cache_invalidated_on_save(self):
+        self.backend.get_user(CachedUserTests.user.pk)
+
+        user = User.objects.get(pk=CachedUserTests.user.pk)
+        user.first_name = 'Джим'
+        user.save()
+
+        self.assertIsNone(cache.get(user_cache_key(user.pk)))
+        self.assertEqual(
+            self.backend.get_user(user.pk).first_name, 'Джим')
+
+    def test_invalidation_is_seen_by_other_workers(self):
+        #  отдельный экземпляр бэкенда кэша — как в другом процессе
+        other_worker = type(caches['default'])(
+            settings.CACHES['default']['LOCATION'], {})
+        key = user_cache_key(CachedUserTests.user.pk)
+        self.backend.get_user(CachedUserTests.user.pk)
+        self.assertIsNotNone(other_worker.get(key))
+
+        user = User.objects.get(pk=CachedUserTests.user.pk)
+        user.is_active = False
+        user.save()
+
+        self.assertIsNone(other_worker.get(key))
+
+    def test_authenticated_request_skips_auth_queries(self):
+        client = Client()
+        client.force_login(CachedUserTests.user)
+        url = reverse('profile', kwargs={
+            'username': CachedUserTests.user.username})
+        client.get(url)
+
+        #  остаётся только запрос групп для формы новой записи
+        with self.assertNumQueries(1):
+            client.get(reverse('new_post'))
+
+
+class SignUpTests(TestCase):
+    def test_reserved_username_is_rejected(self):
+        for username in ('tag', 'Mentions', 'follow'):
+            with self.subTest(username=username):
+                response = Client().post(reverse('signup'), data={
+                    'username': username,
+                    'email': 'user@mail.com',
+                    'password1': 'JimBeam1234',
+                    'password2': 'JimBeam1234',
+                })
+                self.assertFormError(response, 'form', 'username',
+                                     'Это имя пользователя занято')
+        self.assertFalse(User.objects.exists())
+
+    def test_reserved_usernames_are_shadowed(self):
+        own_pages = {'profile', 'post', 'profile_follow'}
+        for username in RESERVED_USERNAMES - {'events'}:
+            with self.subTest(username=username):
+                shadowed = False
+                for url in (f'/{username}/', f'/{username}/5/',
+                            f'/{username}/follow/'):
+                    try:
+                        match = resolve(url)
+                    except Resolver404:
+                        shadowed = True
+                        continue
+                    shadowed |= (match.url_name not in own_pages
+                                 or match.kwargs.get('username') != username)
+                self.assertTrue(shadowed)
+        self.assertEqual(resolve('/reader/follow/').url_name,
+                         'profile_follow')
@@ -1,7 +1,29 @@
 import os
 
-from django.core.asgi import get_asgi_application
+from asgiref.wsgi import WsgiToAsgi
+from django.conf import settings
+from django.core.wsgi import get_wsgi_application
+
+from yatube import startup
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'yatube.settings')
+startup.instrument()
+
+#  в Django 2.2 нет ASGI-обработчика: обычные запросы идут в WSGI-приложение
+#  в пуле потоков asgiref, асинхронно обслуживаются только потоки /events/
+django_application = WsgiToAsgi(get_wsgi_application())
+
+#  импорт после настройки Django: модулю нужны модели
+from posts.sse import EventStreamApp  # noqa: E402
+
+application = EventStreamApp(django_application)
+
+#  фоновая запись счётчиков просмотров в базу
+from posts import counters  # noqa: E402
+
+counters.start_flusher()
+
+if settings.WARMUP_ON_BOOT:
+    from posts.warmup import warm_process
 
-application = get_asgi_application()
+    warm_process()
@@ -0,0 +1,38 @@
+"""Файловый кэш, общий для всех процессов одной машины.
+
+Лимиты частоты запросов, пользователи сессий, версия индекса flatpages и
+кэш страниц должны быть видны всем воркерам, поэтому LocMemCache им не
+подходит. В FileBasedCache из Django add() и incr() — это чтение и
+запись по отдельности; здесь они выполняются под flock, так что
+счётчики из разных процессов не теряют приращений. Блокировки
+распределены по LOCK_STRIPES файлам, а не по файлу на ключ.
+"""
+import fcntl
+import os
+import zlib
+from contextlib import contextmanager
+
+from django.core.cache.backends.base import DEFAULT_TIMEOUT
+from django.core.cache.backends.filebased import \
+    FileBasedCache as DjangoFileBasedCache
+
+LOCK_STRIPES = 64
+
+
+class FileBasedCache(DjangoFileBasedCache):
+    @contextmanager
+    def locked(self, key, version=None):
+        self._createdir()
+        name = os.path.basename(self._key_to_file(key, version))
+        stripe = zlib.crc32(name.encode()) % LOCK_STRIPES
+        with open(os.path.join(self._dir, f'lock-{stripe}'), 'a') as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            yield
+
+    def add(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        with self.locked(key, version):
+            return super().add(key, value, timeout, version)
+
+    def incr(self, key, delta=1, version=None):
+        with self.locked(key, version):
+            return super().incr(key, delta, version)
@@ -0,0 +1,22 @@
+from django.conf import settings
+from django.core.checks import Error, register
+
+LOCAL_CACHES = (
+    'django.core.cache.backends.locmem.LocMemCache',
+    'django.core.cache.backends.dummy.DummyCache',
+)
+
+
+@register()
+def shared_cache(app_configs, **kwargs):
+    """Кэш по умолчанию должен быть общим для процессов-воркеров."""
+    backend = settings.CACHES['default']['BACKEND']
+    if backend not in LOCAL_CACHES:
+        return []
+    return [Error(
+        f'Кэш по умолчанию {backend} не общий для процессов: каждый воркер '
+        'считал бы лимиты запросов и хранил пользователей сессий сам.',
+        hint='Укажите CACHE_BACKEND и CACHE_LOCATION, например memcached '
+             'или yatube.cache.FileBasedCache.',
+        id='yatube.E001',
+    )]
@@ -0,0 +1,7 @@
+from django.db.backends.postgresql import base
+
+from yatube.db.pool import PooledDatabaseWrapperMixin
+
+
+class DatabaseWrapper(PooledDatabaseWrapperMixin, base.DatabaseWrapper):
+    pass
@@ -0,0 +1,9 @@
+from django.db.backends.sqlite3 import base
+
+from yatube.db.pool import PooledDatabaseWrapperMixin
+
+
+class DatabaseWrapper(PooledDatabaseWrapperMixin, base.DatabaseWrapper):
+    def pool_enabled(self):
+        #  базу в памяти SQLite и так не закрывает между запросами
+        return super().pool_enabled() and not self.is_in_memory_db()
@@ -0,0 +1,221 @@
+"""Пул соединений с базой на процесс-воркер.
+
+Бэкенды yatube.db.backends.* берут соединение из пула в
+get_new_connection и возвращают его туда вместо закрытия, поэтому
+обычный цикл Django «соединение на запрос» (CONN_MAX_AGE = 0) больше не
+платит за установку соединения. Пул потокобезопасен и подходит как для
+потоков sync-воркеров, так и для потоков sync_to_async под ASGI; после
+fork процесс-потомок создаёт собственный пул.
+
+Настраивается ключом POOL в DATABASES:
+
+    'POOL': {
+        'SIZE': 5,            # соединений, которые держатся открытыми
+        'MAX_OVERFLOW': 10,   # сверх SIZE под пиковую нагрузку
+        'TIMEOUT': 10,        # сколько ждать свободного соединения, с
+        'MAX_LIFETIME': 3600, # пересоздавать соединения старше, с
+        'MAX_IDLE': 300,      # закрывать простаивающие дольше, с
+        'PRE_PING': True,     # проверять соединение перед выдачей
+    }
+"""
+import os
+import threading
+import time
+from collections import deque
+
+from django.db import DatabaseError
+
+DEFAULTS = {
+    'SIZE': 5,
+    'MAX_OVERFLOW': 10,
+    'TIMEOUT': 10,
+    'MAX_LIFETIME': 3600,
+    'MAX_IDLE': 300,
+    'PRE_PING': True,
+}
+
+
+class PoolTimeout(DatabaseError):
+    pass
+
+
+class PooledConnection:
+    def __init__(self, connection):
+        self.connection = connection
+        self.created = self.last_used = time.monotonic()
+
+
+class ConnectionPool:
+    def __init__(self, options):
+        self.options = {**DEFAULTS, **options}
+        self.pid = os.getpid()
+        self.condition = threading.Condition()
+        self.idle = deque()
+        self.in_use = 0
+        self.created = 0
+        self.recycled = 0
+        self.waits = 0
+        self.wait_time = 0.0
+        self.max_overflow_seen = 0
+
+    @property
+    def capacity(self):
+        return self.options['SIZE'] + self.options['MAX_OVERFLOW']
+
+    def is_expired(self, pooled, now):
+        return (now - pooled.created > self.options['MAX_LIFETIME']
+                or now - pooled.last_used > self.options['MAX_IDLE'])
+
+    def discard(self, pooled):
+        self.recycled += 1
+        try:
+            pooled.connection.close()
+        except Exception:
+            pass
+
+    def take(self):
+        """Свободное соединение, None — разрешено открыть новое."""
+        started = time.monotonic()
+        deadline = started + self.options['TIMEOUT']
+        waited = False
+        with self.condition:
+            while True:
+                now = time.monotonic()
+                while self.idle:
+                    pooled = self.idle.pop()
+                    if self.is_expired(pooled, now):
+                        self.discard(pooled)
+                        continue
+                    self.checkout(started, now, waited)
+                    return pooled
+                if self.in_use < self.capacity:
+                    self.checkout(started, now, waited)
+                    return None
+                if now >= deadline:
+                    raise PoolTimeout(
+                        f'Нет свободных соединений за '
+                        f'{self.options["TIMEOUT"]} с')
+                self.condition.wait(deadline - now)
+                waited = True
+
+    def checkout(self, started, now, waited):
+        self.in_use += 1
+        overflow = self.in_use - self.options['SIZE']
+        self.max_overflow_seen = max(self.max_overflow_seen, overflow)
+        if waited:
+            self.waits += 1
+            self.wait_time += now - started
+
+    def acquire(self, connect, ping):
+        pooled = self.take()
+        try:
+            if pooled is not None and self.options['PRE_PING']:
+                if not ping(pooled.connection):
+                    self.discard(pooled)
+                    pooled = None
+            if pooled is None:
+                pooled = PooledConnection(connect())
+                self.created += 1
+        except Exception:
+            self.release(None)
+            raise
+        return pooled
+
+    def release(self, pooled, discard=False):
+        with self.condition:
+            self.in_use -= 1
+            if pooled is not None:
+                now = time.monotonic()
+                if (discard or self.is_expired(pooled, now)
+                        or len(self.idle) >= self.options['SIZE']):
+                    self.discard(pooled)
+                else:
+                    pooled.last_used = now
+                    self.idle.append(pooled)
+            self.condition.notify()
+
+    def close_all(self):
+        with self.condition:
+            while self.idle:
+                self.discard(self.idle.pop())
+
+    def stats(self):
+        with self.condition:
+            return {
+                'in_use': self.in_use,
+                'idle': len(self.idle),
+                'overflow': max(0, self.in_use - self.options['SIZE']),
+                'max_overflow_seen': self.max_overflow_seen,
+                'created': self.created,
+                'recycled': self.recycled,
+                'waits': self.waits,
+                'wait_time': self.wait_time,
+            }
+
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+def get_pool(alias, options):
+    with _pools_lock:
+        pool = _pools.get(alias)
+        #  соединения, унаследованные через fork, принадлежат родителю
+        if pool is None or pool.pid != os.getpid():
+            pool = _pools[alias] = ConnectionPool(options)
+        return pool
+
+
+def pool_stats():
+    """Метрики пулов текущего процесса по алиасам баз."""
+    return {alias: pool.stats() for alias, pool in list(_pools.items())
+            if pool.pid == os.getpid()}
+
+
+class PooledDatabaseWrapperMixin:
+    """Подмешивается к DatabaseWrapper конкретного бэкенда."""
+
+    pooled = None
+
+    def pool_enabled(self):
+        return bool(self.settings_dict.get('POOL'))
+
+    def ping(self, connection):
+        try:
+            cursor = connection.cursor()
+            try:
+                cursor.execute('SELECT 1')
+            finally:
+                cursor.close()
+            #  не оставляем открытой транзакцию, начатую проверкой
+            connection.rollback()
+        except Exception:
+            return False
+        return True
+
+    def get_new_connection(self, conn_params):
+        if not self.pool_enabled():
+            return super().get_new_connection(conn_params)
+        pool = get_pool(self.alias, self.settings_dict['POOL'])
+        self.pooled = pool.acquire(
+            lambda: super(PooledDatabaseWrapperMixin, self)
+            .get_new_connection(conn_params),
+            self.ping,
+        )
+        return self.pooled.connection
+
+    def _close(self):
+        pooled, self.pooled = self.pooled, None
+        if pooled is None or self.connection is not pooled.connection:
+            return super()._close()
+
+        #  соединение из незавершённой транзакции или после ошибки
+        #  обратно в пул не возвращаем
+        discard = self.in_atomic_block or self.errors_occurred
+        if not discard:
+            try:
+                self.connection.rollback()
+            except Exception:
+                discard = True
+        get_pool(self.alias, self.settings_dict['POOL']).release(
+            pooled, discard)
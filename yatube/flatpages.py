@@ -0,0 +1,116 @@
+"""Раздача flatpages из индекса в памяти процесса.
+
+Все страницы загружаются одним проходом и хранятся по ключу (сайт, url)
+вместе с выбранным шаблоном. Сохранение или удаление страницы меняет
+номер версии в общем для процессов кэше (см. PostsConfig.ready), и каждый
+процесс перестраивает свой индекс при следующем обращении. Изменения в
+обход сигналов (update() из shell) подхватываются не позже чем через
+INDEX_MAX_AGE секунд.
+"""
+import hashlib
+import threading
+import time
+import uuid
+
+from django.conf import settings
+from django.contrib.auth.views import redirect_to_login
+from django.contrib.flatpages.models import FlatPage
+from django.contrib.flatpages.views import DEFAULT_TEMPLATE
+from django.contrib.sites.shortcuts import get_current_site
+from django.core.cache import cache
+from django.http import Http404, HttpResponse, HttpResponsePermanentRedirect
+from django.template import loader
+from django.utils.cache import get_conditional_response
+from django.utils.http import quote_etag
+from django.utils.safestring import mark_safe
+from django.views.decorators.csrf import csrf_protect
+
+VERSION_KEY = 'flatpages:version'
+INDEX_MAX_AGE = 60 * 5
+
+_index = {'version': None, 'built': 0, 'pages': {}}
+_lock = threading.Lock()
+
+
+class IndexedPage:
+    def __init__(self, page):
+        page.title = mark_safe(page.title)
+        page.content = mark_safe(page.content)
+        self.page = page
+        if page.template_name:
+            self.template = loader.select_template(
+                (page.template_name, DEFAULT_TEMPLATE))
+        else:
+            self.template = loader.get_template(DEFAULT_TEMPLATE)
+        self.etag = hashlib.md5(
+            f'{page.template_name}\0{page.title}\0{page.content}'.encode()
+        ).hexdigest()
+
+
+def build_index():
+    pages = {}
+    for page in FlatPage.objects.prefetch_related('sites'):
+        indexed = IndexedPage(page)
+        for site in page.sites.all():
+            pages[(site.pk, page.url)] = indexed
+    return pages
+
+
+def get_version():
+    version = cache.get(VERSION_KEY)
+    if version is None:
+        #  ключ вытеснен из кэша — заводим новую версию для всех процессов
+        cache.add(VERSION_KEY, uuid.uuid4().hex, None)
+        version = cache.get(VERSION_KEY)
+    return version
+
+
+def is_current(version):
+    return (_index['version'] == version
+            and time.monotonic() - _index['built'] < INDEX_MAX_AGE)
+
+
+def get_index():
+    version = get_version()
+    if not is_current(version):
+        with _lock:
+            if not is_current(version):
+                _index['pages'] = build_index()
+                _index['version'] = version
+                _index['built'] = time.monotonic()
+    return _index['pages']
+
+
+def invalidate_index(**kwargs):
+    cache.set(VERSION_KEY, uuid.uuid4().hex, None)
+
+
+def flatpage(request, url):
+    if not url.startswith('/'):
+        url = '/' + url
+    pages = get_index()
+    site_id = get_current_site(request).id
+
+    indexed = pages.get((site_id, url))
+    if indexed is None:
+        if (not url.endswith('/') and settings.APPEND_SLASH
+                and (site_id, url + '/') in pages):
+            return HttpResponsePermanentRedirect(f'{request.path}/')
+        raise Http404
+    return render_flatpage(request, indexed)
+
+
+@csrf_protect
+def render_flatpage(request, indexed):
+    if (indexed.page.registration_required
+            and not request.user.is_authenticated):
+        return redirect_to_login(request.path)
+
+    #  в шаблоне есть меню с именем пользователя
+    etag = quote_etag(f'{indexed.etag}-{request.user.pk or 0}')
+    response = get_conditional_response(request, etag=etag)
+    if response is None:
+        response = HttpResponse(
+            indexed.template.render({'flatpage': indexed.page}, request))
+    response['ETag'] = etag
+    return response
@@ -0,0 +1,201 @@
+import mimetypes
+import os
+import re
+import zlib
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.http import FileResponse, HttpResponse, HttpResponseNotModified
+from django.utils._os import safe_join
+from django.utils.cache import patch_vary_headers
+from django.utils.http import http_date
+from django.views.static import was_modified_since
+
+#  ManifestStaticFilesStorage добавляет к имени 12 символов md5
+HASHED_NAME = re.compile(r'\.[0-9a-f]{12}\.[^/.]+$')
+RANGE = re.compile(r'^bytes=(\d*)-(\d*)$')
+
+ACCEPTS_GZIP = re.compile(r'\bgzip\b')
+
+IMMUTABLE = 'public, max-age=31536000, immutable'
+ENCODINGS = (('br', '.br'), ('gzip', '.gz'))
+
+
+class RangeFile:
+    """Часть файла для ответа 206.
+
+    fileno() отдаёт дескриптор, уже сдвинутый на начало диапазона, поэтому
+    wsgi.file_wrapper (например, gunicorn) передаёт ровно Content-Length
+    байт через sendfile; остальные серверы читают через read().
+    """
+
+    def __init__(self, path, start, length):
+        self.file = open(path, 'rb')
+        self.file.seek(start)
+        self.remaining = length
+
+    def read(self, size=-1):
+        if size < 0 or size > self.remaining:
+            size = self.remaining
+        data = self.file.read(size)
+        self.remaining -= len(data)
+        return data
+
+    def fileno(self):
+        return self.file.fileno()
+
+    def close(self):
+        self.file.close()
+
+
+def parse_range(header, size):
+    """(start, length) из заголовка Range или None для всего файла.
+
+    Поддерживается один диапазон; ValueError — диапазон невыполним.
+    """
+    match = RANGE.match(header or '')
+    if not match or match.groups() == ('', ''):
+        return None
+    first, last = match.groups()
+    if not first:
+        start = max(size - int(last), 0)
+        end = size - 1
+    else:
+        start = int(first)
+        end = min(int(last), size - 1) if last else size - 1
+    if start >= size or start > end:
+        raise ValueError(header)
+    return start, end - start + 1
+
+
+class StaticFilesMiddleware:
+    """Раздача STATIC_ROOT и MEDIA_ROOT в продакшене без веб-сервера.
+
+    Включается настройкой STATIC_PIPELINE. Для статики выбирается заранее
+    сжатый вариант по Accept-Encoding, файлы с хэшем в имени отдаются с
+    immutable-кэшированием. Медиа поддерживает Range-запросы.
+    """
+
+    def __init__(self, get_response):
+        if not settings.STATIC_PIPELINE:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if request.method in ('GET', 'HEAD'):
+            roots = (
+                (settings.STATIC_URL, settings.STATIC_ROOT, True),
+                (settings.MEDIA_URL, settings.MEDIA_ROOT, False),
+            )
+            for prefix, root, is_static in roots:
+                if request.path.startswith(prefix):
+                    response = self.serve(request,
+                                          request.path[len(prefix):],
+                                          root, is_static)
+                    if response is not None:
+                        return response
+        return self.get_response(request)
+
+    def serve(self, request, name, root, is_static):
+        try:
+            path = safe_join(root, name)
+        except ValueError:
+            return None
+        if not os.path.isfile(path):
+            return None
+
+        stat = os.stat(path)
+        if not was_modified_since(request.META.get('HTTP_IF_MODIFIED_SINCE'),
+                                  stat.st_mtime, stat.st_size):
+            response = HttpResponseNotModified()
+        elif is_static:
+            response = self.serve_static(request, path)
+        else:
+            response = self.serve_media(request, path, stat.st_size)
+
+        response['Last-Modified'] = http_date(stat.st_mtime)
+        if HASHED_NAME.search(name) or name.startswith('cache/'):
+            #  хэшированная статика и миниатюры sorl не меняются по имени
+            response['Cache-Control'] = IMMUTABLE
+        else:
+            response['Cache-Control'] = 'public, max-age=3600'
+        return response
+
+    def serve_static(self, request, path):
+        content_type = mimetypes.guess_type(path)[0]
+        accept = {token.split(';')[0].strip() for token in
+                  request.META.get('HTTP_ACCEPT_ENCODING', '').split(',')}
+        for encoding, suffix in ENCODINGS:
+            if encoding in accept and os.path.isfile(path + suffix):
+                response = FileResponse(
+                    open(path + suffix, 'rb'),
+                    content_type=content_type or 'application/octet-stream')
+                response['Content-Encoding'] = encoding
+                break
+        else:
+            response = FileResponse(open(path, 'rb'),
+                                    content_type=content_type)
+        response['Vary'] = 'Accept-Encoding'
+        return response
+
+    def serve_media(self, request, path, size):
+        content_type = (mimetypes.guess_type(path)[0]
+                        or 'application/octet-stream')
+        try:
+            byte_range = parse_range(request.META.get('HTTP_RANGE'), size)
+        except ValueError:
+            response = HttpResponse(status=416)
+            response['Content-Range'] = f'bytes */{size}'
+            return response
+
+        if byte_range is None:
+            response = FileResponse(open(path, 'rb'),
+                                    content_type=content_type)
+        else:
+            start, length = byte_range
+            response = FileResponse(RangeFile(path, start, length),
+                                    content_type=content_type, status=206)
+            response['Content-Length'] = length
+            response['Content-Range'] = (
+                f'bytes {start}-{start + length - 1}/{size}')
+        response['Accept-Ranges'] = 'bytes'
+        return response
+
+
+def compress_stream(chunks):
+    """gzip потока с Z_SYNC_FLUSH после каждой части, чтобы браузер
+    получал её сразу, а не когда наберётся буфер компрессора."""
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+    for chunk in chunks:
+        data = compressor.compress(chunk)
+        data += compressor.flush(zlib.Z_SYNC_FLUSH)
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+class StreamingGZipMiddleware:
+    """Сжимает только потоковые ответы (см. posts/streaming.py).
+
+    Включается настройкой STREAM_FEEDS.
+    """
+
+    def __init__(self, get_response):
+        if not settings.STREAM_FEEDS:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        response = self.get_response(request)
+        if (not response.streaming or response.has_header('Content-Encoding')
+                or not ACCEPTS_GZIP.search(
+                    request.META.get('HTTP_ACCEPT_ENCODING', ''))):
+            return response
+
+        patch_vary_headers(response, ('Accept-Encoding',))
+        response.streaming_content = compress_stream(
+            response.streaming_content)
+        response['Content-Encoding'] = 'gzip'
+        if response.has_header('Content-Length'):
+            del response['Content-Length']
+        return response
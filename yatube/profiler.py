@@ -0,0 +1,141 @@
+"""Сэмплирующий профилировщик запросов (включается PROFILER_ENABLED).
+
+Запрос профилируется, если сотрудник передал заголовок X-Profile: 1 или
+параметр ?profile=1, либо случайно с вероятностью PROFILER_SAMPLE_RATE.
+Пока такие запросы идут, фоновый поток раз в PROFILER_INTERVAL секунд
+снимает стек их потоков через sys._current_frames(); остальные запросы
+ничего не платят. Стеки в свёрнутом виде («a;b;c число») дописываются в
+PROFILER_DIR/<имя URL>.collapsed, откуда их собирает manage.py
+export_profiles.
+"""
+import fcntl
+import os
+import random
+import sys
+import threading
+import time
+from collections import Counter
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+
+HEADER = 'HTTP_X_PROFILE'
+PARAM = 'profile'
+
+
+def frame_name(code):
+    path = code.co_filename
+    #  самый длинный подходящий путь: site-packages лежит внутри stdlib
+    for prefix in sorted(filter(None, sys.path), key=len, reverse=True):
+        if path.startswith(prefix):
+            path = path[len(prefix):].lstrip(os.sep)
+            break
+    return f'{code.co_name} ({path}:{code.co_firstlineno})'
+
+
+def collapse(frame, names):
+    stack = []
+    while frame is not None:
+        code = frame.f_code
+        name = names.get(code)
+        if name is None:
+            name = names[code] = frame_name(code)
+        stack.append(name)
+        frame = frame.f_back
+    return ';'.join(reversed(stack))
+
+
+class Sampler:
+    def __init__(self, interval):
+        self.interval = interval
+        self.targets = {}
+        self.names = {}
+        self.lock = threading.Lock()
+        self.wakeup = threading.Event()
+        self.thread = None
+
+    def start(self, ident):
+        counter = Counter()
+        with self.lock:
+            self.targets[ident] = counter
+            if self.thread is None or not self.thread.is_alive():
+                self.thread = threading.Thread(
+                    target=self.run, name='profiler', daemon=True)
+                self.thread.start()
+        self.wakeup.set()
+        return counter
+
+    def stop(self, ident):
+        with self.lock:
+            return self.targets.pop(ident, Counter())
+
+    def run(self):
+        while True:
+            if not self.targets:
+                self.wakeup.wait()
+                self.wakeup.clear()
+                continue
+            time.sleep(self.interval)
+            frames = sys._current_frames()
+            with self.lock:
+                for ident, counter in self.targets.items():
+                    frame = frames.get(ident)
+                    if frame is not None:
+                        counter[collapse(frame, self.names)] += 1
+
+
+_sampler = None
+
+
+def get_sampler():
+    global _sampler
+    if _sampler is None:
+        _sampler = Sampler(settings.PROFILER_INTERVAL)
+    return _sampler
+
+
+def profile_path(url_name):
+    return os.path.join(settings.PROFILER_DIR, f'{url_name}.collapsed')
+
+
+def save(url_name, counter):
+    os.makedirs(settings.PROFILER_DIR, exist_ok=True)
+    lines = ''.join(f'{stack} {count}\n' for stack, count in counter.items())
+    with open(profile_path(url_name), 'a', encoding='utf-8') as profile:
+        fcntl.flock(profile, fcntl.LOCK_EX)
+        profile.write(lines)
+
+
+def requested(request):
+    if not (request.META.get(HEADER) == '1'
+            or request.GET.get(PARAM) == '1'):
+        return False
+    user = getattr(request, 'user', None)
+    return bool(user and user.is_staff)
+
+
+class ProfilerMiddleware:
+    def __init__(self, get_response):
+        if not settings.PROFILER_ENABLED:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if not (requested(request)
+                or random.random() < settings.PROFILER_SAMPLE_RATE):
+            return self.get_response(request)
+
+        sampler = get_sampler()
+        ident = threading.get_ident()
+        sampler.start(ident)
+        try:
+            response = self.get_response(request)
+        finally:
+            counter = sampler.stop(ident)
+
+        match = request.resolver_match
+        url_name = (match.url_name if match else None) or 'unknown'
+        if counter:
+            save(url_name, counter)
+        response['X-Profile-Samples'] = sum(counter.values())
+        return response
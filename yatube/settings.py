@@ -15,8 +15,8 @@ ALLOWED_HOSTS = [
 ]
 
 INSTALLED_APPS = [
-    'users',
-    'posts',
+    'users.apps.UsersConfig',
+    'posts.apps.PostsConfig',
     'sorl.thumbnail',
     'django.contrib.sites',
     'django.contrib.flatpages',
@@ -30,16 +30,30 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
+    'yatube.middleware.StaticFilesMiddleware',
+    'yatube.middleware.StreamingGZipMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'yatube.profiler.ProfilerMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'posts.counters.ViewCounterMiddleware',
+    'posts.page_cache.PageCacheMiddleware',
 ]
 
 ROOT_URLCONF = 'yatube.urls'
 
+#  сессии читаются из кэша и только при промахе из базы
+SESSION_ENGINE = os.environ.get(
+    'SESSION_ENGINE', 'django.contrib.sessions.backends.cached_db')
+
+AUTHENTICATION_BACKENDS = [
+    'users.backends.CachedModelBackend',
+]
+USER_CACHE_TIMEOUT = 60 * 5
+
 TEMPLATES_DIR = os.path.join(BASE_DIR, "templates")
 TEMPLATES = [
     {
@@ -68,8 +82,18 @@ DATABASES = {
         'PASSWORD': os.environ.get('POSTGRES_PASSWORD'),
         'HOST': os.environ.get('DB_HOST'),
         'PORT': os.environ.get('DB_PORT'),
+        'CONN_MAX_AGE': int(os.environ.get('DB_CONN_MAX_AGE', 0)),
+        #  используется бэкендами yatube.db.backends.* (см. yatube/db/pool.py)
+        'POOL': {
+            'SIZE': int(os.environ.get('DB_POOL_SIZE', 5)),
+            'MAX_OVERFLOW': int(os.environ.get('DB_POOL_MAX_OVERFLOW', 10)),
+            'TIMEOUT': 10,
+            'MAX_LIFETIME': 60 * 60,
+            'MAX_IDLE': 60 * 5,
+            'PRE_PING': True,
+        },
     }
-} 
+}
 
 AUTH_PASSWORD_VALIDATORS = [
     {
@@ -102,6 +126,13 @@ STATIC_ROOT = os.path.join(BASE_DIR, "static")
 MEDIA_URL = '/media/'
 MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
 
+#  продакшен-раздача статики и медиа самим приложением: хэшированные имена,
+#  сжатые при collectstatic копии и immutable-кэширование
+STATIC_PIPELINE = os.environ.get('STATIC_PIPELINE') == '1'
+if STATIC_PIPELINE:
+    STATICFILES_STORAGE = (
+        'yatube.storage.CompressedManifestStaticFilesStorage')
+
 LOGIN_URL = "/auth/login/"
 LOGIN_REDIRECT_URL = "index"
 LOGOUT_REDIRECT_URL = "index"
@@ -111,10 +142,109 @@ EMAIL_FILE_PATH = os.path.join(BASE_DIR, "sent_emails")
 
 SITE_ID = 1
 
+#  кэш должен быть общим для всех процессов: на нём держатся лимиты
+#  частоты запросов, пользователи сессий, версия flatpages и кэш страниц.
+#  По умолчанию — файлы в CACHE_DIR (общие для воркеров одной машины);
+#  для нескольких машин — memcached через CACHE_BACKEND и CACHE_LOCATION.
+#  LocMemCache отклоняется проверкой yatube.E001 (см. yatube/checks.py)
 CACHES = {
     'default': {
-        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'BACKEND': os.environ.get('CACHE_BACKEND',
+                                  'yatube.cache.FileBasedCache'),
+        'LOCATION': os.environ.get('CACHE_LOCATION',
+                                   os.path.join(BASE_DIR, 'cache')),
+        'OPTIONS': {'MAX_ENTRIES': 10000},
     }
 }
 
 POST_ON_PAGE = 10
+
+#  лимиты частоты запросов: {имя эндпоинта: {область: (запросов, секунд)}}
+RATELIMITS = {
+    'new_post': {'user': (10, 60), 'ip': (30, 60)},
+    'add_comment': {'user': (20, 60), 'ip': (60, 60)},
+    'profile_follow': {'user': (30, 60), 'ip': (90, 60)},
+    'like_post': {'user': (60, 60), 'ip': (180, 60)},
+}
+
+#  отложенная запись комментариев: add_comment пишет в журнал на диске,
+#  а manage.py flush_comments вставляет их пачками
+COMMENT_WRITE_BEHIND = os.environ.get('COMMENT_WRITE_BEHIND') == '1'
+COMMENT_QUEUE_DIR = os.path.join(BASE_DIR, 'comment_queue')
+
+#  кэш страниц для анонимных пользователей по имени URL из posts/urls.py:
+#  fresh — сколько секунд страница свежая, stale — сколько ещё её можно
+#  отдавать, пока один из процессов пересчитывает новую
+PAGE_CACHE = {
+    'index': {'fresh': 20, 'stale': 60},
+    'group': {'fresh': 20, 'stale': 60},
+    'profile': {'fresh': 20, 'stale': 60},
+    'post': {'fresh': 10, 'stale': 30},
+}
+#  сколько ждать лидера, если устаревшей копии страницы нет, с
+PAGE_CACHE_WAIT = 0.5
+
+#  ленты Atom/RSS: сколько записей и за сколько дней отдавать,
+#  сколько секунд клиенты могут кэшировать ленту
+FEED_MAX_ITEMS = 50
+FEED_MAX_AGE_DAYS = 30
+FEED_CACHE_SECONDS = 60 * 5
+
+#  счётчики просмотров: фоновый поток пишет буфер процесса в базу раз
+#  в VIEW_COUNTER_INTERVAL секунд, а при VIEW_COUNTER_MAX_PENDING записях —
+#  сразу
+VIEW_COUNTER_INTERVAL = 10
+VIEW_COUNTER_MAX_PENDING = 1000
+
+#  на сколько строк делить счётчик отметок «нравится» одной записи
+LIKE_COUNTER_SHARDS = 8
+
+#  почти одинаковые записи: с какой оценки сходства Жаккара PostCreateForm
+#  отклоняет текст и тексты какой длины вообще проверять
+DUPLICATE_THRESHOLD = 0.8
+DUPLICATE_MIN_LENGTH = 50
+
+#  админка: до какого числа строк считать их точно, а не по статистике
+#  базы, и сколько строк менять за раз в массовых действиях
+ADMIN_EXACT_COUNT_LIMIT = 10000
+ADMIN_BATCH_SIZE = 1000
+
+#  потоковая отдача страниц ленты: head и меню уходят сразу, карточки —
+#  по мере чтения записей, со сжатием gzip по частям
+STREAM_FEEDS = os.environ.get('STREAM_FEEDS') == '1'
+
+#  письма с новыми записями подписок (manage.py send_digests): не больше
+#  DIGEST_MAX_POSTS записей в письме, письма уходят пачками по
+#  DIGEST_BATCH_SIZE, прогресс запуска хранится в DIGEST_STATE_DIR
+DIGEST_MAX_POSTS = 20
+DIGEST_BATCH_SIZE = 100
+DIGEST_STATE_DIR = os.path.join(BASE_DIR, 'digest_state')
+
+#  сэмплирующий профилировщик (yatube/profiler.py): доля случайно
+#  профилируемых запросов, период снятия стеков в секундах и каталог
+#  для стеков, которые собирает manage.py export_profiles
+PROFILER_ENABLED = os.environ.get('PROFILER_ENABLED') == '1'
+PROFILER_SAMPLE_RATE = float(os.environ.get('PROFILER_SAMPLE_RATE', 0))
+PROFILER_INTERVAL = 0.005
+PROFILER_DIR = os.path.join(BASE_DIR, 'profiles')
+
+#  прогрев после выкладки (manage.py warmup): бюджет в секундах и число
+#  групп и авторов; WARMUP_ON_BOOT — прогревать шаблоны и URL в каждом
+#  процессе при старте (шаблоны кэшируются только при DEBUG = False)
+WARMUP_BUDGET = 60
+WARMUP_TOP = 10
+WARMUP_ON_BOOT = os.environ.get('WARMUP_ON_BOOT') == '1'
+
+#  статическая копия публичных страниц (manage.py export_snapshot)
+SNAPSHOT_DIR = os.path.join(BASE_DIR, 'snapshot')
+
+#  события для SSE (/events/...) через журнал в отдельном SQLite-файле
+EVENTS_ENABLED = os.environ.get('EVENTS_ENABLED') == '1'
+EVENTS_DB = os.path.join(BASE_DIR, 'events.sqlite3')
+EVENTS_POLL_INTERVAL = 0.5
+#  сколько секунд хранить события в журнале
+EVENTS_RETENTION = 60
+#  событий в очереди одного клиента, соединений на процесс
+EVENTS_QUEUE_SIZE = 16
+EVENTS_MAX_CONNECTIONS = 10000
+EVENTS_HEARTBEAT = 15
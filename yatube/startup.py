@@ -0,0 +1,105 @@
+"""Замер запуска процесса: время импорта каждого модуля в django.setup().
+
+При STARTUP_TIMING=1 manage.py, wsgi.py и asgi.py вызывают instrument()
+до загрузки Django. Пока идёт django.setup(), загрузчики модулей
+обёрнуты таймером; после него в stderr пишется общее время и самые
+дорогие модули: «своё» время без вложенных импортов и полное. То же
+показывает python -X importtime, но только для всего процесса и без
+разбивки по django.setup().
+"""
+import importlib.abc
+import os
+import sys
+import time
+
+STARTUP_TIMING = os.environ.get('STARTUP_TIMING') == '1'
+REPORT_LIMIT = 25
+
+
+class TimingLoader(importlib.abc.Loader):
+    def __init__(self, loader, timer):
+        self.loader = loader
+        self.timer = timer
+
+    def create_module(self, spec):
+        return self.loader.create_module(spec)
+
+    def exec_module(self, module):
+        self.timer.enter()
+        try:
+            self.loader.exec_module(module)
+        finally:
+            self.timer.leave(module.__name__)
+
+    def __getattr__(self, name):
+        return getattr(self.loader, name)
+
+
+class ImportTimer(importlib.abc.MetaPathFinder):
+    """Находит модуль остальными искателями и подменяет его загрузчик."""
+
+    def __init__(self):
+        self.timings = {}
+        self.stack = []
+
+    def find_spec(self, fullname, path, target=None):
+        for finder in sys.meta_path:
+            if finder is self or not hasattr(finder, 'find_spec'):
+                continue
+            spec = finder.find_spec(fullname, path, target)
+            if spec is not None:
+                if spec.loader is not None and hasattr(spec.loader,
+                                                       'exec_module'):
+                    spec.loader = TimingLoader(spec.loader, self)
+                return spec
+        return None
+
+    def enter(self):
+        self.stack.append([time.perf_counter(), 0])
+
+    def leave(self, name):
+        started, nested = self.stack.pop()
+        total = time.perf_counter() - started
+        self.timings[name] = (total - nested, total)
+        if self.stack:
+            self.stack[-1][1] += total
+
+    def install(self):
+        sys.meta_path.insert(0, self)
+
+    def uninstall(self):
+        if self in sys.meta_path:
+            sys.meta_path.remove(self)
+
+    def report(self, limit=REPORT_LIMIT):
+        rows = sorted(self.timings.items(), key=lambda item: item[1][0],
+                      reverse=True)[:limit]
+        lines = [f'{"self, ms":>9}{"total, ms":>11}  module']
+        lines += [f'{own * 1000:>9.1f}{total * 1000:>11.1f}  {name}'
+                  for name, (own, total) in rows]
+        return '\n'.join(lines)
+
+
+def instrument():
+    """Оборачивает django.setup() замером импортов."""
+    if not STARTUP_TIMING:
+        return
+    import django
+
+    setup = django.setup
+
+    def timed_setup(*args, **kwargs):
+        timer = ImportTimer()
+        timer.install()
+        started = time.perf_counter()
+        try:
+            setup(*args, **kwargs)
+        finally:
+            timer.uninstall()
+        elapsed = time.perf_counter() - started
+        sys.stderr.write(
+            f'django.setup(): {elapsed * 1000:.1f} ms, '
+            f'модулей импортировано: {len(timer.timings)}\n'
+            f'{timer.report()}\n')
+
+    django.setup = timed_setup
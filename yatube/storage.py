@@ -0,0 +1,53 @@
+import gzip
+
+from django.contrib.staticfiles.storage import ManifestStaticFilesStorage
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+COMPRESSIBLE_EXTENSIONS = (
+    '.css', '.js', '.map', '.svg', '.txt', '.html', '.json', '.xml', '.ico',
+    '.eot', '.ttf', '.otf',
+)
+
+
+def compress_file(path):
+    """Кладёт рядом с файлом .gz и (если установлен brotli) .br варианты.
+
+    Вариант сохраняется, только если он меньше исходного файла.
+    """
+    with open(path, 'rb') as source:
+        content = source.read()
+
+    variants = {'.gz': gzip.compress(content, compresslevel=9, mtime=0)}
+    if brotli is not None:
+        variants['.br'] = brotli.compress(content)
+
+    for suffix, compressed in variants.items():
+        if len(compressed) < len(content):
+            with open(path + suffix, 'wb') as target:
+                target.write(compressed)
+
+
+class CompressedManifestStaticFilesStorage(ManifestStaticFilesStorage):
+    """Хэшированные имена из манифеста плюс сжатые копии для раздачи.
+
+    Сжатие выполняется в collectstatic после всех проходов
+    post_process, когда имена файлов уже окончательные.
+    """
+
+    def post_process(self, paths, dry_run=False, **options):
+        hashed_names = {}
+        for name, hashed_name, processed in super().post_process(
+                paths, dry_run, **options):
+            if hashed_name and not isinstance(processed, Exception):
+                hashed_names[name] = hashed_name
+            yield name, hashed_name, processed
+
+        if dry_run:
+            return
+        for hashed_name in hashed_names.values():
+            if hashed_name.endswith(COMPRESSIBLE_EXTENSIONS):
+                compress_file(self.path(hashed_name))
@@ -0,0 +1,61 @@
+import asyncio
+import shutil
+import tempfile
+from unittest import mock
+
+from django.test import TestCase, override_settings
+
+from posts import events
+
+EVENTS_DIR = tempfile.mkdtemp()
+
+
+async def call(application, path, disconnect_after=0):
+    sent = []
+    messages = [{'type': 'http.request', 'body': b''}]
+
+    async def receive():
+        if messages:
+            return messages.pop()
+        await asyncio.sleep(disconnect_after)
+        return {'type': 'http.disconnect'}
+
+    async def send(message):
+        sent.append(message)
+
+    await application({'type': 'http', 'http_version': '1.1',
+                       'method': 'GET', 'scheme': 'http', 'path': path,
+                       'root_path': '', 'query_string': b'',
+                       'headers': [(b'host', b'testserver')],
+                       'server': ('testserver', 80)}, receive, send)
+    return sent
+
+
+@override_settings(EVENTS_ENABLED=True,
+                   EVENTS_DB=f'{EVENTS_DIR}/events.sqlite3')
+class AsgiApplicationTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        #  поток записи счётчиков не нужен в тестах
+        with mock.patch('posts.counters.start_flusher'):
+            from yatube.asgi import application
+        cls.application = application
+
+    @classmethod
+    def tearDownClass(cls):
+        events._local.__dict__.clear()
+        shutil.rmtree(EVENTS_DIR, ignore_errors=True)
+        super().tearDownClass()
+
+    def test_events_request(self):
+        sent = asyncio.run(call(self.application, '/events/post/1/', 0.05))
+        self.assertEqual(sent[0]['status'], 200)
+        self.assertIn((b'content-type', b'text/event-stream; charset=utf-8'),
+                      sent[0]['headers'])
+        self.assertEqual(sent[1]['body'], b'retry: 5000\n\n')
+        self.assertEqual(events.hub.connections, 0)
+
+    def test_django_request(self):
+        sent = asyncio.run(call(self.application, '/'))
+        self.assertEqual(sent[0]['status'], 200)
@@ -0,0 +1,51 @@
+import os
+import shutil
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from multiprocessing import Pool
+
+from django.conf import settings
+from django.core import checks
+from django.core.cache import cache
+from django.test import SimpleTestCase, override_settings
+
+from yatube.cache import FileBasedCache
+
+
+def increment(location):
+    cache = FileBasedCache(location, {})
+    for _ in range(50):
+        cache.incr('counter')
+
+
+class SharedCacheTest(SimpleTestCase):
+    def setUp(self):
+        self.location = tempfile.mkdtemp()
+        self.cache = FileBasedCache(self.location, {})
+
+    def tearDown(self):
+        shutil.rmtree(self.location, ignore_errors=True)
+
+    def test_incr_from_processes_is_atomic(self):
+        self.cache.set('counter', 0)
+        with Pool(4) as pool:
+            pool.map(increment, [self.location] * 4)
+        self.assertEqual(self.cache.get('counter'), 200)
+
+    def test_add_from_threads_succeeds_once(self):
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            added = list(executor.map(
+                lambda value: self.cache.add('key', value), range(16)))
+        self.assertEqual(added.count(True), 1)
+
+    @override_settings(CACHES={'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}})
+    def test_local_cache_is_rejected(self):
+        errors = checks.run_checks()
+        self.assertIn('yatube.E001', [error.id for error in errors])
+
+    def test_tests_do_not_use_deploy_cache(self):
+        deploy = os.path.join(settings.BASE_DIR, 'cache')
+        self.assertNotEqual(settings.CACHES['default']['LOCATION'], deploy)
+        self.assertNotEqual(os.path.realpath(cache._dir),
+                            os.path.realpath(deploy))
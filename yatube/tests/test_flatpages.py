@@ -0,0 +1,66 @@
+from unittest import mock
+
+from django.contrib.flatpages.models import FlatPage
+from django.contrib.sites.models import Site
+from django.core.cache import cache
+from django.test import Client, TestCase
+
+from yatube import flatpages
+
+
+class FlatPageIndexTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+
+        cls.page = FlatPage.objects.create(
+            url='/about-author/',
+            title='Об авторе',
+            content='<b>content</b>',
+        )
+        cls.page.sites.add(Site.objects.get(pk=1))
+
+    def setUp(self):
+        cache.clear()
+        self.guest_client = Client()
+
+    def test_served_without_queries(self):
+        self.guest_client.get('/about-author/')
+        with self.assertNumQueries(0):
+            response = self.guest_client.get('/about-author/')
+        self.assertContains(response, '<b>content</b>')
+
+    def test_index_invalidated_on_save(self):
+        self.guest_client.get('/about-author/')
+
+        page = FlatPage.objects.get(pk=FlatPageIndexTest.page.pk)
+        page.content = '<i>new content</i>'
+        page.save()
+
+        response = self.guest_client.get('/about-author/')
+        self.assertContains(response, '<i>new content</i>')
+
+    def test_conditional_get(self):
+        response = self.guest_client.get('/about-author/')
+        response = self.guest_client.get(
+            '/about-author/', HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(response.status_code, 304)
+
+    def test_missing_page(self):
+        response = self.guest_client.get('/about-spec/')
+        self.assertEqual(response.status_code, 404)
+
+    def test_index_expires_without_signal(self):
+        self.guest_client.get('/about-author/')
+        #  update() не отправляет post_save
+        FlatPage.objects.filter(pk=FlatPageIndexTest.page.pk).update(
+            content='<i>shell edit</i>')
+
+        response = self.guest_client.get('/about-author/')
+        self.assertContains(response, '<b>content</b>')
+
+        later = flatpages.time.monotonic() + flatpages.INDEX_MAX_AGE
+        with mock.patch.object(flatpages.time, 'monotonic',
+                               return_value=later):
+            response = self.guest_client.get('/about-author/')
+        self.assertContains(response, '<i>shell edit</i>')
@@ -0,0 +1,67 @@
+import threading
+
+from django.test import SimpleTestCase
+
+from yatube.db.pool import ConnectionPool, PoolTimeout
+
+
+class FakeConnection:
+    def __init__(self):
+        self.closed = False
+
+    def close(self):
+        self.closed = True
+
+
+class ConnectionPoolTest(SimpleTestCase):
+    def make_pool(self, **options):
+        return ConnectionPool({'SIZE': 1, 'MAX_OVERFLOW': 1,
+                               'TIMEOUT': 0.05, **options})
+
+    def test_connection_is_reused(self):
+        pool = self.make_pool()
+        pooled = pool.acquire(FakeConnection, lambda conn: True)
+        pool.release(pooled)
+
+        self.assertIs(pool.acquire(FakeConnection, lambda conn: True),
+                      pooled)
+        self.assertEqual(pool.stats()['created'], 1)
+
+    def test_overflow_and_timeout(self):
+        pool = self.make_pool()
+        first = pool.acquire(FakeConnection, lambda conn: True)
+        second = pool.acquire(FakeConnection, lambda conn: True)
+        self.assertEqual(pool.stats()['overflow'], 1)
+
+        with self.assertRaises(PoolTimeout):
+            pool.acquire(FakeConnection, lambda conn: True)
+
+        #  сверх SIZE соединения в пуле не задерживаются
+        pool.release(first)
+        pool.release(second)
+        self.assertTrue(second.connection.closed)
+        self.assertEqual(pool.stats()['idle'], 1)
+
+    def test_waiter_gets_released_connection(self):
+        pool = self.make_pool(MAX_OVERFLOW=0, TIMEOUT=5)
+        pooled = pool.acquire(FakeConnection, lambda conn: True)
+        threading.Timer(0.05, pool.release, [pooled]).start()
+
+        self.assertIs(pool.acquire(FakeConnection, lambda conn: True),
+                      pooled)
+        self.assertEqual(pool.stats()['waits'], 1)
+
+    def test_failed_ping_and_expiry_recycle(self):
+        pool = self.make_pool()
+        pooled = pool.acquire(FakeConnection, lambda conn: True)
+        pool.release(pooled)
+
+        fresh = pool.acquire(FakeConnection, lambda conn: False)
+        self.assertIsNot(fresh, pooled)
+        self.assertTrue(pooled.connection.closed)
+
+        pool.release(fresh)
+        pool.options['MAX_IDLE'] = -1
+        self.assertIsNot(pool.acquire(FakeConnection, lambda conn: True),
+                         fresh)
+        self.assertEqual(pool.stats()['recycled'], 2)
@@ -0,0 +1,76 @@
+import json
+import shutil
+import tempfile
+import time
+from io import StringIO
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.shortcuts import get_object_or_404
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+from posts.models import Post
+
+User = get_user_model()
+
+
+def slow_get_object_or_404(*args, **kwargs):
+    time.sleep(0.05)
+    return get_object_or_404(*args, **kwargs)
+
+
+class ProfilerTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+
+        cls.staff = User.objects.create(username='staff', is_staff=True)
+        cls.user = User.objects.create(username='test-author')
+        cls.post = Post.objects.create(text='запись', author=cls.user)
+
+    def setUp(self):
+        self.profiles = tempfile.mkdtemp()
+        self.settings = override_settings(
+            PROFILER_ENABLED=True, PROFILER_SAMPLE_RATE=0,
+            PROFILER_INTERVAL=0.001, PROFILER_DIR=self.profiles,
+            PAGE_CACHE={})
+        self.settings.enable()
+        self.url = reverse('post', args=[self.user.username, self.post.pk])
+
+    def tearDown(self):
+        self.settings.disable()
+        shutil.rmtree(self.profiles, ignore_errors=True)
+
+    def client_for(self, user):
+        client = Client()
+        client.force_login(user)
+        return client
+
+    @mock.patch('posts.views.get_object_or_404', slow_get_object_or_404)
+    def test_staff_request_is_profiled(self):
+        response = self.client_for(self.staff).get(self.url,
+                                                   HTTP_X_PROFILE='1')
+        self.assertGreater(int(response['X-Profile-Samples']), 0)
+
+        out = StringIO()
+        call_command('export_profiles', 'post', stdout=out)
+        profile = json.loads(out.getvalue())
+        self.assertEqual(profile['profiles'][0]['name'], 'post')
+        frames = [frame['name'] for frame in profile['shared']['frames']]
+        self.assertTrue(any(name.startswith('post_view ')
+                            for name in frames))
+
+        out = StringIO()
+        call_command('export_profiles', format='collapsed', clear=True,
+                     stdout=out)
+        self.assertTrue(out.getvalue().startswith('post;'))
+
+    def test_others_are_not_profiled(self):
+        response = self.client_for(self.user).get(self.url,
+                                                  HTTP_X_PROFILE='1')
+        self.assertFalse(response.has_header('X-Profile-Samples'))
+
+        response = self.client_for(self.staff).get(self.url)
+        self.assertFalse(response.has_header('X-Profile-Samples'))
@@ -0,0 +1,75 @@
+import os
+import subprocess
+import sys
+import tempfile
+import textwrap
+from io import StringIO
+from unittest import mock
+
+import django
+from django.conf import settings
+from django.test import SimpleTestCase
+
+from yatube import startup
+
+
+class ImportTimerTest(SimpleTestCase):
+    def setUp(self):
+        self.path = tempfile.mkdtemp()
+        for name, body in (
+                ('timed_outer', 'import time, timed_inner\n'
+                                'time.sleep(0.02)\n'),
+                ('timed_inner', 'import time\ntime.sleep(0.05)\n')):
+            with open(os.path.join(self.path, f'{name}.py'), 'w') as module:
+                module.write(body)
+        sys.path.insert(0, self.path)
+
+    def tearDown(self):
+        sys.path.remove(self.path)
+        for name in ('timed_outer', 'timed_inner'):
+            sys.modules.pop(name, None)
+
+    def test_self_time_excludes_nested_imports(self):
+        timer = startup.ImportTimer()
+        timer.install()
+        try:
+            import timed_outer  # noqa: F401
+        finally:
+            timer.uninstall()
+
+        outer_self, outer_total = timer.timings['timed_outer']
+        inner_self, inner_total = timer.timings['timed_inner']
+        self.assertGreaterEqual(inner_self, 0.05)
+        self.assertGreaterEqual(outer_total, 0.07)
+        self.assertLess(outer_self, 0.05)
+        self.assertTrue(timer.report().splitlines()[1].endswith(
+            'timed_inner'))
+
+    def test_instrument_reports_setup(self):
+        stderr = StringIO()
+        with mock.patch.object(startup, 'STARTUP_TIMING', True), \
+                mock.patch.object(django, 'setup') as setup, \
+                mock.patch.object(sys, 'stderr', stderr):
+            startup.instrument()
+            django.setup()
+
+        setup.assert_called_once_with()
+        self.assertIn('django.setup():', stderr.getvalue())
+
+
+class LazyImportTest(SimpleTestCase):
+    def test_setup_does_not_import_heavy_modules(self):
+        code = textwrap.dedent('''
+            import sys
+            import django
+            django.setup()
+            print(sorted(name for name in ('numpy', 'PIL.Image')
+                         if name in sys.modules))
+        ''')
+        output = subprocess.run(
+            [sys.executable, '-c', code], check=True,
+            stdout=subprocess.PIPE, cwd=settings.BASE_DIR,
+            env=dict(os.environ,
+                     DJANGO_SETTINGS_MODULE='yatube.settings'),
+        ).stdout
+        self.assertEqual(output.decode().strip(), '[]')
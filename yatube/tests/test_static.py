@@ -0,0 +1,79 @@
+import gzip
+import os
+import shutil
+import tempfile
+
+from django.conf import settings
+from django.test import Client, TestCase, override_settings
+
+from yatube.storage import compress_file
+
+STATIC_ROOT = tempfile.mkdtemp()
+MEDIA_ROOT = tempfile.mkdtemp()
+
+
+@override_settings(STATIC_PIPELINE=True, STATIC_ROOT=STATIC_ROOT,
+                   MEDIA_ROOT=MEDIA_ROOT)
+class StaticPipelineTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+
+        cls.script = os.path.join(STATIC_ROOT, 'app.0123456789ab.js')
+        with open(cls.script, 'w') as script:
+            script.write('console.log("yatube");\n' * 100)
+        compress_file(cls.script)
+
+        os.makedirs(os.path.join(MEDIA_ROOT, 'posts'))
+        with open(os.path.join(MEDIA_ROOT, 'posts', 'pic.gif'), 'wb') as pic:
+            pic.write(bytes(range(100)))
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(STATIC_ROOT, ignore_errors=True)
+        shutil.rmtree(MEDIA_ROOT, ignore_errors=True)
+        super().tearDownClass()
+
+    def setUp(self):
+        self.guest_client = Client()
+
+    def test_compressed_variant(self):
+        self.assertTrue(os.path.exists(StaticPipelineTest.script + '.gz'))
+
+        response = self.guest_client.get(
+            '/static/app.0123456789ab.js', HTTP_ACCEPT_ENCODING='gzip')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertEqual(response['Cache-Control'],
+                         'public, max-age=31536000, immutable')
+        content = gzip.decompress(b''.join(response.streaming_content))
+        self.assertTrue(content.startswith(b'console.log'))
+
+    def test_identity_without_accept_encoding(self):
+        response = self.guest_client.get('/static/app.0123456789ab.js')
+        self.assertFalse(response.has_header('Content-Encoding'))
+        self.assertEqual(response['Vary'], 'Accept-Encoding')
+
+    def test_not_modified(self):
+        response = self.guest_client.get('/static/app.0123456789ab.js')
+        response = self.guest_client.get(
+            '/static/app.0123456789ab.js',
+            HTTP_IF_MODIFIED_SINCE=response['Last-Modified'])
+        self.assertEqual(response.status_code, 304)
+
+    def test_media_range(self):
+        response = self.guest_client.get('/media/posts/pic.gif',
+                                         HTTP_RANGE='bytes=10-19')
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(response['Content-Range'], 'bytes 10-19/100')
+        self.assertEqual(b''.join(response.streaming_content),
+                         bytes(range(10, 20)))
+
+        response = self.guest_client.get('/media/posts/pic.gif',
+                                         HTTP_RANGE='bytes=200-')
+        self.assertEqual(response.status_code, 416)
+
+    def test_missing_file_falls_through(self):
+        response = self.guest_client.get('/static/missing.js')
+        self.assertEqual(response.status_code, 404)
+        self.assertTrue(settings.STATIC_PIPELINE)
@@ -2,9 +2,10 @@ from django.conf import settings
 from django.conf.urls import handler404, handler500  # noqa
 from django.conf.urls.static import static
 from django.contrib import admin
-from django.contrib.flatpages import views
 from django.urls import include, path
 
+from yatube import flatpages
+
 handler404 = "posts.views.page_not_found"  # noqa
 handler500 = "posts.views.server_error"  # noqa
 
@@ -20,11 +21,12 @@ urlpatterns = [
     path("admin/", admin.site.urls),
 
     # flatpages
-    path('about/', include('django.contrib.flatpages.urls')),
+    path('about/<path:url>', flatpages.flatpage,
+         name='django.contrib.flatpages.views.flatpage'),
 
-    path('about-author/', views.flatpage, {'url': '/about-author/'},
+    path('about-author/', flatpages.flatpage, {'url': '/about-author/'},
          name='about-author'),
-    path('about-spec/', views.flatpage, {'url': '/about-spec/'},
+    path('about-spec/', flatpages.flatpage, {'url': '/about-spec/'},
          name='about-spec'),
 
     #  обработчик для главной страницы ищем в urls.py приложения posts
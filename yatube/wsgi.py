@@ -1,7 +1,21 @@
 import os
 
+from django.conf import settings
 from django.core.wsgi import get_wsgi_application
 
+from yatube import startup
+
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'yatube.settings')
+startup.instrument()
 
 application = get_wsgi_application()
+
+#  фоновая запись счётчиков просмотров в базу
+from posts import counters  # noqa: E402
+
+counters.start_flusher()
+
+if settings.WARMUP_ON_BOOT:
+    from posts.warmup import warm_process
+
+    warm_process()